@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import gc
 import numpy as np
 import random
 
@@ -62,6 +63,64 @@ class Animal:
 
         cls._params.update(new_params)
 
+    @classmethod
+    def from_arrays(cls, age, weight, rounded=True):
+        """
+        Create many animals at once from arrays of ages and weights. The
+        values are checked for all the animals at once, and the animals are
+        made without going through the constructor one by one.
+
+        Parameters
+        ----------
+        age : array
+            age of each animal
+        weight : array
+            weight of each animal
+        rounded : bool
+            if True the weights are rounded to two decimals, as by the
+            constructor, else they are kept as given, e.g. when animals saved
+            in a checkpoint are restored
+
+        Returns
+        -------
+        list
+            the new animals
+
+        Raises
+        ------
+        ValueError
+            if any age or weight is negative, any weight is nan, or the arrays
+            are not of equal length.
+        """
+        age = np.asarray(age)
+        weight = np.asarray(weight, dtype=float)
+        if age.shape != weight.shape:
+            raise ValueError("Age and weight must be arrays of equal length.")
+        if np.any(weight < 0):
+            raise ValueError("Weight can't be negative")
+        if np.any(np.isnan(weight)):
+            raise ValueError("Weight must be a number")
+        if np.any(age < 0):
+            raise ValueError("Age can't be negative")
+
+        # The garbage collector is paused while the animals are made, since
+        # it would otherwise scan the growing list of new animals many times
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            animals = []
+            new = cls.__new__
+            for animal_age, animal_weight in zip(age.tolist(), weight.tolist()):
+                animal = new(cls)
+                animal.weight = (round(animal_weight, 2) if rounded
+                                 else animal_weight)
+                animal.age = animal_age
+                animals.append(animal)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return animals
+
     @classmethod
     def get_params(cls):
         """
@@ -122,7 +181,7 @@ class Animal:
         """
         return self._params['mu'] * self.fitness()
 
-    def birth(self, num):
+    def birth(self, num, rng=None):
         """
         Calculates the probability that an animal gives birth.
         The probability of birth lies between 0 and 1.
@@ -136,6 +195,8 @@ class Animal:
         ----------
         num : int
             the number of animals of the same species in one cell
+        rng : random module or biosim.rng.CounterRandom
+            source of random numbers, default is the random module
 
         Returns
         -------
@@ -153,7 +214,7 @@ class Animal:
         if self.weight < weight_limit:  # weight below weight limit, no birth
             return 0., 0.
 
-        birth_weight_newborn = self.birth_weight()
+        birth_weight_newborn = self.birth_weight(rng=rng)
         weight_loss = birth_weight_newborn * self._params['xi']
         if weight_loss > self.weight:  # animal loses to much weight, no birth
             return 0., 0.
@@ -161,18 +222,25 @@ class Animal:
             prob_birth = min(1, self._params['gamma'] * self.fitness() * (num - 1))
             return prob_birth, birth_weight_newborn
 
-    def birth_weight(self):
+    def birth_weight(self, rng=None):
         """
         Uses a Gaussian distribution with mean and standard deviation as
         specified in the animal-parameters to find the weight of a newborn.
 
+        Parameters
+        ----------
+        rng : random module or biosim.rng.CounterRandom
+            source of random numbers, default is the random module
+
         Returns
         -------
         birth_weight : float
             the weight of a newborn animal
         """
-        birth_weight = random.gauss(self._params['w_birth'],
-                                    self._params['sigma_birth'])
+        if rng is None:
+            rng = random
+        birth_weight = rng.gauss(self._params['w_birth'],
+                                 self._params['sigma_birth'])
         return round(birth_weight, 2)
 
     def update_weight_after_birth(self, weight_of_newborn):
@@ -28,6 +28,10 @@ class SingleCell:
         self.carni_list = []
         self.herbi_list = []
 
+        # Source of random numbers, the random module unless the island gives
+        # the cell its own stream (see biosim.rng)
+        self.rng = random
+
         if animals_list:
             self.add_animals_to_cell(animals_list)
 
@@ -49,6 +53,59 @@ class SingleCell:
                 self.carni_list.append(Carnivores(age=animal['age'],
                                                   weight=animal['weight']))
 
+    def add_animals_from_arrays(self, species, age, weight):
+        """
+        Adds many animals of one species to the cell at once, given by arrays
+        of ages and weights instead of one dictionary per animal.
+
+        Parameters
+        ----------
+        species : str
+            'Herbivore' or 'Carnivore'
+        age : array
+            age of each animal
+        weight : array
+            weight of each animal
+
+        Raises
+        ------
+        KeyError
+            if species is not 'Herbivore' or 'Carnivore'.
+        """
+        self.add_animals_by_species({species: (age, weight)})
+
+    def add_animals_by_species(self, arrays):
+        """
+        Adds many animals of several species to the cell at once. The animals
+        of every species are made before any of them are added, so no animals
+        are added if any species or animal is invalid.
+
+        Parameters
+        ----------
+        arrays : dict
+            arrays of ages and weights of each species,
+            ``{'Herbivore': (age, weight), ...}``
+
+        Raises
+        ------
+        KeyError
+            if a species is not 'Herbivore' or 'Carnivore'.
+        ValueError
+            if an age or weight is invalid, see
+            :meth:`biosim.animals.Animal.from_arrays`.
+        """
+        new = {'Herbivore': [], 'Carnivore': []}
+        for species, (age, weight) in arrays.items():
+            if species == 'Herbivore':
+                new[species] += Herbivores.from_arrays(age, weight)
+            elif species == 'Carnivore':
+                new[species] += Carnivores.from_arrays(age, weight)
+            else:
+                raise KeyError(f"Invalid species: {species}")
+
+        self.herbi_list.extend(new['Herbivore'])
+        self.carni_list.extend(new['Carnivore'])
+
     @classmethod
     def set_params(cls, new_params):
         """
@@ -106,7 +163,7 @@ class SingleCell:
         of that herbivore is updated.
         """
         # Shuffles the herbivores, they eat in random order
-        random.shuffle(self.herbi_list)
+        self.rng.shuffle(self.herbi_list)
 
         fodder_in_cell = self._params['f_max']
 
@@ -137,7 +194,7 @@ class SingleCell:
             not_killed_herbis = []
             for herbi in sorted_herbi:  # first herbi has the lowest fitness
                 prob_kill = carni.probability_of_killing_herbivore(fitness_herbi=herbi.fitness())
-                if random.random() < prob_kill and appetite > 0:  # carni kills herbi
+                if self.rng.random() < prob_kill and appetite > 0:  # carni kills herbi
                     carni.update_weight_after_kill(weight_herbi=herbi.weight)
                     appetite -= herbi.weight
                 else:
@@ -190,15 +247,15 @@ class SingleCell:
         newborn_herbi, newborn_carni = [], []
         for herbi, carni, in zip_longest(self.herbi_list, self.carni_list):
             if herbi:  # needs this because herbi is None if num_carni > num_herbi
-                prob_birth_herbi, birth_weight_herbi = herbi.birth(num_herbi)
-                if random.random() < prob_birth_herbi:
+                prob_birth_herbi, birth_weight_herbi = herbi.birth(num_herbi, rng=self.rng)
+                if self.rng.random() < prob_birth_herbi:
                     newborn_herbi.append(Herbivores(age=0, weight=birth_weight_herbi))
                     herbi.update_weight_after_birth(weight_of_newborn=birth_weight_herbi)
                     # This updates the weight of the mother according to the weight of the newborn
 
             if carni:  # need this because carni is None if num_herbi > num_carni
-                prob_birth_carni, birth_weight_carni = carni.birth(num_carni)
-                if random.random() < prob_birth_carni:
+                prob_birth_carni, birth_weight_carni = carni.birth(num_carni, rng=self.rng)
+                if self.rng.random() < prob_birth_carni:
                     newborn_carni.append(Carnivores(age=0, weight=birth_weight_carni))
                     carni.update_weight_after_birth(weight_of_newborn=birth_weight_carni)
 
@@ -223,7 +280,7 @@ class SingleCell:
 
         for animal in animals:
             prob_migrate = animal.probability_of_migration()
-            if random.random() < prob_migrate:  # check if animal migrate
+            if self.rng.random() < prob_migrate:  # check if animal migrate
                 animals_move.append(animal)
             else:
                 animals_stay.append(animal)
@@ -261,7 +318,7 @@ class SingleCell:
         south = []
         west = []
         for animal in animals_move:
-            move_to = random.choice(['North', 'East', 'South', 'West'])
+            move_to = self.rng.choice(['North', 'East', 'South', 'West'])
             if move_to == 'North':
                 north.append(animal)
             elif move_to == 'East':
@@ -317,14 +374,14 @@ class SingleCell:
         """
         survived_herbis = []
         for herbi in self.herbi_list:
-            if random.random() > herbi.probability_death():
+            if self.rng.random() > herbi.probability_death():
                 # Tests if the animal survives, not if it dies.
                 # That's why we use > instead of <
                 survived_herbis.append(herbi)
 
         survived_carnis = []
         for carni in self.carni_list:
-            if random.random() > carni.probability_death():
+            if self.rng.random() > carni.probability_death():
                 # Testing if the animal survives, not if it dies.
                 # That's why we use > instead of <
                 survived_carnis.append(carni)
@@ -0,0 +1,534 @@
+# -*- coding: utf-8 -*-
+
+"""
+Checkpoints of a running simulation, stored as NumPy arrays in an ``.npz``
+file instead of as pickled animal objects.
+
+The population of the island is stored as columns: the index of each cell
+with a cell object, the number of herbivores and carnivores in it, and the
+age and weight of every animal, cell by cell in the order the island visits
+the cells. The parameters of the animals and landscapes, and the state of the
+``random`` module, are stored as arrays too, so a simulation restored from a
+checkpoint continues exactly as the saved one would have.
+
+Collecting the arrays is quick compared to compressing and writing them, so a
+:class:`CheckpointWriter` writes the collected arrays in a background thread
+while the simulation goes on, and keeps only the newest checkpoints.
+
+A :class:`CheckpointSeries` saves a checkpoint every year, or every few
+years, of a long simulation in a directory. The landscape and the parameters
+never change during a simulation, so they are written once, to
+``static.npz``. The animal counts of the line graph are written to
+``line_counts.dat``, a year at a time. Each checkpoint is then a compressed
+chunk, ``year_{:05d}.npz``, holding only the population, the state of the
+random numbers and the number of years of line counts. A chunk does not need
+the chunks before it, which may have been deleted to keep only the newest
+checkpoints.
+"""
+
+from biosim.animals import Herbivores, Carnivores
+from biosim.cell import Water, Desert, Lowland, Highland
+from collections import deque
+import os
+import re
+import queue
+import random
+import threading
+import numpy as np
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+CHECKPOINT_VERSION = 1
+
+# Classes with parameters, by the name used in the checkpoint
+_PARAM_CLASSES = {'Herbivore': Herbivores, 'Carnivore': Carnivores,
+                  'Water': Water, 'Desert': Desert, 'Lowland': Lowland,
+                  'Highland': Highland}
+
+
+def population_arrays(island):
+    """
+    Collects the population of the island as columns.
+
+    Parameters
+    ----------
+    island : TheIsland
+        the island
+
+    Returns
+    -------
+    dict
+        'cells' (index ``row * number_of_columns + column`` of each cell
+        object), 'num_herbs' and 'num_carns' (number of animals in each of
+        these cells), and 'herb_age', 'herb_weight', 'carn_age' and
+        'carn_weight' (one value per animal)
+    """
+    cells = [cell for _, _, cell in island._land_cells]
+    herbs = [herb for cell in cells for herb in cell.herbi_list]
+    carns = [carn for cell in cells for carn in cell.carni_list]
+    return {'cells': np.array(island._land_keys, dtype=np.int64),
+            'num_herbs': np.array([len(cell.herbi_list) for cell in cells],
+                                  dtype=np.int64),
+            'num_carns': np.array([len(cell.carni_list) for cell in cells],
+                                  dtype=np.int64),
+            'herb_age': _column([herb.age for herb in herbs]),
+            'herb_weight': np.array([herb.weight for herb in herbs],
+                                    dtype=float),
+            'carn_age': _column([carn.age for carn in carns]),
+            'carn_weight': np.array([carn.weight for carn in carns],
+                                    dtype=float)}
+
+
+def _column(ages):
+    """
+    Makes the ages of the animals into an array, of integers unless any age
+    is not.
+
+    Parameters
+    ----------
+    ages : list
+        age of each animal
+
+    Returns
+    -------
+    array
+        the ages
+    """
+    if not ages:
+        return np.zeros(0, dtype=np.int64)
+    return np.array(ages)
+
+
+def set_population(island, arrays):
+    """
+    Puts a population collected by :func:`population_arrays` on an island
+    with the same landscape, in place of the animals on it. The weights are
+    restored exactly, without rounding.
+
+    Parameters
+    ----------
+    island : TheIsland
+        the island
+    arrays : dict
+        the population columns
+    """
+    for _, _, cell in island._land_cells:
+        cell.herbi_list = []
+        cell.carni_list = []
+
+    herb_end = np.cumsum(arrays['num_herbs']).tolist()
+    carn_end = np.cumsum(arrays['num_carns']).tolist()
+    herb_start = 0
+    carn_start = 0
+    for key, herb_stop, carn_stop in zip(arrays['cells'].tolist(),
+                                         herb_end, carn_end):
+        cell = island.cell_at(*divmod(key, island.col), create=True)
+        cell.herbi_list = Herbivores.from_arrays(
+            arrays['herb_age'][herb_start:herb_stop],
+            arrays['herb_weight'][herb_start:herb_stop], rounded=False)
+        cell.carni_list = Carnivores.from_arrays(
+            arrays['carn_age'][carn_start:carn_stop],
+            arrays['carn_weight'][carn_start:carn_stop], rounded=False)
+        herb_start, carn_start = herb_stop, carn_stop
+
+
+def params_arrays():
+    """
+    Collects the parameters of the animals and landscapes.
+
+    Returns
+    -------
+    dict
+        for each class, the names ('params_<name>_keys') and values
+        ('params_<name>_values') of its parameters
+    """
+    arrays = {}
+    for name, cls in _PARAM_CLASSES.items():
+        params = cls.get_params()
+        arrays[f'params_{name}_keys'] = np.array(list(params), dtype=str)
+        arrays[f'params_{name}_values'] = np.array(list(params.values()),
+                                                   dtype=float)
+    return arrays
+
+
+def set_params(arrays):
+    """
+    Sets the parameters collected by :func:`params_arrays`.
+
+    Parameters
+    ----------
+    arrays : dict
+        the parameter arrays
+    """
+    for name, cls in _PARAM_CLASSES.items():
+        cls.set_params(dict(zip(arrays[f'params_{name}_keys'].tolist(),
+                                arrays[f'params_{name}_values'].tolist())))
+
+
+def rng_arrays(rng=random):
+    """
+    Collects the state of the ``random`` module.
+
+    Parameters
+    ----------
+    rng : random module or random.Random
+        the source of random numbers, default is the random module
+
+    Returns
+    -------
+    dict
+        'rng_state' (the Mersenne Twister state) and 'rng_gauss' (the next
+        normal number kept by the module, nan if none)
+    """
+    _, state, gauss_next = rng.getstate()
+    return {'rng_state': np.array(state, dtype=np.uint32),
+            'rng_gauss': np.array(np.nan if gauss_next is None else gauss_next)}
+
+
+def set_rng(arrays, rng=random):
+    """
+    Sets the state of the ``random`` module collected by :func:`rng_arrays`.
+
+    Parameters
+    ----------
+    arrays : dict
+        the state arrays
+    rng : random module or random.Random
+        the source of random numbers, default is the random module
+    """
+    version, _, _ = rng.getstate()
+    gauss_next = float(arrays['rng_gauss'])
+    rng.setstate((version, tuple(arrays['rng_state'].tolist()),
+                     None if np.isnan(gauss_next) else gauss_next))
+
+
+def write_checkpoint(path, arrays, compress=True):
+    """
+    Writes the arrays of a checkpoint to an ``.npz`` file. The file is first
+    written under a temporary name and then renamed, so a crash while writing
+    never leaves a broken checkpoint in place of the last one.
+
+    Parameters
+    ----------
+    path : str or path-like
+        path to the checkpoint file, used as given
+    arrays : dict
+        the arrays to store
+    compress : bool
+        if True the arrays are compressed
+    """
+    path = os.fspath(path)
+    temporary = path + '.tmp'
+    save = np.savez_compressed if compress else np.savez
+    with open(temporary, 'wb') as file:
+        save(file, version=np.array(CHECKPOINT_VERSION), **arrays)
+    os.replace(temporary, path)
+
+
+def read_checkpoint(path):
+    """
+    Reads the arrays of a checkpoint written by :func:`write_checkpoint`.
+
+    Parameters
+    ----------
+    path : str or path-like
+        path to the checkpoint file
+
+    Returns
+    -------
+    dict
+        the stored arrays
+
+    Raises
+    ------
+    ValueError
+        if the file is from another version of the checkpoint format.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+    if int(arrays.pop('version', -1)) != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is not a checkpoint of version "
+                         f"{CHECKPOINT_VERSION}")
+    return arrays
+
+
+# Arrays of a checkpoint that do not change during a simulation
+_STATIC_ARRAYS = ('landscape', 'seed', 'rng_mode', 'storage')
+
+
+class CheckpointSeries:
+    """
+    Checkpoints of one simulation in a directory, split into a static part
+    written once, the animal counts of the line graph in a file they are
+    appended to, and a chunk for each year saved. A chunk can be loaded
+    together with the static part and the line counts alone.
+    """
+
+    STATIC_NAME = 'static.npz'
+    LINE_NAME = 'line_counts.dat'
+    CHUNK_NAME = 'year_{:05d}.npz'
+
+    # Number of herbivores and carnivores of a year in the line counts file
+    _LINE_DTYPE = np.dtype([('herbs', '<f8'), ('carns', '<f8')])
+
+    def __init__(self, directory):
+        """
+        Parameters
+        ----------
+        directory : str or path-like
+            directory of the checkpoints, made if it does not exist
+        """
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self._params = None  # parameters in the static part, once written
+        self._line_end = 0  # number of years of line graph counts written
+
+    def path(self, year):
+        """
+        Gives the path of the chunk of a year.
+
+        Parameters
+        ----------
+        year : int
+            the year of the checkpoint
+
+        Returns
+        -------
+        str
+            path to the chunk
+        """
+        return os.path.join(self.directory, self.CHUNK_NAME.format(year))
+
+    def write(self, path, arrays, compress=True):
+        """
+        Writes the arrays of a checkpoint as the chunk of a year. The static
+        part is written the first time, and the parameters are only in the
+        chunk if they have been changed since then. The line graph counts
+        not written before are written to the line counts file, and the
+        chunk only holds their number, so the chunks stay the same size
+        however long the simulation runs. Used by :class:`CheckpointWriter`
+        in its thread, see :meth:`CheckpointWriter.submit`.
+
+        Parameters
+        ----------
+        path : str
+            path to the chunk, see :meth:`path`
+        arrays : dict
+            arrays of the whole checkpoint
+        compress : bool
+            if True the arrays are compressed
+        """
+        params = {name: value for name, value in arrays.items()
+                  if name.startswith('params_')}
+        if self._params is None:
+            static = {name: arrays[name] for name in _STATIC_ARRAYS}
+            static.update(params)
+            write_checkpoint(os.path.join(self.directory, self.STATIC_NAME),
+                             static, compress=compress)
+            self._params = params
+
+        chunk = {name: value for name, value in arrays.items()
+                 if name not in _STATIC_ARRAYS and name not in params
+                 and name not in ('line_herbs', 'line_carns')}
+        if any(not np.array_equal(value, self._params[name])
+               for name, value in params.items()):
+            chunk.update(params)
+
+        self._write_line_counts(arrays['line_herbs'], arrays['line_carns'])
+        chunk['line_length'] = np.array(len(arrays['line_herbs']))
+        write_checkpoint(path, chunk, compress=compress)
+
+    def _write_line_counts(self, herbs, carns):
+        """
+        Writes the line graph counts of the years not written yet to the
+        line counts file, where the counts of a year have a fixed place.
+
+        Parameters
+        ----------
+        herbs : array of float
+            number of herbivores each year
+        carns : array of float
+            number of carnivores each year
+        """
+        counts = np.empty(len(herbs) - self._line_end, dtype=self._LINE_DTYPE)
+        counts['herbs'] = herbs[self._line_end:]
+        counts['carns'] = carns[self._line_end:]
+        path = os.path.join(self.directory, self.LINE_NAME)
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as file:
+            file.seek(self._line_end * self._LINE_DTYPE.itemsize)
+            file.write(counts.tobytes())
+        self._line_end = max(self._line_end, len(herbs))
+
+    @classmethod
+    def years(cls, directory):
+        """
+        Gives the years with a chunk in a directory of checkpoints.
+
+        Parameters
+        ----------
+        directory : str or path-like
+            directory of the checkpoints
+
+        Returns
+        -------
+        list of int
+            the years, in increasing order
+        """
+        pattern = re.compile(r'year_(\d+)\.npz$')
+        return sorted(int(match.group(1)) for match in
+                      map(pattern.match, os.listdir(directory)) if match)
+
+    @classmethod
+    def read(cls, directory, year=None):
+        """
+        Reads the arrays of a checkpoint in a directory, joining the static
+        part and the chunk of a year, as :func:`read_checkpoint` reads them
+        from a single file.
+
+        Parameters
+        ----------
+        directory : str or path-like
+            directory of the checkpoints
+        year : int or None
+            year of the checkpoint, None for the newest
+
+        Returns
+        -------
+        dict
+            the arrays of the checkpoint
+
+        Raises
+        ------
+        ValueError
+            if there is no checkpoint of the year in the directory.
+        """
+        years = cls.years(directory)
+        if year is None and years:
+            year = years[-1]
+        if year not in years:
+            raise ValueError(f"No checkpoint of year {year} in {directory}")
+
+        arrays = read_checkpoint(os.path.join(directory, cls.STATIC_NAME))
+        arrays.update(read_checkpoint(os.path.join(directory,
+                                                   cls.CHUNK_NAME.format(year))))
+
+        # The line graph counts until the year of the chunk
+        num_years = int(arrays.pop('line_length'))
+        counts = np.fromfile(os.path.join(directory, cls.LINE_NAME),
+                             dtype=cls._LINE_DTYPE, count=num_years)
+        arrays['line_herbs'] = counts['herbs'].copy()
+        arrays['line_carns'] = counts['carns'].copy()
+        return arrays
+
+
+class CheckpointWriter:
+    """
+    Writes checkpoints in a background thread. The arrays of a checkpoint are
+    collected by the simulation, and are not changed afterwards, so the
+    simulation can go on while they are compressed and written. At most one
+    checkpoint waits to be written, so the memory used stays bounded if the
+    writer falls behind.
+    """
+
+    def __init__(self, keep=None, compress=True):
+        """
+        Starts the writer thread.
+
+        Parameters
+        ----------
+        keep : int or None
+            number of checkpoints kept, older checkpoints written by this
+            writer are deleted; None to keep all
+        compress : bool
+            if True the arrays are compressed
+
+        Raises
+        ------
+        ValueError
+            if keep is less than one.
+        """
+        if keep is not None and keep < 1:
+            raise ValueError("At least one checkpoint must be kept.")
+
+        self.keep = keep
+        self.compress = compress
+        self.written = deque()  # paths of the checkpoints kept, oldest first
+        self._pending = queue.Queue(maxsize=1)
+        self._errors = []
+        self._thread = threading.Thread(target=self._write_checkpoints,
+                                        daemon=True)
+        self._thread.start()
+
+    def _write_checkpoints(self):
+        """Writes the checkpoints given to the writer until told to stop."""
+        while True:
+            item = self._pending.get()
+            try:
+                if item is None:  # the simulation is finished with the writer
+                    break
+                path, arrays, write = item
+                write(path, arrays, compress=self.compress)
+                self._rotate(os.fspath(path))
+            except Exception as err:
+                self._errors.append(f'{item[0]}: {err!r}')
+            finally:
+                self._pending.task_done()
+
+    def _rotate(self, path):
+        """
+        Records a written checkpoint, and deletes the oldest checkpoints if
+        more than ``keep`` are kept.
+
+        Parameters
+        ----------
+        path : str
+            path to the checkpoint written
+        """
+        if path in self.written:
+            self.written.remove(path)  # overwritten, it is now the newest
+        self.written.append(path)
+        while self.keep is not None and len(self.written) > self.keep:
+            try:
+                os.remove(self.written.popleft())
+            except FileNotFoundError:
+                pass
+
+    def submit(self, path, arrays, write=write_checkpoint):
+        """
+        Gives a checkpoint to the writer. Waits if a checkpoint is already
+        waiting to be written.
+
+        Parameters
+        ----------
+        path : str or path-like
+            path to the checkpoint file
+        arrays : dict
+            the arrays to store, not changed afterwards
+        write : callable
+            function writing the arrays, called as
+            ``write(path, arrays, compress=...)`` in the thread of the writer,
+            e.g. :meth:`CheckpointSeries.write`
+        """
+        self._pending.put((path, arrays, write))
+
+    def flush(self):
+        """
+        Waits until every checkpoint given to the writer is written.
+
+        Raises
+        ------
+        RuntimeError
+            if a checkpoint could not be written.
+        """
+        self._pending.join()
+        errors, self._errors = self._errors, []
+        if errors:
+            raise RuntimeError("Writing checkpoints failed: " + '; '.join(errors))
+
+    def close(self):
+        """Writes the checkpoints waiting, and stops the writer thread."""
+        if self._thread.is_alive():
+            self._pending.put(None)
+            self._thread.join()
+        self.flush()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""
+Encoding and writing of image files in a pool of worker processes.
+
+Saving a figure is mostly compression of the image, which runs on one core.
+Instead the figure is rendered to an array of RGB values in the simulation,
+and the arrays are encoded and written to file by worker processes while the
+simulation goes on.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import numpy as np
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+
+def _write_image(rgb, filename):
+    """
+    Encodes an image and writes it to file, in a worker process.
+
+    Parameters
+    ----------
+    rgb : array of uint8
+        RGB value of each pixel, with shape (height, width, 3)
+    filename : str
+        name of the file, the file type is given by the extension
+    """
+    import matplotlib.image
+
+    matplotlib.image.imsave(filename, rgb)
+
+
+class FrameEncoder:
+    """
+    Pool of worker processes encoding and writing images. At most a few
+    images per worker wait to be written, so the memory used stays bounded
+    if the workers fall behind.
+    """
+
+    def __init__(self, num_workers=2, max_pending=None):
+        """
+        Parameters
+        ----------
+        num_workers : int
+            number of worker processes
+        max_pending : int or None
+            number of images that can wait to be written before
+            :meth:`submit` waits, default two per worker
+
+        Raises
+        ------
+        ValueError
+            if given less than one worker.
+        """
+        if num_workers < 1:
+            raise ValueError("There must be at least one worker.")
+
+        self.num_workers = num_workers
+        self.max_pending = 2 * num_workers if max_pending is None else max_pending
+        # Spawn, so the workers do not inherit the state of the simulation
+        self._pool = ProcessPoolExecutor(
+            num_workers, mp_context=multiprocessing.get_context('spawn'))
+        self._pending = []
+
+    def submit(self, rgb, filename):
+        """
+        Gives an image to the workers to write. Waits for the oldest image to
+        be written if too many are waiting.
+
+        Parameters
+        ----------
+        rgb : array of uint8
+            RGB value of each pixel, with shape (height, width, 3), copied
+            before it is given to the workers
+        filename : str
+            name of the file, the file type is given by the extension
+        """
+        while len(self._pending) >= self.max_pending:
+            self._pending.pop(0).result()
+        self._pending.append(self._pool.submit(_write_image, np.array(rgb),
+                                               filename))
+
+    def flush(self):
+        """
+        Waits until all images given to the workers are written.
+
+        Raises
+        ------
+        Exception
+            the first error raised when writing an image.
+        """
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def close(self):
+        """Writes the images waiting, and stops the workers."""
+        try:
+            self.flush()
+        finally:
+            self._pool.shutdown()
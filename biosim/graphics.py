@@ -0,0 +1,539 @@
+# -*- coding: utf-8 -*-
+
+"""
+Graphics of the simulation, kept apart from :mod:`biosim.simulation` so that
+matplotlib is only imported when a simulation is visualized. The
+:class:`BioSim` class imports this module the first time graphics are set up.
+
+The figure is either a pyplot figure shown in a window, or a bare
+``Figure`` with its own Agg canvas that is never shown. The Agg figure does
+not use pyplot or change any global matplotlib settings, so several
+simulations can draw and save their frames at the same time in threads.
+
+Initial code for the plots was taken from Hans Ekkehard Plesser:
+https://github.com/heplesser/nmbu_inf200_june2020/blob/master/examples/
+randvis_project/randvis/simulation.py
+"""
+
+from biosim.landscape import LANDSCAPE_CHARS
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import matplotlib.patches as mpatches
+import numpy as np
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+# Fontsize for text, axes title and tick labels, given to each artist instead
+# of set in the global matplotlib settings
+_FONT_SIZE = 8
+_TITLE_SIZE = 8
+_TICK_SIZE = 5
+
+_YEAR_TEMPLATE = '\n\nYear: {:5d}\n\nHerbivores - blue\nCarnivores - red'
+
+
+class Graphics:
+    """
+    The figure of a simulation, with a map of the island, the year count, a
+    graph of the number of animals, heatmaps of the distribution of the
+    animals and histograms of their fitness, age and weight.
+
+    The artists that change from year to year (the year count, the heatmaps,
+    the histograms and the newest part of the animal count graph) are
+    animated, and are drawn with blitting on top of a cached background
+    holding everything else. The background is only redrawn when the figure
+    changes otherwise, e.g. when the limits of the animal count graph change.
+    """
+
+    def __init__(self, landscape, ymax_animals, cmax_h, cmax_c, edges,
+                 interactive=True):
+        """
+        Parameters
+        ----------
+        landscape : 2D array of uint8
+            landscape code of each cell of the island
+        ymax_animals : int
+            y-axis limit for graph showing animal numbers
+        cmax_h : int
+            color-code limit for herbivore densities
+        cmax_c : int
+            color-code limit for carnivore densities
+        edges : dict
+            bin edges of the histogram of each property, see
+            :func:`biosim.snapshot.hist_edges`
+        interactive : bool
+            if True the figure is a pyplot figure shown in a window, else a
+            figure on an Agg canvas, only drawn to be saved
+        """
+        self.interactive = interactive
+        self._landscape = landscape
+        self.ymax_animals = ymax_animals
+        self.cmax_h = cmax_h
+        self.cmax_c = cmax_c
+        self._edges = edges
+
+        self.width = 0  # will later be set to the width of the island
+        self.height = 0  # will later be set to the height of the island
+        self._final_year = None  # final year, will be set later
+
+        # Creating all axes used for plotting
+        self._fig = None
+        self._map_ax = None
+        self._img_ax = None
+        self._line_ax = None
+        self._line_h = None
+        self._line_c = None
+        self._herb_ax = None
+        self._carn_ax = None
+        self._img_ax_heat1 = None
+        self._img_ax_heat2 = None
+        self._fitness_ax = None
+        self._age_ax = None
+        self._weight_ax = None
+        self._hist_steps = None  # step artists of each histogram
+        self._axt = None
+        self._year_txt = None
+
+        # Blitting: the background, and the newest part of the count graph
+        self._background = None
+        self._full_redraw = True  # the background must be redrawn
+        self._segment_h = None
+        self._segment_c = None
+
+    def setup_graphics(self, final_year):
+        """
+        Creates the figure with different subplots. Subplots are:
+            - Map of island
+            - Counting years
+            - Plot of number of animals on the island
+            - Heatmaps for distribution of herbivores and carnivores
+            - Histograms showing distribution of animals fitness, age and
+              weight.
+
+        Parameters
+        ----------
+        final_year : int
+            last year of the simulation, the end of the animal count graph
+        """
+        self._final_year = final_year
+
+        # Create figure window
+        if self._fig is None:
+            if self.interactive:
+                import matplotlib.pyplot as plt
+
+                self._fig = plt.figure()
+                plt.show(block=False)
+            else:
+                self._fig = Figure()
+                FigureCanvasAgg(self._fig)  # the canvas of the figure
+            self._fig.canvas.mpl_connect('draw_event', self._on_draw)
+
+        # Add axes for creating plot of island
+        if self._map_ax is None:
+            self._map_ax = self._fig.add_axes([0.1, 0.63, 0.3, 0.3])
+            self._img_ax = None
+
+        # Add axes count for years
+        if self._axt is None:
+            self._axt = self._fig.add_axes([0.4, 0.8, 0.2, 0.2])  # llx, lly, w, h
+            self._axt.axis('off')  # turn off coordinate system
+            self._year_txt = self._axt.text(0.5, 0.5, _YEAR_TEMPLATE.format(0),
+                                            horizontalalignment='center',
+                                            verticalalignment='center',
+                                            transform=self._axt.transAxes,
+                                            fontsize=_FONT_SIZE, animated=True)
+
+        # Add subplot for animal count plot
+        if self._line_ax is None:
+            self._line_ax = self._fig.add_subplot(3, 3, 3)
+            self._line_ax.set_ylim(0, self.ymax_animals)
+            self._line_ax.tick_params(labelsize=_TICK_SIZE)
+
+        self._line_ax.set_xlim(0, self._final_year + 1)
+        self._line_setup_graph()
+        self._line_ax.set_title('Animal count', fontsize=_TITLE_SIZE)
+        self._full_redraw = True
+
+        # Add axes for heatmaps for herbivore and carnivore distribution
+        if self._herb_ax is None and self._carn_ax is None:
+            self._herb_ax = self._fig.add_axes([0.15, 0.26, 0.34, 0.3])
+            self._carn_ax = self._fig.add_axes([0.6, 0.26, 0.34, 0.3])
+            self._img_ax_heat1 = None
+            self._img_ax_heat2 = None
+            self._herb_ax.set_title('Herbivore distribution', fontsize=_TITLE_SIZE)
+            self._carn_ax.set_title('Carnivore distribution', fontsize=_TITLE_SIZE)
+            self._herb_ax.tick_params(labelsize=_TICK_SIZE)
+            self._carn_ax.tick_params(labelsize=_TICK_SIZE)
+
+        # Add axes for histograms of fitness, age and weight
+        if self._fitness_ax is None and self._age_ax is None and self._weight_ax is None:
+            self._fitness_ax = self._fig.add_axes([0.1, 0.08, 0.23, 0.1])
+            self._age_ax = self._fig.add_axes([0.4, 0.08, 0.23, 0.1])
+            self._weight_ax = self._fig.add_axes([0.7, 0.08, 0.23, 0.1])
+            self._hist_setup()
+
+    def plot_island(self):
+        """
+        Plots a map of the island.
+        Initial code for this function was taken from Hans Ekkehard Plesser:
+        https://github.com/heplesser/nmbu_inf200_june2020/blob/master/examples
+        /plotting/mapping.py
+        """
+        # Colors to be used for the different landscapes on the island
+        #                   R    G    B
+        rgb_value = {'W': (0.0, 0.0, 1.0),  # blue
+                     'L': (0.0, 0.6, 0.0),  # dark green
+                     'H': (0.5, 1.0, 0.5),  # light green
+                     'D': (1.0, 1.0, 0.5)}  # light yellow
+
+        labels = {'W': 'Water', 'L': 'Lowland', 'H': 'Highland', 'D': 'Desert'}
+        # create patches as legend
+        patches = [mpatches.Patch(color=rgb_value[key], label=labels[key])
+                   for key in rgb_value.keys()]
+
+        # Color of each landscape code, looked up for the whole map at once
+        rgb_table = np.array([rgb_value[char] for char in LANDSCAPE_CHARS])
+        geogr_rgb = rgb_table[self._landscape]
+        self.height, self.width = self._landscape.shape
+        self._img_ax = self._map_ax.imshow(geogr_rgb)
+        self._map_ax.set_xticks(range(self.width))
+        self._map_ax.set_xticklabels(range(1, 1 + self.width))
+        self._map_ax.set_yticks(range(self.height))
+        self._map_ax.set_yticklabels(range(1, 1 + self.height))
+        self._map_ax.set_title('The island', fontsize=_TITLE_SIZE)
+        self._map_ax.tick_params(labelsize=_TICK_SIZE)
+        self._map_ax.legend(handles=patches, loc=4, borderaxespad=0.,
+                            fontsize=4)
+
+    def _line_setup_graph(self):
+        """
+        Creates the line graph/the animal count graph setup. If this graph are
+        already made, it makes sure it's updated by updating the xdata and
+        ydata.
+        """
+        if self._line_h is None and self._line_c is None:
+            line_h = self._line_ax.plot(np.arange(0, self._final_year),
+                                        np.full(self._final_year, np.nan),
+                                        'b-')
+            line_c = self._line_ax.plot(np.arange(0, self._final_year),
+                                        np.full(self._final_year, np.nan),
+                                        'r-')
+            self._line_h = line_h[0]
+            self._line_c = line_c[0]
+            self._segment_h = self._line_ax.plot([], [], 'b-', animated=True,
+                                                 solid_capstyle='round')[0]
+            self._segment_c = self._line_ax.plot([], [], 'r-', animated=True,
+                                                 solid_capstyle='round')[0]
+
+            self._line_ax.legend(['Herbivore', 'Carnivore'],
+                                 loc='upper left', fontsize=4)
+        else:
+            xdata_h, ydata_h = self._line_h.get_data()
+            xdata_c, ydata_c = self._line_c.get_data()
+            xnew = np.arange(xdata_h[-1] + 1, self._final_year)
+            if len(xnew) > 0:
+                ynew = np.full(xnew.shape, np.nan)
+                self._line_h.set_data(np.hstack((xdata_h, xnew)),
+                                      np.hstack((ydata_h, ynew)))
+                self._line_c.set_data(np.hstack((xdata_c, xnew)),
+                                      np.hstack((ydata_c, ynew)))
+
+    def _update_count(self, year):
+        """
+        Updates the counter that keeps track of which year of the simulation we
+        are looking at.
+
+        Parameters
+        ----------
+        year : int
+            the year shown
+        """
+        self._year_txt.set_text(_YEAR_TEMPLATE.format(year))
+
+    def _update_heatmaps(self, herbi_map, carni_map):
+        """
+        Remakes heatmas of herbivores and carnivores. Makes sure axes
+        follows specifications.
+
+        Parameters
+        ----------
+        herbi_map : list of lists
+            represent the number of herbivores in each cell of the island
+        carni_map : list of lists
+            represent the number of carnivores in each cell of the island
+        """
+        # Update heatmap for herbivore distribution
+        if self._img_ax_heat1 is not None:
+            self._img_ax_heat1.set_data(herbi_map)
+        else:
+            self._img_ax_heat1 = self._herb_ax.imshow(herbi_map,
+                                                      interpolation='nearest',
+                                                      vmin=0, vmax=self.cmax_h,
+                                                      animated=True)
+            colorbar = self._fig.colorbar(self._img_ax_heat1, ax=self._herb_ax,
+                                          shrink=0.8, orientation='vertical')
+            colorbar.ax.tick_params(labelsize=_TICK_SIZE)
+            self._herb_ax.set_xticks(range(self.width))
+            self._herb_ax.set_xticklabels(range(1, 1 + self.width))
+            self._herb_ax.set_yticks(range(self.height))
+            self._herb_ax.set_yticklabels(range(1, 1 + self.height))
+
+        # Update heatmap for carnivore distribution
+        if self._img_ax_heat2 is not None:
+            self._img_ax_heat2.set_data(carni_map)
+        else:
+            self._img_ax_heat2 = self._carn_ax.imshow(carni_map,
+                                                      interpolation='nearest',
+                                                      vmin=0, vmax=self.cmax_c,
+                                                      animated=True)
+            colorbar = self._fig.colorbar(self._img_ax_heat2, ax=self._carn_ax,
+                                          shrink=0.8, orientation='vertical')
+            colorbar.ax.tick_params(labelsize=_TICK_SIZE)
+            self._carn_ax.set_xticks(range(self.width))
+            self._carn_ax.set_xticklabels(range(1, 1 + self.width))
+            self._carn_ax.set_yticks(range(self.height))
+            self._carn_ax.set_yticklabels(range(1, 1 + self.height))
+            self._full_redraw = True  # new colorbars and ticks
+
+    def _hist_setup(self):
+        """
+        Creates the histograms of fitness, age and weight once, with empty
+        step artists for herbivores and carnivores that are updated with the
+        counts of each year.
+        """
+        axes = {'fitness': self._fitness_ax, 'age': self._age_ax,
+                'weight': self._weight_ax}
+        self._hist_steps = {}
+        for prop, ax in axes.items():
+            edges = self._edges[prop]
+            ax.set_xlim([0, edges[-1]])
+            ax.set_ylim([0, 2000])
+            ax.set_title(prop.capitalize(), fontsize=_TITLE_SIZE)
+            ax.tick_params(labelsize=_TICK_SIZE)
+            zeros = np.zeros(len(edges) - 1)
+            self._hist_steps[prop] = (ax.stairs(zeros, edges, color='blue',
+                                                animated=True),
+                                      ax.stairs(zeros, edges, color='red',
+                                                animated=True))
+
+    def _update_histograms(self, hist):
+        """
+        Updates the histograms in place with the counts of each bin.
+
+        Parameters
+        ----------
+        hist : dict
+            for each property, the counts of the herbivores and the carnivores
+            in each bin, see :class:`biosim.snapshot.Snapshot`
+        """
+        for prop, (herb_step, carn_step) in self._hist_steps.items():
+            herb_counts, carn_counts = hist[prop]
+            herb_step.set_data(values=herb_counts)
+            carn_step.set_data(values=carn_counts)
+
+    def _update_line_graph(self, year, num_herb=0, num_carn=0):
+        """
+        Update the line graph/the animal count graph.
+
+        Parameters
+        ----------
+        year : int
+            the year of the counts
+        num_herb : int
+            total number of herbivores on the island
+        num_carn : int
+            total number of carnivores on the island
+        """
+        # Updating the ydata for herbivores
+        ydata_h = self._line_h.get_ydata()
+        ydata_h[year] = num_herb
+        self._line_h.set_ydata(ydata_h)
+
+        # Updating the ydata for carnivores
+        ydata_c = self._line_c.get_ydata()
+        ydata_c[year] = num_carn
+        self._line_c.set_ydata(ydata_c)
+
+        # The part of the graph since the year before, blitted onto the
+        # background (nan if the year before is not shown, as in the graph)
+        first = max(year - 1, 0)
+        self._segment_h.set_data(np.arange(first, year + 1),
+                                 ydata_h[first:year + 1])
+        self._segment_c.set_data(np.arange(first, year + 1),
+                                 ydata_c[first:year + 1])
+
+        # Updating the y-axis limit for the animal count plot if number of
+        # either herbivores or carnivores exceed the self.ymax_animals
+        if num_herb > self.ymax_animals or num_carn > self.ymax_animals:
+            self.ymax_animals = max(num_herb, num_carn) + 2000
+            self._line_ax.set_ylim(0, round(self.ymax_animals, -3))
+            self._full_redraw = True
+
+    def line_history(self):
+        """
+        Gives the animal counts shown in the line graph.
+
+        Returns
+        -------
+        herbs : array of float
+            number of herbivores each year, nan for years not shown
+        carns : array of float
+            number of carnivores each year, nan for years not shown
+        """
+        if self._line_h is None:
+            return np.zeros(0), np.zeros(0)
+        return np.array(self._line_h.get_ydata()), np.array(self._line_c.get_ydata())
+
+    def set_count_limit(self, ymax_animals):
+        """
+        Sets the y-axis limit of the animal count graph, as it is set when a
+        count goes above the limit.
+
+        Parameters
+        ----------
+        ymax_animals : float
+            the new limit, rounded to thousands on the axis
+        """
+        self.ymax_animals = ymax_animals
+        self._line_ax.set_ylim(0, round(ymax_animals, -3))
+        self._full_redraw = True
+
+    def set_line_history(self, herbs, carns):
+        """
+        Shows earlier animal counts in the line graph, e.g. those of a
+        simulation restored from a checkpoint. Must be called after
+        :meth:`setup_graphics`; years after the end of the graph are left out.
+
+        Parameters
+        ----------
+        herbs : array of float
+            number of herbivores each year, nan for years not shown
+        carns : array of float
+            number of carnivores each year, nan for years not shown
+        """
+        for line, counts in ((self._line_h, herbs), (self._line_c, carns)):
+            ydata = np.array(line.get_ydata(), dtype=float)
+            num_years = min(len(ydata), len(counts))
+            ydata[:num_years] = counts[:num_years]
+            line.set_ydata(ydata)
+
+        shown = np.concatenate((herbs, carns))
+        shown = shown[~np.isnan(shown)]
+        if len(shown) > 0 and shown.max() > self.ymax_animals:
+            self.ymax_animals = shown.max() + 2000
+            self._line_ax.set_ylim(0, round(self.ymax_animals, -3))
+        self._full_redraw = True
+
+    def draw(self, snapshot):
+        """
+        Updates all the plots to show a snapshot of the island.
+
+        Parameters
+        ----------
+        snapshot : Snapshot
+            the state of the island to show
+        """
+        self._update_line_graph(snapshot.year, num_herb=snapshot.num_herbs,
+                                num_carn=snapshot.num_carns)
+        self._update_heatmaps(herbi_map=snapshot.herbi_map,
+                              carni_map=snapshot.carni_map)
+        self._update_histograms(snapshot.hist)
+        self._update_count(snapshot.year)
+
+    def update_graphics(self, snapshot):
+        """
+        Updates graphics each year. Uses the methods for updating plots, and
+        shows an interactive figure with blitting, see :meth:`blit`.
+
+        Parameters
+        ----------
+        snapshot : Snapshot
+            the state of the island to show
+        """
+        self.draw(snapshot)
+        if self.interactive:
+            self.blit()
+
+    def _animated_artists(self):
+        """
+        Gives the artists that change from year to year, except the newest
+        part of the animal count graph.
+
+        Returns
+        -------
+        list
+            the artists that have been made
+        """
+        artists = [self._year_txt, self._img_ax_heat1, self._img_ax_heat2]
+        if self._hist_steps is not None:
+            artists += [step for steps in self._hist_steps.values()
+                        for step in steps]
+        return [artist for artist in artists if artist is not None]
+
+    def _on_draw(self, event):
+        """
+        Caches the background when the whole figure is drawn, and draws the
+        animated artists on top of it.
+
+        Parameters
+        ----------
+        event : DrawEvent
+            the draw event of the canvas
+        """
+        canvas = self._fig.canvas
+        if canvas.is_saving():  # animated artists are drawn when saving
+            return
+        self._background = canvas.copy_from_bbox(self._fig.bbox)
+        for artist in self._animated_artists():
+            self._fig.draw_artist(artist)
+
+    def blit(self):
+        """
+        Shows the figure. Normally only the animated artists are drawn, on top
+        of the cached background, and the newest part of the animal count
+        graph is added to the background. The whole figure is drawn if
+        anything else has changed.
+        """
+        canvas = self._fig.canvas
+        if self._background is None or self._full_redraw:
+            self._full_redraw = False
+            canvas.draw()  # caches the background, see _on_draw
+        else:
+            canvas.restore_region(self._background)
+            for segment in (self._segment_h, self._segment_c):
+                self._fig.draw_artist(segment)
+                segment.set_data([], [])  # now part of the background
+            self._background = canvas.copy_from_bbox(self._fig.bbox)
+            for artist in self._animated_artists():
+                self._fig.draw_artist(artist)
+            canvas.blit(self._fig.bbox)
+        canvas.flush_events()
+
+    def rgb_frame(self):
+        """
+        Renders the figure and gives the pixels, without writing a file.
+
+        Returns
+        -------
+        array of uint8
+            RGB value of each pixel, with shape (height, width, 3)
+        """
+        self._fig.canvas.draw()
+        return np.asarray(self._fig.canvas.buffer_rgba())[:, :, :3]
+
+    def save_graphics(self, filename):
+        """
+        Saves the figure to file. PNG files of an Agg figure are written
+        straight from its canvas.
+
+        Parameters
+        ----------
+        filename : str
+            name of the file, the file type is given by the extension
+        """
+        if not self.interactive and filename.lower().endswith('.png'):
+            self._fig.canvas.print_png(filename)
+        else:
+            self._fig.savefig(filename)
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+
+"""
+Recording of the history of a simulation, year by year, in memory-mapped
+NumPy files.
+
+Each recorded quantity is a column: a ``.npy`` file in the directory of the
+history with one row per year. The columns are made with room for a number of
+years, and are made twice as long when they are full, so recording a year
+only writes its row into the mapped files. ``length.npy`` holds the number of
+years recorded, and is updated after the rows of a year are written, so the
+history can be read by another process, with :func:`load_history`, while the
+simulation goes on.
+
+The columns are
+
+year
+    the year of each row
+num_herbs, num_carns
+    number of herbivores and carnivores on the island
+stats
+    mean and standard deviation of the fitness, age and weight of each
+    species, see ``STAT_COLUMNS`` (nan if there are no animals)
+herbi_map, carni_map
+    number of herbivores and carnivores in each cell, if maps are recorded
+hist_fitness, hist_age, hist_weight
+    histogram counts of the herbivores (first row) and carnivores (second
+    row), with the bin edges given in ``meta.json``
+
+The landscape of the island is saved in ``landscape.npy``, so the frames of
+the graphics can be drawn from the history afterwards, see
+:mod:`biosim.plotting`.
+"""
+
+from biosim.snapshot import HIST_PROPERTIES, histograms
+import json
+import os
+import numpy as np
+from numpy.lib.format import open_memmap
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+SPECIES = ('herb', 'carn')
+STAT_COLUMNS = tuple(f'{species}_{prop}_{stat}' for species in SPECIES
+                     for prop in HIST_PROPERTIES for stat in ('mean', 'std'))
+
+_META_NAME = 'meta.json'
+_LENGTH_NAME = 'length.npy'
+_LANDSCAPE_NAME = 'landscape.npy'
+
+
+def _summary(props):
+    """
+    Computes the mean and standard deviation of each property.
+
+    Parameters
+    ----------
+    props : tuple of lists
+        fitness, age and weight of the animals of a species
+
+    Returns
+    -------
+    list of float
+        mean and standard deviation of each property, nan if there are no
+        animals
+    """
+    stats = []
+    for values in props:
+        if values:
+            values = np.asarray(values, dtype=float)
+            stats += [values.mean(), values.std()]
+        else:
+            stats += [np.nan, np.nan]
+    return stats
+
+
+class HistoryRecorder:
+    """
+    Records the animal counts, density maps, summary statistics and
+    histograms of every year of a simulation in memory-mapped columns.
+    """
+
+    def __init__(self, directory, landscape, edges, maps=True, capacity=256,
+                 limits=None):
+        """
+        Makes the directory and the columns of a new history.
+
+        Parameters
+        ----------
+        directory : str or path-like
+            directory of the history, made if it does not exist
+        landscape : 2D array of uint8
+            landscape code of each cell of the island
+        edges : dict
+            bin edges of the histograms, see :func:`biosim.snapshot.hist_edges`
+        maps : bool
+            if True the number of animals in each cell is recorded
+        capacity : int
+            number of years there is room for at first
+        limits : dict or None
+            limits of the graphics the history is recorded for, e.g.
+            {'ymax_animals': 5000, 'cmax_h': 200, 'cmax_c': 50}, kept with
+            the history
+
+        Raises
+        ------
+        ValueError
+            if capacity is less than one.
+        """
+        if capacity < 1:
+            raise ValueError("There must be room for at least one year.")
+
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.edges = edges
+        self.capacity = capacity
+        shape = landscape.shape
+
+        # Shape of a row and type of each column
+        self._columns = {'year': ((), np.int64),
+                         'num_herbs': ((), np.int64),
+                         'num_carns': ((), np.int64),
+                         'stats': ((len(STAT_COLUMNS),), np.float64)}
+        if maps:
+            self._columns['herbi_map'] = (tuple(shape), np.int32)
+            self._columns['carni_map'] = (tuple(shape), np.int32)
+        for prop in HIST_PROPERTIES:
+            self._columns[f'hist_{prop}'] = ((2, len(edges[prop]) - 1), np.int64)
+
+        meta = {'shape': list(shape), 'maps': maps,
+                'columns': list(self._columns),
+                'stat_columns': list(STAT_COLUMNS),
+                'edges': {prop: edges[prop].tolist() for prop in HIST_PROPERTIES},
+                'limits': limits or {}}
+        with open(os.path.join(self.directory, _META_NAME), 'w') as file:
+            json.dump(meta, file)
+        np.save(self._path(_LANDSCAPE_NAME), landscape)
+
+        self._length = open_memmap(self._path(_LENGTH_NAME), mode='w+',
+                                   dtype=np.int64, shape=(1,))
+        self._files = {name: open_memmap(self._path(name + '.npy'), mode='w+',
+                                         dtype=dtype,
+                                         shape=(capacity,) + row_shape)
+                       for name, (row_shape, dtype) in self._columns.items()}
+
+    def _path(self, name):
+        """
+        Gives the path to a file of the history.
+
+        Parameters
+        ----------
+        name : str
+            name of the file
+
+        Returns
+        -------
+        str
+            the path
+        """
+        return os.path.join(self.directory, name)
+
+    def __len__(self):
+        """Number of years recorded."""
+        return int(self._length[0])
+
+    def _grow(self):
+        """
+        Makes room for twice as many years. Each column is copied to a new,
+        longer file, which then replaces it. Readers that have the old file
+        open keep reading it, and see the new years when they open the
+        history again.
+        """
+        capacity = 2 * self.capacity
+        for name, (row_shape, dtype) in self._columns.items():
+            path = self._path(name + '.npy')
+            grown = open_memmap(path + '.tmp', mode='w+', dtype=dtype,
+                                shape=(capacity,) + row_shape)
+            grown[:self.capacity] = self._files[name]
+            grown.flush()
+            os.replace(path + '.tmp', path)
+            self._files[name] = grown
+        self.capacity = capacity
+
+    def record(self, island, year):
+        """
+        Records the state of the island in a year.
+
+        Parameters
+        ----------
+        island : TheIsland
+            the island
+        year : int
+            the year of the simulation
+        """
+        length = len(self)
+        if length == self.capacity:
+            self._grow()
+
+        herb_props = island.collect_fitness_age_weight_herbi()
+        carn_props = island.collect_fitness_age_weight_carni()
+        row = {'year': year,
+               'num_herbs': len(herb_props[0]),
+               'num_carns': len(carn_props[0]),
+               'stats': _summary(herb_props) + _summary(carn_props)}
+        if 'herbi_map' in self._files:
+            row['herbi_map'], row['carni_map'] = \
+                island.herbis_and_carnis_on_island()
+        for prop, counts in histograms(herb_props, carn_props,
+                                       self.edges).items():
+            row[f'hist_{prop}'] = counts
+
+        for name, value in row.items():
+            self._files[name][length] = value
+        self._length[0] = length + 1  # the year is complete
+
+    def flush(self):
+        """Writes the recorded years to the files."""
+        for column in self._files.values():
+            column.flush()
+        self._length.flush()
+
+    def close(self):
+        """Writes the recorded years to the files, and closes them."""
+        self.flush()
+        self._files = {}
+        self._length = None
+
+
+def load_history(directory):
+    """
+    Opens a history recorded by :class:`HistoryRecorder` read-only, e.g.
+    while the simulation is still recording it.
+
+    Parameters
+    ----------
+    directory : str or path-like
+        directory of the history
+
+    Returns
+    -------
+    dict
+        the years recorded of each column, as read-only memory-mapped arrays,
+        'landscape', the landscape codes of the island, and 'meta', the
+        description of the history in ``meta.json``
+    """
+    directory = os.fspath(directory)
+    with open(os.path.join(directory, _META_NAME)) as file:
+        meta = json.load(file)
+    meta['edges'] = {prop: np.array(edges)
+                     for prop, edges in meta['edges'].items()}
+
+    length = int(np.load(os.path.join(directory, _LENGTH_NAME))[0])
+    history = {name: np.load(os.path.join(directory, name + '.npy'),
+                             mmap_mode='r')[:length]
+               for name in meta['columns']}
+    history['landscape'] = np.load(os.path.join(directory, _LANDSCAPE_NAME))
+    history['meta'] = meta
+    return history
@@ -1,7 +1,16 @@
 # -*- coding: utf-8 -*-
 
-from biosim.cell import Highland, Lowland, Desert, Water
-import textwrap
+from biosim.cell import Highland, Lowland, Desert
+from biosim.scheduler import CellScheduler
+from biosim.view import CellAnimals
+from biosim.rng import CounterRandom
+from biosim import landscape as ls
+from biosim.population import columns_to_arrays, load_population_file, CHUNK_SIZE
+from bisect import bisect_left
+from collections import defaultdict
+from operator import methodcaller
+import random
+import numpy as np
 
 __author__ = "Marie Kolvik Valøy, Christine Brinchmann"
 __email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
@@ -10,30 +19,77 @@ __email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
 class TheIsland:
     """ This class will represent an island. """
 
-    def __init__(self, landscape_of_cells, animals_on_island=None):
+    # Cell class for each landscape code, water cells have no cell object
+    _cell_classes = {ls.LOWLAND: Lowland, ls.HIGHLAND: Highland,
+                     ls.DESERT: Desert}
+
+    def __init__(self, landscape_of_cells, animals_on_island=None,
+                 rng_mode='global', seed=0, storage='dense'):
         """
         Create an island consisting of cells with attributes decided by
         the type of landscape.
 
         Parameters
         ----------
-        landscape_of_cells : str
-            multiline python string representing the landscape of the island.
+        landscape_of_cells : str or 2D array
+            multiline python string representing the landscape of the island,
+            or array of landscape codes (see :mod:`biosim.landscape`), e.g.
+            read from a map file with :meth:`from_map_file`.
         animals_on_island : list of dicts
             list of dictionaries with location of cell and population of
             animals in that cell.
-        """
-        # Check conditions for geography of island
-        self.check_if_island_legal(landscape_of_cells)
-
-        # Make landscape into list of lists
-        self.landscape = self.landscape_to_list_of_lists(landscape_of_cells)
-        self.row, self.col = len(self.landscape), len(self.landscape[0])
+        rng_mode : str
+            'global' to draw all random numbers from the random module,
+            'counter' to give each cell its own random stream in each phase of
+            each year, see :class:`biosim.rng.CounterRandom`.
+        seed : int
+            seed for the random streams, only used if rng_mode is 'counter'.
+        storage : str
+            'dense' to store the cells in ``island_cells`` as a list of lists
+            with one element per cell (None for water), 'sparse' to store
+            the land cells in a dict keyed by their number in the lookup
+            array ``cell_index``. With sparse storage a cell object is only
+            made when animals first come to the cell. Sparse storage suits maps
+            that are mostly water, and very large maps.
 
-        # Create island attribute, then construction of cells
+        Raises
+        ------
+        ValueError
+            if rng_mode is not 'global' or 'counter', or storage is not
+            'dense' or 'sparse'.
+        """
+        if rng_mode not in ('global', 'counter'):
+            raise ValueError(f"Unknown rng_mode: {rng_mode}")
+        if storage not in ('dense', 'sparse'):
+            raise ValueError(f"Unknown storage: {storage}")
+        self.storage = storage
+        self.rng_mode = rng_mode
+        self.seed = seed
+        self.year = 0  # number of annual cycles run, keys the random streams
+        # Source of random numbers if rng_mode is 'global', the random module
+        # unless the island is given a generator of its own
+        self.rng = random
+
+        # Make landscape into array of landscape codes, and check conditions
+        # for geography of island
+        self.landscape = self.landscape_to_array(landscape_of_cells)
+        ls.check_codes(self.landscape)
+        self.row, self.col = self.landscape.shape
+
+        # Create island attributes, then construction of cells
         self.island_cells = None
+        self.cell_index = None  # index in island_cells, only sparse storage
+        self._land_cells = None  # (row, column, cell) for every cell object
+        self._land_keys = None  # row * col + column for every cell object
         self.construct_island_with_cells()
 
+        # Scheduler spreading the cells over worker threads, and the
+        # estimated cost of processing each cell (updated at the start of
+        # every year). The threads only run one at a time, so the island has
+        # no scheduler unless one is set, e.g. to study the load balance.
+        self.scheduler = None
+        self._cell_costs = None
+
         # Add animals to island
         if animals_on_island:
             self.add_animals_on_island(animals_on_island)
@@ -52,70 +108,140 @@ class TheIsland:
         ValueError
             if any of the specifications is violated.
         """
-        geography = textwrap.dedent(geography)
-        geography_split = geography.split('\n')
+        ls.check_codes(ls.string_to_codes(geography))
 
-        len_first_line = len(geography_split[0])
-        for line in geography_split:
-            if len(line) != len_first_line:
-                raise ValueError("All lines must have the same length.")
+    @classmethod
+    def from_map_file(cls, path, fmt='text', shape=None, **kwargs):
+        """
+        Create an island with the landscape read from a map file. The file is
+        opened as a memory map and read a chunk of rows at a time, see
+        :func:`biosim.landscape.file_to_codes`. Use sparse storage to avoid
+        making a cell object for every land cell of a very large map.
 
-        for top, bottom in zip(geography_split[0], geography_split[-1]):
-            if top != 'W' or bottom != 'W':
-                raise ValueError("North or south of island is not only water.")
+        Parameters
+        ----------
+        path : str or path-like
+            path to the map file
+        fmt : str
+            'text' for lines of landscape characters, 'raw' for landscape
+            codes as bytes
+        shape : tuple of ints or None
+            number of rows and columns of the map, needed for 'raw' files
+        kwargs
+            other arguments to :class:`TheIsland`, e.g. animals_on_island and
+            storage
 
-        for line in geography_split:
-            if line[0] != 'W' or line[-1] != 'W':
-                raise ValueError("West or east side of island is not only water.")
+        Returns
+        -------
+        TheIsland
+            the island
 
-        for line in geography_split:
-            for element in line:
-                if element not in ['W', 'D', 'L', 'H']:
-                    raise ValueError("Forbidden character, only 'W', 'D', 'L' and 'H' allowed.")
+        Raises
+        ------
+        ValueError
+            if the map file is not a legal island.
+        """
+        return cls(ls.file_to_codes(path, fmt=fmt, shape=shape), **kwargs)
 
     @staticmethod
-    def landscape_to_list_of_lists(landscape):
+    def landscape_to_array(landscape):
         """
-        Makes a landscape string into a nested list (list of lists).
+        Makes a landscape string into an array of landscape codes, see
+        :mod:`biosim.landscape`. An array of codes is returned as it is.
 
         Parameters
         ----------
-        landscape : str
+        landscape : str or 2D array
             multiline string representing the landscape of the island
 
         Returns
         -------
-        list of lists
-            an inner list is a row and an element of an inner list is the
-            landscape of that cell.
+        array of uint8
+            a row in the array is a row of the island and an element is the
+            landscape code of that cell.
+
+        Raises
+        ------
+        ValueError
+            if the lines of the landscape string are not of equal length.
         """
-        landscape = textwrap.dedent(landscape)
-        landscape_split = landscape.split('\n')
-        return [list(line) for line in landscape_split]
+        if isinstance(landscape, np.ndarray):
+            return landscape
+        return ls.string_to_codes(landscape)
 
     def construct_island_with_cells(self):
         """
         Construction of the island by initialising a class for each of the
-        landscape types. For each cell the class is initialized without any
-        animals.
-        """
-        self.island_cells = [[] for _ in range(self.row)]
-
-        for x, row in enumerate(self.landscape):
-            for cell in row:
-                if cell == 'W':
-                    self.island_cells[x].append(Water(animals_list=[]))
-                elif cell == 'L':
-                    self.island_cells[x].append(Lowland(animals_list=[]))
-                elif cell == 'H':
-                    self.island_cells[x].append(Highland(animals_list=[]))
-                elif cell == 'D':
-                    self.island_cells[x].append(Desert(animals_list=[]))
+        land cells. For each cell the class is initialized without any
+        animals. Water cells have no cell object, since nothing happens in
+        them.
+
+        With dense storage the cells are stored in a list of lists with None
+        for water cells. With sparse storage ``cell_index`` gives the index
+        of the land cell in each position, counted row by row (-1 for water),
+        and ``island_cells`` maps the index to the cell. With sparse storage
+        the cells are not made here, but the first time animals come to them.
+        """
+        land = self.landscape != ls.WATER
+        self._land_cells = []
+        self._land_keys = []
+
+        if self.storage == 'sparse':
+            self.island_cells = {}
+            self.cell_index = np.cumsum(land, dtype=np.int32).reshape(land.shape) - 1
+            self.cell_index[~land] = -1
+            return
+
+        self.island_cells = [[None] * self.col for _ in range(self.row)]
+        rows, cols = np.nonzero(land)
+        for x, y, code in zip(rows.tolist(), cols.tolist(),
+                              self.landscape[rows, cols].tolist()):
+            cell = self._cell_classes[code](animals_list=[])
+            self.island_cells[x][y] = cell
+            self._land_cells.append((x, y, cell))
+            self._land_keys.append(x * self.col + y)
+
+    def cell_at(self, x, y, create=False):
+        """
+        Gives the cell in a position on the island.
+
+        Parameters
+        ----------
+        x : int
+            row number as python uses it
+        y : int
+            column number as python uses it
+        create : bool
+            with sparse storage, make the cell if it has not been made yet
+
+        Returns
+        -------
+        SingleCell or None
+            the cell, None if it is a water cell or a cell not made yet
+        """
+        if self.cell_index is None:
+            return self.island_cells[x][y]
+        index = int(self.cell_index[x, y])
+        if index < 0:
+            return None
+        cell = self.island_cells.get(index)
+        if cell is None and create:
+            cell = self._cell_classes[int(self.landscape[x, y])](animals_list=[])
+            self.island_cells[index] = cell
+            key = x * self.col + y
+            position = bisect_left(self._land_keys, key)
+            self._land_keys.insert(position, key)
+            self._land_cells.insert(position, (x, y, cell))
+        return cell
 
     def add_animals_on_island(self, new_animals):
         """
         Inserting animals on island by adding animals to specified cells.
 
+        The population of a cell is either a list with one dictionary per
+        animal, or a dictionary with the columns of each species, see
+        :mod:`biosim.population`. Columns are added to the cell in bulk.
+
         Parameters
         ----------
         new_animals : list of dicts
@@ -135,12 +261,161 @@ class TheIsland:
             if y < 0 or y > self.col:
                 raise ValueError('y-coordinate (column-coordinate) not valid')
 
-            landscape_type = self.landscape[x - 1][y - 1]  # Landscape type of cell
-            if landscape_type == 'W':
+            landscape_type = self.landscape[x - 1, y - 1]  # Landscape type of cell
+            if landscape_type == ls.WATER:
                 raise ValueError("Animals can't stay in water")
             else:
                 # add new animals to cell
-                self.island_cells[x - 1][y - 1].add_animals_to_cell(dictionary['pop'])
+                cell = self.cell_at(x - 1, y - 1, create=True)
+                population = dictionary['pop']
+                if isinstance(population, dict):
+                    # Every species is checked before any animals are added
+                    cell.add_animals_by_species(
+                        {species: columns_to_arrays(columns)
+                         for species, columns in population.items()})
+                else:
+                    cell.add_animals_to_cell(population)
+
+    def check_locations(self, rows, cols):
+        """
+        Checks that animals can be placed in the given cells, all at once.
+
+        Parameters
+        ----------
+        rows : array of int
+            row number of each cell, starting from 1 as in 'loc'
+        cols : array of int
+            column number of each cell, starting from 1 as in 'loc'
+
+        Raises
+        ------
+        ValueError
+            if any cell is outside the island or is a water cell.
+        """
+        rows, cols = np.asarray(rows), np.asarray(cols)
+        if np.any((rows < 1) | (rows > self.row)):
+            raise ValueError('x-coordinate (row-coordinate) not valid')
+        if np.any((cols < 1) | (cols > self.col)):
+            raise ValueError('y-coordinate (column-coordinate) not valid')
+        if np.any(self.landscape[rows - 1, cols - 1] == ls.WATER):
+            raise ValueError("Animals can't stay in water")
+
+    def load_population_file(self, path, fmt=None, chunk_size=CHUNK_SIZE):
+        """
+        Adds the animals in a CSV or JSON-lines population file to the
+        island, reading and adding a chunk of animals at a time, see
+        :func:`biosim.population.load_population_file`.
+
+        Parameters
+        ----------
+        path : str or path-like
+            path to the population file
+        fmt : str or None
+            'csv' or 'jsonl', if None found from the file extension
+        chunk_size : int
+            number of animals read and added at a time
+
+        Returns
+        -------
+        int
+            number of animals added
+        """
+        return load_population_file(self, path, fmt=fmt, chunk_size=chunk_size)
+
+    def _process_cells(self, method_name, phase):
+        """
+        Calls a method on every land cell of the island with animals in it,
+        nothing happens in a cell without animals. If the island has a
+        scheduler, the cells are spread over its worker threads, balanced by
+        the estimated cost of each cell.
+
+        If rng_mode is 'counter', each cell is given its own random stream
+        for the phase before the method is called, so the result does not
+        depend on the order the cells are processed in. Else each cell is
+        given the random source of the island, ``rng``.
+
+        Parameters
+        ----------
+        method_name : str
+            name of the cell method to call
+        phase : str
+            phase of the annual cycle, see ``biosim.rng.PHASES``
+
+        Returns
+        -------
+        results : list of tuples
+            row, column and return value of the method for each cell
+            processed, row by row
+
+        Raises
+        ------
+        ValueError
+            if the island has a scheduler and rng_mode is 'global', since
+            workers drawing from the shared random module in turns that vary
+            from run to run would make the seed useless.
+        """
+        if self.scheduler is not None and self.rng_mode != 'counter':
+            raise ValueError("A scheduler needs rng_mode 'counter'.")
+        active = [i for i, (_, _, cell) in enumerate(self._land_cells)
+                  if cell.herbi_list or cell.carni_list]
+        cells = [(x * self.col + y, cell)
+                 for x, y, cell in (self._land_cells[i] for i in active)]
+        call = methodcaller(method_name)
+
+        if self.rng_mode == 'counter':
+            year = self.year
+
+            def process(index_and_cell):
+                index, cell = index_and_cell
+                cell.rng = CounterRandom(self.seed, year, index, phase)
+                return call(cell)
+        else:
+            rng = self.rng
+
+            def process(index_and_cell):
+                cell = index_and_cell[1]
+                cell.rng = rng
+                return call(cell)
+
+        if self.scheduler is None:
+            results = [process(cell) for cell in cells]
+        else:
+            if self._cell_costs is None or \
+                    len(self._cell_costs) != len(self._land_cells):
+                self.update_cell_costs()  # new cells made since last estimate
+            results = self.scheduler.run(process, cells,
+                                         self._cell_costs[active])
+
+        return [(self._land_cells[i][0], self._land_cells[i][1], result)
+                for i, result in zip(active, results)]
+
+    def update_cell_costs(self):
+        """
+        Estimates the cost of processing each land cell from the current
+        number of herbivores and carnivores in the cells. Used by the
+        scheduler of the island, if it has one.
+        """
+        num_herbis, num_carnis = self._count_animals()
+        self._cell_costs = CellScheduler.estimate_costs(num_herbis, num_carnis)
+
+    def _count_animals(self):
+        """
+        Counts the herbivores and carnivores in each land cell.
+
+        Returns
+        -------
+        num_herbis : array
+            number of herbivores in each land cell, row by row
+        num_carnis : array
+            number of carnivores in each land cell, row by row
+        """
+        num_herbis = np.fromiter((len(cell.herbi_list)
+                                  for _, _, cell in self._land_cells),
+                                 dtype=int, count=len(self._land_cells))
+        num_carnis = np.fromiter((len(cell.carni_list)
+                                  for _, _, cell in self._land_cells),
+                                 dtype=int, count=len(self._land_cells))
+        return num_herbis, num_carnis
 
     def all_animals_eat(self):
         """
@@ -148,9 +423,7 @@ class TheIsland:
         Looping through the cells of the island and letting the animals in
         each cell eat.
         """
-        for row in self.island_cells:
-            for cell in row:
-                cell.animals_in_cell_eat()
+        self._process_cells('animals_in_cell_eat', 'eat')
 
     def animals_procreate(self):
         """
@@ -158,9 +431,7 @@ class TheIsland:
         Looping through the cells of the island and giving the animals in the
         cells the change to procreate.
         """
-        for row in self.island_cells:
-            for cell in row:
-                cell.birth()
+        self._process_cells('birth', 'procreate')
 
     def where_can_animals_migrate_to(self, row, col):
         """
@@ -183,16 +454,16 @@ class TheIsland:
         """
         directions = []
         # if adjacent cell is not water the direction is added
-        if self.landscape[row - 1][col] != 'W':
+        if self.landscape[row - 1, col] != ls.WATER:
             directions.append('North')
 
-        if self.landscape[row][col + 1] != 'W':
+        if self.landscape[row, col + 1] != ls.WATER:
             directions.append('East')
 
-        if self.landscape[row + 1][col] != 'W':
+        if self.landscape[row + 1, col] != ls.WATER:
             directions.append('South')
 
-        if self.landscape[row][col - 1] != 'W':
+        if self.landscape[row, col - 1] != ls.WATER:
             directions.append('West')
 
         return directions
@@ -204,24 +475,25 @@ class TheIsland:
         cell later in the 'real' island. This is to avoid animals migrating
         more than once.
         """
-        # Make ghost island to store migrating animals
-        ghost_island = [[[] for _ in range(self.col)] for _ in range(self.row)]
+        # Make ghost island to store migrating animals, only the cells
+        # animals migrate to are created
+        ghost_island = defaultdict(lambda: defaultdict(list))
+
+        # Finding animals wanting to migrate from each land cell
+        migrating = self._process_cells('animals_migrate', 'migrate')
 
         # Placing migrating animals on the ghost island
-        for x, row in enumerate(self.island_cells):
-            for y, cell in enumerate(row):
-                if self.landscape[x][y] != 'W':
-                    pos_dir = self.where_can_animals_migrate_to(x, y)
-                    # Finding animals wanting to migrate
-                    north, east, south, west = cell.animals_migrate()
-                    # Adding animals to ghost island
-                    ghost_island = self.relocated_animals(x, y, pos_dir, north,
-                                                          east, south, west,
-                                                          ghost_island)
+        for x, y, (north, east, south, west) in migrating:
+            if north or east or south or west:
+                pos_dir = self.where_can_animals_migrate_to(x, y)
+                # Adding animals to ghost island
+                ghost_island = self.relocated_animals(x, y, pos_dir, north,
+                                                      east, south, west,
+                                                      ghost_island)
         # Adding migrating animals to the 'real' island
-        for x, row in enumerate(self.island_cells):
-            for y, cell in enumerate(row):
-                cell.add_animals_after_migration(ghost_island[x][y])
+        for x, row in ghost_island.items():
+            for y, animals in row.items():
+                self.cell_at(x, y, create=True).add_animals_after_migration(animals)
 
     @staticmethod
     def relocated_animals(x, y, pos_dir, north, east, south, west, ghost_island):
@@ -247,12 +519,13 @@ class TheIsland:
             animals wanting to move south
         west : list
             animals wanting to move west
-        ghost_island : list of lists
-            a replicate of the island, with lists of animals in each position.
+        ghost_island : list of lists or nested dict
+            a replicate of the island, with lists of animals in each position,
+            ``ghost_island[x][y]``.
 
         Returns
         -------
-        ghost_island : list of lists
+        ghost_island : list of lists or nested dict
             updated ghost island with the animals added to cells for which
             they were allowed to move to.
         """
@@ -284,9 +557,7 @@ class TheIsland:
         Looping through the cells of the island and letting the animals in the
         cells age.
         """
-        for row in self.island_cells:
-            for cell in row:
-                cell.aging_of_animals()
+        self._process_cells('aging_of_animals', 'age')
 
     def all_animals_losses_weight(self):
         """
@@ -294,10 +565,7 @@ class TheIsland:
         Looping through the cells of the island and letting the animals in the
         cells lose weight.
         """
-        for row in self.island_cells:
-            for cell in row:
-                if cell:  # nothing happens in water cell
-                    cell.weight_loss_end_of_year()
+        self._process_cells('weight_loss_end_of_year', 'weight_loss')
 
     def animals_die(self):
         """
@@ -305,9 +573,7 @@ class TheIsland:
         Looping through the cells of the island and giving the animals in the
         cells a change to die.
         """
-        for row in self.island_cells:
-            for cell in row:
-                cell.death()
+        self._process_cells('death', 'death')
 
     def annual_cycle(self):
         """
@@ -319,7 +585,13 @@ class TheIsland:
             4. Animals age
             5. Animals looses weight
             6. Animals die
+
+        If the island has a scheduler, the cost of each cell is estimated
+        from the population at the start of the year.
         """
+        if self.scheduler is not None:
+            self.update_cell_costs()
+
         self.all_animals_eat()
         self.animals_procreate()
         self.migration()
@@ -327,9 +599,13 @@ class TheIsland:
         self.all_animals_losses_weight()
         self.animals_die()
 
+        self.year += 1
+
     def give_animals_in_cell(self, row, col):
         """
-        Give lists of herbivores and carnivores in a given cell
+        Give read-only views of the herbivores and carnivores in a given cell.
+        The views read the animals from the cell when used, see
+        :class:`biosim.view.CellAnimals`.
 
         Parameters
         ----------
@@ -340,14 +616,13 @@ class TheIsland:
 
         Returns
         -------
-        herbis : list
-            list of herbivores in cell
-        carnis : list
-            list of carnivores in cell
+        herbis : CellAnimals
+            view of the herbivores in cell
+        carnis : CellAnimals
+            view of the carnivores in cell
         """
-        herbis = self.island_cells[row - 1][col - 1].herbi_list
-        carnis = self.island_cells[row - 1][col - 1].carni_list
-        return herbis, carnis
+        return (CellAnimals(self, row - 1, col - 1, 'Herbivore'),
+                CellAnimals(self, row - 1, col - 1, 'Carnivore'))
 
     def herbis_and_carnis_on_island(self):
         """
@@ -357,18 +632,19 @@ class TheIsland:
 
         Returns
         -------
-        herbi_island : list
+        herbi_island : 2D array
             island with number of herbivores in each cell
-        carni_island : list
+        carni_island : 2D array
             island with number of carnivores in each cell
         """
-        herbi_island = [[] for _ in range(self.row)]
-        carni_island = [[] for _ in range(self.row)]
+        herbi_island = np.zeros((self.row, self.col), dtype=int)
+        carni_island = np.zeros((self.row, self.col), dtype=int)
 
-        for x, row in enumerate(self.island_cells):
-            for cell in row:
-                herbi_island[x].append(len(cell.herbi_list))
-                carni_island[x].append(len(cell.carni_list))
+        rows = [x for x, _, _ in self._land_cells]
+        cols = [y for _, y, _ in self._land_cells]
+        num_herbis, num_carnis = self._count_animals()
+        herbi_island[rows, cols] = num_herbis
+        carni_island[rows, cols] = num_carnis
 
         return herbi_island, carni_island
 
@@ -388,13 +664,9 @@ class TheIsland:
         tot_carni : int
             total number of carnivores on the island
         """
-        tot_herbi = 0
-        tot_carni = 0
-
-        for row in self.island_cells:
-            for cell in row:
-                tot_herbi += len(cell.herbi_list)
-                tot_carni += len(cell.carni_list)
+        num_herbis, num_carnis = self._count_animals()
+        tot_herbi = int(num_herbis.sum())
+        tot_carni = int(num_carnis.sum())
 
         tot_animal = tot_herbi + tot_carni
 
@@ -418,12 +690,11 @@ class TheIsland:
         age_herbi = []
         weight_herbi = []
 
-        for row in self.island_cells:
-            for cell in row:
-                fitness, age, weight = cell.collect_fitness_age_weight_herbi()
-                fitness_herbi += fitness
-                age_herbi += age
-                weight_herbi += weight
+        for _, _, cell in self._land_cells:
+            fitness, age, weight = cell.collect_fitness_age_weight_herbi()
+            fitness_herbi += fitness
+            age_herbi += age
+            weight_herbi += weight
 
         return fitness_herbi, age_herbi, weight_herbi
 
@@ -445,11 +716,10 @@ class TheIsland:
         age_carni = []
         weight_carni = []
 
-        for row in self.island_cells:
-            for cell in row:
-                fitness, age, weight = cell.collect_fitness_age_weight_carni()
-                fitness_carni += fitness
-                age_carni += age
-                weight_carni += weight
+        for _, _, cell in self._land_cells:
+            fitness, age, weight = cell.collect_fitness_age_weight_carni()
+            fitness_carni += fitness
+            age_carni += age
+            weight_carni += weight
 
         return fitness_carni, age_carni, weight_carni
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compact representation of the landscape of the island. Each cell is stored as
+a code in an array of ``uint8``, and the map is validated with array
+operations instead of character by character. Large maps can be read from
+map files through a memory map, a chunk of rows at a time.
+"""
+
+import os
+import textwrap
+
+import numpy as np
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+# Codes for the landscape types
+WATER, LOWLAND, HIGHLAND, DESERT = 0, 1, 2, 3
+LANDSCAPE_CODES = {'W': WATER, 'L': LOWLAND, 'H': HIGHLAND, 'D': DESERT}
+LANDSCAPE_CHARS = 'WLHD'  # character of each code, LANDSCAPE_CHARS[code]
+INVALID = 255  # code of characters that are not landscape types
+CHUNK_ROWS = 1024  # number of rows of a map file read at a time
+
+# Lookup table from character (byte) to landscape code
+_CODE_TABLE = np.full(256, INVALID, dtype=np.uint8)
+for _char, _code in LANDSCAPE_CODES.items():
+    _CODE_TABLE[ord(_char)] = _code
+
+
+def chars_to_codes(chars):
+    """
+    Translates an array of characters (bytes) to landscape codes.
+
+    Parameters
+    ----------
+    chars : array of uint8
+        characters of the map, as bytes
+
+    Returns
+    -------
+    array of uint8
+        landscape code of each character, ``INVALID`` for characters that are
+        not landscape types.
+    """
+    return _CODE_TABLE[chars]
+
+
+def string_to_codes(geography):
+    """
+    Makes a multiline landscape string into a 2D array of landscape codes.
+    Indentation common to all lines is removed first.
+
+    Parameters
+    ----------
+    geography : str
+        multiline string representing the landscape of the island
+
+    Returns
+    -------
+    array of uint8
+        landscape code of each cell, one row of the array per line.
+
+    Raises
+    ------
+    ValueError
+        if the lines are not of equal length, or the map is empty.
+    """
+    # Characters that are not ASCII become a single '?' each, so the lines
+    # are measured in characters and the character is found forbidden
+    data = np.frombuffer(textwrap.dedent(geography).encode('ascii', 'replace'),
+                         dtype=np.uint8)
+
+    newlines = np.flatnonzero(data == ord('\n'))
+    line_ends = np.append(newlines, len(data))
+    line_lengths = np.diff(line_ends, prepend=-1) - 1
+    if np.any(line_lengths != line_lengths[0]):
+        raise ValueError("All lines must have the same length.")
+    if line_lengths[0] == 0:
+        raise ValueError("The map of the island is empty.")
+
+    # Every line, the last included, ends with a newline in the padded data
+    rows = np.append(data, np.uint8(ord('\n'))).reshape(len(line_ends), -1)
+    return chars_to_codes(rows[:, :-1])
+
+
+def check_codes(codes, chunk_rows=CHUNK_ROWS):
+    """
+    Checks if a landscape follows the specifications.
+        - only have water around edges
+        - no other characters than 'L', 'H', 'D' and 'W'
+
+    The rows are checked a chunk at a time, so a memory-mapped landscape is
+    read once and never held in memory as a whole.
+
+    Parameters
+    ----------
+    codes : 2D array of uint8
+        landscape code of each cell
+    chunk_rows : int
+        number of rows checked at a time
+
+    Raises
+    -------
+    ValueError
+        if any of the specifications is violated.
+    """
+    if codes.ndim != 2 or codes.size == 0:
+        raise ValueError("The map of the island must be a non-empty 2D map.")
+
+    if np.any(codes[0] != WATER) or np.any(codes[-1] != WATER):
+        raise ValueError("North or south of island is not only water.")
+
+    for start in range(0, codes.shape[0], chunk_rows):
+        chunk = np.asarray(codes[start:start + chunk_rows])
+        if np.any(chunk[:, 0] != WATER) or np.any(chunk[:, -1] != WATER):
+            raise ValueError("West or east side of island is not only water.")
+
+        if np.any(chunk >= len(LANDSCAPE_CHARS)):
+            raise ValueError("Forbidden character, only 'W', 'D', 'L' and 'H' allowed.")
+
+
+def file_to_codes(path, fmt='text', shape=None, chunk_rows=CHUNK_ROWS):
+    """
+    Reads the landscape of the island from a map file, opened with
+    ``np.memmap`` so only a chunk of rows is read into memory at a time.
+
+    Two formats are supported:
+        - 'text': lines of 'W', 'L', 'H' and 'D' characters, as the
+          multiline map string but without indentation. The lines are
+          translated to landscape codes a chunk at a time, and must all have
+          the same length.
+        - 'raw': the landscape codes as bytes, row by row, without any
+          header. The shape of the map must be given. The returned array is
+          the memory map itself, so the codes are only read when used.
+
+    The returned codes should be checked with :func:`check_codes`.
+
+    Parameters
+    ----------
+    path : str or path-like
+        path to the map file
+    fmt : str
+        'text' or 'raw', format of the file
+    shape : tuple of ints or None
+        number of rows and columns of the map, needed for 'raw' files
+    chunk_rows : int
+        number of rows read at a time
+
+    Returns
+    -------
+    2D array of uint8
+        landscape code of each cell
+
+    Raises
+    ------
+    ValueError
+        if the format is unknown, the shape is missing or does not fit the
+        size of a raw file, or the lines of a text file are not of equal
+        length.
+    """
+    if fmt == 'raw':
+        if shape is None:
+            raise ValueError("The shape of the map must be given for raw files.")
+        if os.path.getsize(path) != shape[0] * shape[1]:
+            raise ValueError("The size of the raw map file does not match its shape.")
+        return np.memmap(path, dtype=np.uint8, mode='r', shape=tuple(shape))
+    if fmt != 'text':
+        raise ValueError(f"Unknown map file format: {fmt}")
+
+    size = os.path.getsize(path)
+    if size == 0:
+        raise ValueError("The map of the island is empty.")
+    data = np.memmap(path, dtype=np.uint8, mode='r')
+
+    # The first newline gives the length of the lines
+    num_cols, start = size, 0
+    while start < size:
+        newlines = np.flatnonzero(data[start:start + 65536] == ord('\n'))
+        if len(newlines) > 0:
+            num_cols = start + int(newlines[0])
+            break
+        start += 65536
+    if num_cols == 0:
+        raise ValueError("The map of the island is empty.")
+
+    # Every line but perhaps the last ends with a newline
+    line_len = num_cols + 1
+    if size % line_len == 0:
+        num_rows = size // line_len
+    elif size % line_len == num_cols:
+        num_rows = size // line_len + 1
+    else:
+        raise ValueError("All lines must have the same length.")
+
+    codes = np.empty((num_rows, num_cols), dtype=np.uint8)
+    for row in range(0, num_rows, chunk_rows):
+        end = min(row + chunk_rows, num_rows)
+        chunk = np.asarray(data[row * line_len:end * line_len])
+        if len(chunk) < (end - row) * line_len:  # last line without newline
+            chunk = np.append(chunk, np.uint8(ord('\n')))
+        chunk = chunk.reshape(end - row, line_len)
+        if np.any(chunk[:, -1] != ord('\n')):
+            raise ValueError("All lines must have the same length.")
+        codes[row:end] = chars_to_codes(chunk[:, :-1])
+
+    return codes
+
+
+def codes_to_string(codes):
+    """
+    Makes an array of landscape codes into a multiline landscape string.
+
+    Parameters
+    ----------
+    codes : 2D array of uint8
+        landscape code of each cell
+
+    Returns
+    -------
+    str
+        multiline string representing the landscape of the island
+    """
+    chars = np.frombuffer(LANDSCAPE_CHARS.encode(), dtype=np.uint8)[codes]
+    return '\n'.join(row.tobytes().decode() for row in chars)
@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+
+"""
+Movie writers streaming frames straight into the movie.
+
+Instead of saving every frame as an image file and encoding the files when
+the simulation is finished, the frames are given to the writers as arrays of
+RGB values as they are made. :class:`MovieWriter` writes them to the standard
+input of an ``ffmpeg`` process that runs for as long as the movie is
+recorded. :class:`AnimationWriter` writes animated GIF and PNG (APNG) files
+itself, with Pillow, one frame at a time.
+
+:func:`images_to_movie` makes a movie of image files saved earlier.
+"""
+
+import glob
+import struct
+import subprocess
+import zlib
+
+import numpy as np
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+_DEFAULT_ENCODER = 'ffmpeg'
+_DEFAULT_FPS = 25  # frame rate ffmpeg uses for image files when not given
+
+
+class MovieWriter:
+    """
+    Writes the frames of a movie to an encoder process. The encoder is
+    started when the first frame is written, since the size of the frames is
+    only known then, and all frames must have the same size.
+    """
+
+    def __init__(self, filename, fps=_DEFAULT_FPS, encoder=_DEFAULT_ENCODER):
+        """
+        Parameters
+        ----------
+        filename : str
+            file name of the movie, including the extension, e.g. 'sim.mp4'
+        fps : int
+            frames per second of the movie
+        encoder : str
+            path to the ffmpeg binary, or a program taking the same arguments
+        """
+        self.filename = filename
+        self.fps = fps
+        self.encoder = encoder
+        self.num_frames = 0
+        self._shape = None
+        self._process = None
+
+    def _command(self, height, width):
+        """
+        Makes the command starting the encoder.
+
+        Parameters
+        ----------
+        height : int
+            height of the frames in pixels
+        width : int
+            width of the frames in pixels
+
+        Returns
+        -------
+        list of str
+            the command
+        """
+        return [self.encoder, '-y',
+                '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                '-s', f'{width}x{height}', '-r', str(self.fps),
+                '-i', '-',
+                # yuv420p needs an even number of rows and columns
+                '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+                '-profile:v', 'baseline', '-level', '3.0',
+                '-pix_fmt', 'yuv420p',
+                self.filename]
+
+    def write_frame(self, rgb):
+        """
+        Writes a frame to the encoder.
+
+        Parameters
+        ----------
+        rgb : array of uint8
+            the frame, with shape (height, width, 3)
+
+        Raises
+        ------
+        ValueError
+            if the frame is not RGB, or not of the same size as the first
+            frame.
+        RuntimeError
+            if the encoder has stopped.
+        """
+        if rgb.ndim != 3 or rgb.shape[2] != 3:
+            raise ValueError("A frame must be an array of RGB values.")
+        if self._process is None:
+            self._shape = rgb.shape
+            self._process = subprocess.Popen(self._command(*rgb.shape[:2]),
+                                             stdin=subprocess.PIPE,
+                                             stdout=subprocess.DEVNULL,
+                                             stderr=subprocess.DEVNULL)
+        elif rgb.shape != self._shape:
+            raise ValueError("All frames of a movie must have the same size.")
+
+        try:
+            self._process.stdin.write(np.ascontiguousarray(rgb, dtype=np.uint8)
+                                      .tobytes())
+        except BrokenPipeError:
+            raise RuntimeError(f"ERROR: {self.encoder} stopped with code "
+                               f"{self._process.wait()}")
+        self.num_frames += 1
+
+    def close(self):
+        """
+        Ends the movie, and waits for the encoder to finish writing it.
+
+        Raises
+        ------
+        RuntimeError
+            if the encoder failed.
+        """
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        if process.wait() != 0:
+            raise RuntimeError(f"ERROR: {self.encoder} failed with code "
+                               f"{process.returncode}")
+
+
+class AnimationWriter:
+    """
+    Writes an animated GIF or PNG (APNG) file one frame at a time, without
+    external programs and without keeping the frames in memory.
+
+    GIF frames are quantized to a palette of 256 colors each, with Pillow,
+    and written with their own color table. APNG frames are written without
+    loss, as RGB.
+    """
+
+    _FORMATS = ('gif', 'apng')
+
+    def __init__(self, filename, fps=_DEFAULT_FPS, fmt=None):
+        """
+        Parameters
+        ----------
+        filename : str
+            file name of the movie
+        fps : int
+            frames per second of the movie
+        fmt : str or None
+            'gif' or 'apng', if None given by the extension of filename
+
+        Raises
+        ------
+        ValueError
+            if the format is not 'gif' or 'apng'.
+        """
+        if fmt is None:
+            fmt = filename.rsplit('.', 1)[-1].lower()
+        if fmt not in self._FORMATS:
+            raise ValueError(f"Unknown animation format: {fmt}")
+
+        self.filename = filename
+        self.fps = fps
+        self.fmt = fmt
+        self.num_frames = 0
+        self._shape = None
+        self._file = None
+        self._actl_pos = None  # position of the APNG frame count
+        self._sequence = 0  # APNG chunk sequence number
+
+    def write_frame(self, rgb):
+        """
+        Writes a frame to the movie file.
+
+        Parameters
+        ----------
+        rgb : array of uint8
+            the frame, with shape (height, width, 3)
+
+        Raises
+        ------
+        ValueError
+            if the frame is not RGB, or not of the same size as the first
+            frame.
+        """
+        if rgb.ndim != 3 or rgb.shape[2] != 3:
+            raise ValueError("A frame must be an array of RGB values.")
+        if self._file is None:
+            self._shape = rgb.shape
+            self._file = open(self.filename, 'wb')
+        elif rgb.shape != self._shape:
+            raise ValueError("All frames of a movie must have the same size.")
+
+        rgb = np.ascontiguousarray(rgb, dtype=np.uint8)
+        if self.fmt == 'gif':
+            self._write_gif_frame(rgb)
+        else:
+            self._write_apng_frame(rgb)
+        self.num_frames += 1
+
+    def _write_gif_frame(self, rgb):
+        """
+        Quantizes a frame to a palette and writes it to a GIF file.
+
+        Parameters
+        ----------
+        rgb : array of uint8
+            the frame
+        """
+        from PIL import Image, GifImagePlugin
+
+        frame = Image.fromarray(rgb).quantize(colors=256,
+                                              method=Image.Quantize.MEDIANCUT)
+        if self.num_frames == 0:
+            header, _ = GifImagePlugin.getheader(frame, info={'loop': 0})
+            self._file.write(b''.join(header))
+        data = GifImagePlugin.getdata(frame, duration=round(1000 / self.fps),
+                                      include_color_table=True)
+        self._file.write(b''.join(data))
+
+    def _png_chunk(self, kind, data):
+        """
+        Writes a chunk to a PNG file.
+
+        Parameters
+        ----------
+        kind : bytes
+            type of the chunk, e.g. b'IHDR'
+        data : bytes
+            content of the chunk
+        """
+        self._file.write(struct.pack('>I', len(data)) + kind + data
+                         + struct.pack('>I', zlib.crc32(kind + data)))
+
+    def _write_apng_frame(self, rgb):
+        """
+        Compresses a frame and writes it to an APNG file.
+
+        Parameters
+        ----------
+        rgb : array of uint8
+            the frame
+        """
+        height, width, _ = rgb.shape
+        if self.num_frames == 0:
+            self._file.write(b'\x89PNG\r\n\x1a\n')
+            self._png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height,
+                                                 8, 2, 0, 0, 0))
+            self._actl_pos = self._file.tell()
+            self._png_chunk(b'acTL', struct.pack('>II', 0, 0))  # count set later
+
+        self._png_chunk(b'fcTL', struct.pack('>IIIIIHHBB', self._sequence,
+                                             width, height, 0, 0,
+                                             1, self.fps, 0, 0))
+        self._sequence += 1
+
+        # Each row is given as the difference from the row above ('up' filter)
+        rows = rgb.reshape(height, width * 3)
+        up = rows.copy()
+        up[1:] -= rows[:-1]
+        scanlines = np.hstack((np.full((height, 1), 2, dtype=np.uint8), up))
+        data = zlib.compress(scanlines.tobytes())
+
+        if self.num_frames == 0:
+            self._png_chunk(b'IDAT', data)
+        else:
+            self._png_chunk(b'fdAT', struct.pack('>I', self._sequence) + data)
+            self._sequence += 1
+
+    def close(self):
+        """Ends the movie, and closes the file."""
+        if self._file is None:
+            return
+        if self.fmt == 'gif':
+            self._file.write(b';')
+        else:
+            self._png_chunk(b'IEND', b'')
+            self._file.seek(self._actl_pos)
+            self._png_chunk(b'acTL', struct.pack('>II', self.num_frames, 0))
+        self._file.close()
+        self._file = None
+
+
+def images_to_movie(img_base, movie_fmt='mp4', encoder=_DEFAULT_ENCODER,
+                    img_fmt='png'):
+    """
+    Makes a movie of the images img_base + '_00000.png', '_00001.png', and
+    so on. The movie is stored as img_base + '.' + movie_fmt.
+
+    Parameters
+    ----------
+    img_base : str
+        beginning of the file names of the images, including path
+    movie_fmt : str
+        'mp4', 'gif' or 'apng'
+    encoder : str
+        path to the ffmpeg binary, only used for mp4 movies
+    img_fmt : str
+        file type of the images, e.g. 'png'
+
+    Raises
+    ------
+    RuntimeError
+        if ffmpeg failed.
+    ValueError
+        if the movie format is unknown, or there are no images for an
+        animated GIF or PNG movie.
+    """
+    filename = '{}.{}'.format(img_base, movie_fmt)
+    if movie_fmt == 'mp4':
+        try:
+            subprocess.check_call([encoder,
+                                   '-i', '{}_%05d.{}'.format(img_base, img_fmt),
+                                   '-y',
+                                   '-profile:v', 'baseline',
+                                   '-level', '3.0',
+                                   '-pix_fmt', 'yuv420p',
+                                   filename])
+        except subprocess.CalledProcessError as err:
+            raise RuntimeError(f"ERROR: ffmpeg failed with: {err}")
+    elif movie_fmt in ('gif', 'apng'):
+        from PIL import Image
+
+        images = sorted(glob.glob('{}_[0-9][0-9][0-9][0-9][0-9].{}'
+                                  .format(glob.escape(img_base), img_fmt)))
+        if not images:
+            raise ValueError(f"No images {img_base}_NNNNN.{img_fmt} to make "
+                             "a movie of.")
+        movie = AnimationWriter(filename, fmt=movie_fmt)
+        for image in images:
+            with Image.open(image) as frame:
+                movie.write_frame(np.asarray(frame.convert('RGB')))
+        movie.close()
+    else:
+        raise ValueError(f"Unknown movie format: {movie_fmt}")
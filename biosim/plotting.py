@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+
+"""
+Drawing of the graphics of a simulation afterwards, from its recorded
+history.
+
+A simulation can run headless while its history is recorded, see
+:meth:`biosim.simulation.BioSim.record_history`, and the frames of the
+graphics are then only drawn for the runs worth looking at. The frames are
+drawn by :class:`biosim.graphics.Graphics`, so they have the same layout as
+the frames drawn while simulating. Different years can be drawn by
+different processes at the same time, see :func:`render_history`.
+
+We first considered making a separate class for plotting, and decided against
+it. The :class:`Plotting` class is that class, now drawing recorded years.
+"""
+
+from biosim.graphics import Graphics
+from biosim.history import load_history
+from biosim.snapshot import HIST_PROPERTIES, Snapshot
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import numpy as np
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+# Limits used by BioSim when none are given, see biosim.simulation
+_DEFAULT_LIMITS = {'ymax_animals': 5000, 'cmax_h': 200, 'cmax_c': 50}
+
+
+def _count_limits(num_herbs, num_carns, ymax_animals):
+    """
+    Finds the y-axis limit of the animal count graph in each year, raised as
+    the graphics raise it when a count goes above the limit.
+
+    Parameters
+    ----------
+    num_herbs : array of int
+        number of herbivores each year
+    num_carns : array of int
+        number of carnivores each year
+    ymax_animals : float
+        the limit before the first year
+
+    Returns
+    -------
+    list of float
+        the limit after each year
+    """
+    limits = []
+    for num_herb, num_carn in zip(num_herbs.tolist(), num_carns.tolist()):
+        if num_herb > ymax_animals or num_carn > ymax_animals:
+            ymax_animals = max(num_herb, num_carn) + 2000
+        limits.append(ymax_animals)
+    return limits
+
+
+class Plotting:
+    """
+    Draws the frames of a recorded history. The history must have the
+    density maps recorded.
+    """
+
+    def __init__(self, directory, ymax_animals=None, cmax_animals=None):
+        """
+        Opens the history and sets up the figure.
+
+        Parameters
+        ----------
+        directory : str or path-like
+            directory of the history
+        ymax_animals : int or None
+            y-axis limit for graph showing animal numbers, None for the limit
+            of the recorded simulation
+        cmax_animals : dict or None
+            color-code limits for animal densities, e.g.
+            {'Herbivore': 50, 'Carnivore': 20}, None for the limits of the
+            recorded simulation
+
+        Raises
+        ------
+        ValueError
+            if the density maps are not in the history.
+        """
+        self._history = load_history(directory)
+        meta = self._history['meta']
+        if not meta['maps']:
+            raise ValueError("The density maps must be recorded to draw the "
+                             "graphics.")
+
+        limits = dict(_DEFAULT_LIMITS, **meta['limits'])
+        if ymax_animals is not None:
+            limits['ymax_animals'] = ymax_animals
+        if cmax_animals is not None:
+            limits['cmax_h'] = cmax_animals['Herbivore']
+            limits['cmax_c'] = cmax_animals['Carnivore']
+
+        self._years = self._history['year']
+        self._final_year = int(self._years[-1]) + 1 if len(self._years) else 0
+        self._limits = _count_limits(self._history['num_herbs'],
+                                     self._history['num_carns'],
+                                     limits['ymax_animals'])
+
+        self._graphics = Graphics(self._history['landscape'],
+                                  limits['ymax_animals'], limits['cmax_h'],
+                                  limits['cmax_c'], meta['edges'],
+                                  interactive=False)
+        self._graphics.setup_graphics(self._final_year)
+        self._graphics.plot_island()
+
+        # Counts of every recorded year in the animal count graph, nan for
+        # years not recorded
+        self._herbs = np.full(self._final_year, np.nan)
+        self._carns = np.full(self._final_year, np.nan)
+        self._herbs[self._years] = self._history['num_herbs']
+        self._carns[self._years] = self._history['num_carns']
+        self._drawn = None  # index of the year drawn last
+
+    def __len__(self):
+        """Number of years in the history."""
+        return len(self._years)
+
+    def snapshot(self, index):
+        """
+        Makes the snapshot of a recorded year.
+
+        Parameters
+        ----------
+        index : int
+            index of the year in the history, 0 for the first year recorded
+
+        Returns
+        -------
+        Snapshot
+            the state of the island in the year
+        """
+        history = self._history
+        hist = {prop: tuple(np.asarray(history[f'hist_{prop}'][index]))
+                for prop in HIST_PROPERTIES}
+        return Snapshot(int(self._years[index]),
+                        int(history['num_herbs'][index]),
+                        int(history['num_carns'][index]),
+                        np.asarray(history['herbi_map'][index]),
+                        np.asarray(history['carni_map'][index]), hist)
+
+    def draw(self, index):
+        """
+        Draws the frame of a recorded year. The animal count graph shows the
+        counts of every year recorded until then.
+
+        When the years are drawn in order, only the count of the new year is
+        added to the graph, as while simulating. Else the graph is first set
+        to show the counts until the year before.
+
+        Parameters
+        ----------
+        index : int
+            index of the year in the history
+        """
+        if self._limits[index] != self._graphics.ymax_animals:
+            self._graphics.set_count_limit(self._limits[index])
+
+        if self._drawn is None or index != self._drawn + 1:
+            year = int(self._years[index])
+            herbs, carns = self._herbs.copy(), self._carns.copy()
+            herbs[year:] = np.nan
+            carns[year:] = np.nan
+            self._graphics.set_line_history(herbs, carns)
+        self._graphics.draw(self.snapshot(index))
+        self._drawn = index
+
+    def save(self, index, filename):
+        """
+        Draws the frame of a recorded year and saves it to file.
+
+        Parameters
+        ----------
+        index : int
+            index of the year in the history
+        filename : str
+            name of the file, the file type is given by the extension
+        """
+        self.draw(index)
+        self._graphics.save_graphics(filename)
+
+    def rgb_frame(self, index):
+        """
+        Draws the frame of a recorded year and gives its pixels.
+
+        Parameters
+        ----------
+        index : int
+            index of the year in the history
+
+        Returns
+        -------
+        array of uint8
+            RGB value of each pixel, with shape (height, width, 3)
+        """
+        self.draw(index)
+        return self._graphics.rgb_frame()
+
+
+def _render_frames(directory, indices, filenames, options):
+    """
+    Draws and saves some of the frames of a history, in a worker process.
+
+    Parameters
+    ----------
+    directory : str or path-like
+        directory of the history
+    indices : list of int
+        indices of the years to draw
+    filenames : list of str
+        file name of each frame
+    options : dict
+        other arguments of :class:`Plotting`
+    """
+    plotting = Plotting(directory, **options)
+    for index, filename in zip(indices, filenames):
+        plotting.save(index, filename)
+
+
+def render_history(directory, img_base, img_fmt='png', num_workers=1,
+                   ymax_animals=None, cmax_animals=None, movie_fmt=None,
+                   ffmpeg_binary='ffmpeg'):
+    """
+    Draws the frames of every year in a recorded history, and optionally
+    makes a movie of them.
+
+    Parameters
+    ----------
+    directory : str or path-like
+        directory of the history
+    img_base : str
+        beginning of the file names of the frames, including path
+    img_fmt : str
+        file type of the frames, e.g. 'png'
+    num_workers : int
+        number of processes drawing the frames, each drawing a run of
+        consecutive years
+    ymax_animals : int or None
+        y-axis limit for graph showing animal numbers, see :class:`Plotting`
+    cmax_animals : dict or None
+        color-code limits for animal densities, see :class:`Plotting`
+    movie_fmt : str or None
+        'mp4', 'gif' or 'apng' to make a movie of the frames, see
+        :func:`biosim.movie.images_to_movie`
+    ffmpeg_binary : str
+        path to the ffmpeg binary used to make mp4 movies
+
+    Returns
+    -------
+    list of str
+        file names of the frames, numbered from 0 as the figures saved by
+        :class:`biosim.simulation.BioSim`
+
+    Raises
+    ------
+    ValueError
+        if there are less than one worker, or a movie is made of frames that
+        are not PNG images.
+    """
+    if num_workers < 1:
+        raise ValueError("There must be at least one worker.")
+    if movie_fmt is not None and img_fmt != 'png':
+        raise ValueError("Movies can only be made of PNG images.")
+
+    num_years = len(load_history(directory)['year'])
+    filenames = ['{}_{:05d}.{}'.format(img_base, index, img_fmt)
+                 for index in range(num_years)]
+    options = {'ymax_animals': ymax_animals, 'cmax_animals': cmax_animals}
+
+    runs = [run.tolist() for run in np.array_split(np.arange(num_years),
+                                                   num_workers) if len(run)]
+    if num_workers == 1:
+        for run in runs:
+            _render_frames(directory, run, [filenames[i] for i in run], options)
+    else:
+        # Spawn, so the workers do not inherit the state of this process
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(num_workers, mp_context=context) as pool:
+            futures = [pool.submit(_render_frames, directory, run,
+                                   [filenames[i] for i in run], options)
+                       for run in runs]
+            for future in futures:
+                future.result()
+
+    if movie_fmt is not None:
+        from biosim.movie import images_to_movie
+
+        images_to_movie(img_base, movie_fmt, encoder=ffmpeg_binary)
+    return filenames
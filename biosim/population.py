@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+"""
+Populations given column by column. Instead of one dictionary per animal, the
+animals of a species in a cell are given as arrays of ages and weights, or as
+a number of animals with the same age and weight::
+
+    {'loc': (10, 10),
+     'pop': {'Herbivore': {'age': ages, 'weight': weights},
+             'Carnivore': {'count': 40, 'age': 5, 'weight': 20.}}}
+
+Such populations are added to the cells in bulk, without making a dictionary
+for each animal.
+
+Large populations can also be read from CSV or JSON-lines files, a chunk of
+animals at a time, see :func:`load_population_file`.
+"""
+
+import csv
+import json
+import os
+
+import numpy as np
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+CHUNK_SIZE = 100000  # number of animals read from a population file at a time
+_FILE_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+
+def columns_to_arrays(columns):
+    """
+    Makes the columns of a species in a cell into arrays of age and weight.
+
+    Parameters
+    ----------
+    columns : dict
+        ``{'age': ..., 'weight': ...}`` with arrays of equal length or
+        numbers, and ``'count'`` giving the number of animals if age and
+        weight are numbers.
+
+    Returns
+    -------
+    age : array
+        age of each animal
+    weight : array
+        weight of each animal
+
+    Raises
+    ------
+    KeyError
+        if age or weight is missing
+    ValueError
+        if the arrays are not of equal length, or do not match the count.
+    """
+    age = np.asarray(columns['age'])
+    weight = np.asarray(columns['weight'], dtype=float)
+
+    if 'count' in columns:
+        count = int(columns['count'])
+        try:
+            age = np.broadcast_to(age, (count,))
+            weight = np.broadcast_to(weight, (count,))
+        except ValueError:
+            raise ValueError("Age and weight must be numbers or match the count.")
+    elif age.ndim != 1 or age.shape != weight.shape:
+        raise ValueError("Age and weight must be arrays of equal length.")
+
+    return age, weight
+
+
+def _group_by_cell(rows, cols, species, age, weight):
+    """
+    Groups a chunk of animals by cell and species, into the columnar form of
+    :meth:`biosim.island.TheIsland.add_animals_on_island`. The order of the
+    animals within a cell and species is kept.
+
+    Parameters
+    ----------
+    rows, cols : arrays of int
+        location of each animal, as in 'loc'
+    species : array of str
+        species of each animal
+    age, weight : arrays
+        age and weight of each animal
+
+    Returns
+    -------
+    list of dicts
+        one dictionary per cell, with the columns of each species
+    """
+    species_names, species_codes = np.unique(species, return_inverse=True)
+    locations, cell_codes = np.unique(np.stack([rows, cols], axis=1), axis=0,
+                                      return_inverse=True)
+    cell_codes = cell_codes.ravel()
+    order = np.lexsort((species_codes, cell_codes))  # stable within groups
+    keys = cell_codes[order] * len(species_names) + species_codes[order]
+    starts = np.flatnonzero(np.diff(keys, prepend=-1))
+    ends = np.append(starts[1:], len(keys))
+
+    population = {}
+    for start, end in zip(starts, ends):
+        group = order[start:end]
+        loc = tuple(locations[cell_codes[group[0]]].tolist())
+        name = str(species_names[species_codes[group[0]]])
+        population.setdefault(loc, {})[name] = {'age': age[group],
+                                                'weight': weight[group]}
+
+    return [{'loc': loc, 'pop': pop} for loc, pop in population.items()]
+
+
+def _chunk_to_arrays(records):
+    """
+    Makes a chunk of records into arrays.
+
+    Parameters
+    ----------
+    records : list of tuples
+        (row, column, species, age, weight) for each animal
+
+    Returns
+    -------
+    tuple of arrays
+        rows, columns, species, ages and weights
+    """
+    rows, cols, species, age, weight = zip(*records)
+    age = np.array(age, dtype=float)
+    if np.all(age == np.floor(age)):  # whole years, as in the dictionaries
+        age = age.astype(int)
+    return (np.array(rows, dtype=int), np.array(cols, dtype=int),
+            np.array(species), age, np.array(weight, dtype=float))
+
+
+def _read_records(path, fmt):
+    """
+    Reads the animals of a population file one at a time.
+
+    Parameters
+    ----------
+    path : str or path-like
+        path to the population file
+    fmt : str
+        'csv' or 'jsonl'
+
+    Yields
+    ------
+    tuple
+        (row, column, species, age, weight) of an animal
+    """
+    with open(path, newline='') as infile:
+        if fmt == 'csv':
+            for line in csv.DictReader(infile):
+                yield (line['row'], line['col'], line['species'],
+                       line['age'], line['weight'])
+        else:
+            for line in infile:
+                if line.strip():
+                    animal = json.loads(line)
+                    row, col = animal['loc']
+                    yield (row, col, animal['species'], animal['age'],
+                           animal['weight'])
+
+
+def read_population_file(path, fmt=None, chunk_size=CHUNK_SIZE):
+    """
+    Reads a population file a chunk of animals at a time, so the whole file
+    is never held in memory.
+
+    Two formats are supported:
+        - 'csv': a header line ``row,col,species,age,weight`` and one line
+          per animal, e.g. ``10,10,Herbivore,5,20.0``
+        - 'jsonl': one JSON object per line and animal, e.g.
+          ``{"loc": [10, 10], "species": "Herbivore", "age": 5, "weight": 20}``
+
+    Parameters
+    ----------
+    path : str or path-like
+        path to the population file
+    fmt : str or None
+        'csv' or 'jsonl', if None the format is found from the file
+        extension ('.csv', '.jsonl' or '.ndjson')
+    chunk_size : int
+        number of animals read at a time
+
+    Yields
+    ------
+    tuple of arrays
+        rows, columns, species, ages and weights of a chunk of animals
+
+    Raises
+    ------
+    ValueError
+        if the format is unknown.
+    """
+    if fmt is None:
+        fmt = _FILE_FORMATS.get(os.path.splitext(str(path))[1].lower())
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError(f"Unknown population file format: {fmt}")
+
+    records = []
+    for record in _read_records(path, fmt):
+        records.append(record)
+        if len(records) == chunk_size:
+            yield _chunk_to_arrays(records)
+            records = []
+    if records:
+        yield _chunk_to_arrays(records)
+
+
+def load_population_file(island, path, fmt=None, chunk_size=CHUNK_SIZE):
+    """
+    Adds the animals in a population file to an island, a chunk at a time.
+    The locations of each chunk are checked against the landscape of the
+    island before the chunk is added.
+
+    Parameters
+    ----------
+    island : TheIsland
+        the island to add the animals to
+    path : str or path-like
+        path to the population file, see :func:`read_population_file`
+    fmt : str or None
+        'csv' or 'jsonl', if None found from the file extension
+    chunk_size : int
+        number of animals read and added at a time
+
+    Returns
+    -------
+    int
+        number of animals added
+
+    Raises
+    ------
+    ValueError
+        if an animal is placed outside the island or in water. Chunks before
+        the one with the error have already been added.
+    """
+    num_animals = 0
+    for rows, cols, species, age, weight in read_population_file(path, fmt,
+                                                                 chunk_size):
+        island.check_locations(rows, cols)
+        island.add_animals_on_island(_group_by_cell(rows, cols, species,
+                                                    age, weight))
+        num_animals += len(rows)
+
+    return num_animals
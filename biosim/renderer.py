@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+"""
+Renderer drawing the graphics of a simulation in a separate process.
+
+The simulation sends a snapshot of the island (see :mod:`biosim.snapshot`)
+through a queue for each frame, and the renderer process draws and saves the
+frames while the simulation goes on. The queue has a fixed size. Frames that
+are only shown are dropped when the queue is full, so the simulation never
+waits for the drawing. Frames that are saved to file are never dropped; if the
+queue is full the simulation waits for the renderer to catch up.
+"""
+
+import multiprocessing
+import queue
+
+import numpy as np
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+
+def _render_frames(frames, done, landscape, settings, show):
+    """
+    Runs in the renderer process, drawing the frames in the queue until told
+    to stop.
+
+    Parameters
+    ----------
+    frames : multiprocessing.Queue
+        queue of messages from the simulation
+    done : multiprocessing.Queue
+        queue the errors since the last flush are returned through
+    landscape : 2D array of uint8
+        landscape code of each cell of the island
+    settings : dict
+        the other arguments of :class:`biosim.graphics.Graphics`
+    show : bool
+        if True the frames are shown on screen, else only drawn to be saved
+    """
+    from biosim.graphics import Graphics
+
+    graphics = Graphics(landscape, interactive=show, **settings)
+    errors = []
+    while True:
+        message = frames.get()
+        if message is None:  # the simulation is finished with the renderer
+            break
+
+        kind = message[0]
+        try:
+            if kind == 'setup':
+                graphics.setup_graphics(message[1])
+            elif kind == 'island':
+                graphics.plot_island()
+            elif kind == 'frame':
+                _, snapshot, filename = message
+                if show:
+                    graphics.update_graphics(snapshot)
+                else:
+                    graphics.draw(snapshot)
+                if filename is not None:
+                    graphics.save_graphics(filename)
+            elif kind == 'flush':
+                done.put(errors)
+                errors = []
+        except Exception as err:
+            errors.append(f'{kind}: {err!r}')
+
+
+class FrameRenderer:
+    """
+    Draws and saves the frames of a simulation in a separate process.
+    """
+
+    def __init__(self, landscape, ymax_animals, cmax_h, cmax_c, edges,
+                 queue_size=4, show=False):
+        """
+        Starts the renderer process.
+
+        Parameters
+        ----------
+        landscape : 2D array of uint8
+            landscape code of each cell of the island
+        ymax_animals : int
+            y-axis limit for graph showing animal numbers
+        cmax_h : int
+            color-code limit for herbivore densities
+        cmax_c : int
+            color-code limit for carnivore densities
+        edges : dict
+            bin edges of the histogram of each property
+        queue_size : int
+            number of frames that can wait to be drawn
+        show : bool
+            if True the frames are shown on screen, else only drawn to be
+            saved
+
+        Raises
+        ------
+        ValueError
+            if queue_size is less than one.
+        """
+        if queue_size < 1:
+            raise ValueError("The queue must have room for at least one frame.")
+
+        settings = {'ymax_animals': ymax_animals, 'cmax_h': cmax_h,
+                    'cmax_c': cmax_c, 'edges': edges}
+        # Spawn, so the renderer does not inherit the pyplot state of the
+        # simulation process
+        context = multiprocessing.get_context('spawn')
+        self._frames = context.Queue(maxsize=queue_size)
+        self._done = context.Queue()
+        self._process = context.Process(target=_render_frames,
+                                        args=(self._frames, self._done,
+                                              np.array(landscape), settings,
+                                              show),
+                                        daemon=True)
+        self._process.start()
+
+        self.sent = 0  # number of frames sent to the renderer
+        self.dropped = 0  # number of frames dropped because the queue was full
+
+    def setup_graphics(self, final_year):
+        """
+        Makes the renderer set up the figure, see
+        :meth:`biosim.graphics.Graphics.setup_graphics`.
+
+        Parameters
+        ----------
+        final_year : int
+            last year of the simulation
+        """
+        self._frames.put(('setup', final_year))
+
+    def plot_island(self):
+        """Makes the renderer plot the map of the island."""
+        self._frames.put(('island',))
+
+    def submit(self, snapshot, filename=None):
+        """
+        Sends a frame to the renderer. A frame that is only shown is dropped
+        if the queue is full, a frame that is saved waits for room in the
+        queue.
+
+        Parameters
+        ----------
+        snapshot : Snapshot
+            the state of the island to draw
+        filename : str or None
+            file the frame is saved to, None if it is only shown
+
+        Returns
+        -------
+        bool
+            True if the frame was sent, False if it was dropped
+        """
+        message = ('frame', snapshot, filename)
+        if filename is None:
+            try:
+                self._frames.put_nowait(message)
+            except queue.Full:
+                self.dropped += 1
+                return False
+        else:
+            self._frames.put(message)
+        self.sent += 1
+        return True
+
+    def flush(self):
+        """
+        Waits until the renderer has drawn and saved every frame sent.
+
+        Raises
+        ------
+        RuntimeError
+            if the renderer failed to draw or save a frame, or has stopped.
+        """
+        self._frames.put(('flush',))
+        while True:
+            try:
+                errors = self._done.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if not self._process.is_alive():
+                    raise RuntimeError("The renderer process has stopped.")
+        if errors:
+            raise RuntimeError("The renderer failed: " + '; '.join(errors))
+
+    def close(self):
+        """Stops the renderer process, after it has drawn the frames sent."""
+        if self._process.is_alive():
+            self._frames.put(None)
+        self._process.join()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""
+Counter-based random number streams.
+
+When the cells are processed in parallel, or in another order than row by
+row, drawing from the global ``random`` stream makes the result depend on the
+order the cells are visited in. A counter-based generator (Philox) instead
+gives every combination of seed, year, cell and phase of the annual cycle its
+own stream, so the result is the same whatever order the cells are visited in.
+"""
+
+import numpy as np
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+# Number identifying each phase of the annual cycle in the stream counter
+PHASES = {'eat': 0, 'procreate': 1, 'migrate': 2, 'age': 3,
+          'weight_loss': 4, 'death': 5}
+
+
+class CounterRandom:
+    """
+    Random number stream for one cell in one phase of one year. Has the same
+    methods as the ``random`` module that are used by the cells and animals,
+    so it can be used in place of the module.
+    """
+
+    def __init__(self, seed, year, cell, phase, buffer_size=64):
+        """
+        Parameters
+        ----------
+        seed : int
+            seed of the simulation
+        year : int
+            year of the simulation
+        cell : int
+            index of the cell, ``row * number_of_columns + column``
+        phase : str
+            phase of the annual cycle, one of the keys in ``PHASES``
+        buffer_size : int
+            number of uniform random numbers drawn at a time
+
+        Raises
+        ------
+        KeyError
+            if phase is not a phase of the annual cycle
+        """
+        if phase not in PHASES:
+            raise KeyError(f"Invalid phase: {phase}.")
+
+        self.seed = seed
+        self.year = year
+        self.cell = cell
+        self.phase = phase
+        self._buffer_size = buffer_size
+        self._buffer = None
+        self._pos = 0
+        self._gen = None  # made on first draw, most cells never draw
+
+    def _generator(self):
+        """
+        Makes the generator for the stream the first time it is needed.
+
+        Returns
+        -------
+        numpy.random.Generator
+            generator for this stream
+        """
+        if self._gen is None:
+            bit_gen = np.random.Philox(key=self.seed % 2 ** 64,
+                                       counter=[0, self.cell, self.year,
+                                                PHASES[self.phase]])
+            self._gen = np.random.Generator(bit_gen)
+        return self._gen
+
+    def random(self):
+        """
+        Draws a uniform random number in [0, 1).
+
+        Returns
+        -------
+        float
+            the random number
+        """
+        if self._buffer is None or self._pos == self._buffer_size:
+            self._buffer = self._generator().random(self._buffer_size)
+            self._pos = 0
+        value = self._buffer[self._pos]
+        self._pos += 1
+        return float(value)
+
+    def gauss(self, mu, sigma):
+        """
+        Draws a random number from a Gaussian distribution.
+
+        Parameters
+        ----------
+        mu : float
+            mean of the distribution
+        sigma : float
+            standard deviation of the distribution
+
+        Returns
+        -------
+        float
+            the random number
+        """
+        return float(self._generator().normal(mu, sigma))
+
+    def shuffle(self, x):
+        """
+        Shuffles a list in place.
+
+        Parameters
+        ----------
+        x : list
+            list to shuffle
+        """
+        for i in reversed(range(1, len(x))):
+            j = int(self.random() * (i + 1))
+            x[i], x[j] = x[j], x[i]
+
+    def choice(self, seq):
+        """
+        Picks a random element from a sequence.
+
+        Parameters
+        ----------
+        seq : sequence
+            sequence to pick from
+
+        Returns
+        -------
+        element of seq
+            the element picked
+        """
+        return seq[int(self.random() * len(seq))]
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+"""
+Load balancing for processing the cells of the island in parallel.
+
+The number of animals differs a lot between the cells of the island, a few
+lowland cells may hold thousands of animals while most cells are empty. The
+cost of a cell is therefore estimated from the population counts of last year,
+and the cells are packed into chunks of roughly equal cost. The chunks are
+handed out to the workers, and a worker that runs out of work steals chunks
+from the worker with the most work left.
+
+The workers are threads. Processing a cell runs Python code, which only runs
+in one thread at a time, so the workers are not faster than processing the
+cells in order, and the island only uses a scheduler when it is given one.
+"""
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+
+class CellScheduler:
+    """
+    Schedules work on the cells of the island on a number of worker threads.
+    """
+
+    def __init__(self, num_workers=2, chunks_per_worker=4):
+        """
+        Parameters
+        ----------
+        num_workers : int
+            number of worker threads
+        chunks_per_worker : int
+            number of chunks the cells are split into per worker, more chunks
+            gives finer load balancing but more scheduling overhead
+
+        Raises
+        ------
+        ValueError
+            if num_workers or chunks_per_worker is less than one
+        """
+        if num_workers < 1:
+            raise ValueError("Number of workers must be at least one.")
+        if chunks_per_worker < 1:
+            raise ValueError("Number of chunks per worker must be at least one.")
+
+        self.num_workers = num_workers
+        self.chunks_per_worker = chunks_per_worker
+        self.report = None  # utilisation report of the last run
+
+    @staticmethod
+    def estimate_costs(herbi_island, carni_island, base_cost=1):
+        """
+        Estimates the cost of processing each cell from the number of animals
+        in the cells.
+
+        Parameters
+        ----------
+        herbi_island : list of lists or array
+            number of herbivores in each cell
+        carni_island : list of lists or array
+            number of carnivores in each cell
+        base_cost : float
+            cost of visiting a cell, also when it is empty
+
+        Returns
+        -------
+        costs : array
+            estimated cost for each cell, same shape as the input
+        """
+        return (base_cost + np.asarray(herbi_island, dtype=float)
+                + np.asarray(carni_island, dtype=float))
+
+    def make_chunks(self, costs):
+        """
+        Splits the items into chunks of roughly equal cost. The items are
+        taken in order of decreasing cost, so expensive items end up alone in
+        a chunk while many cheap items share a chunk.
+
+        Parameters
+        ----------
+        costs : list or array
+            estimated cost for each item
+
+        Returns
+        -------
+        chunks : list of tuples
+            each tuple contains the total cost of the chunk and a list with
+            the indices of the items in the chunk, sorted from highest to
+            lowest cost.
+        """
+        costs = np.asarray(costs, dtype=float).ravel()
+        if len(costs) == 0:
+            return []
+
+        num_chunks = self.num_workers * self.chunks_per_worker
+        target = costs.sum() / num_chunks
+
+        chunks = []
+        chunk, chunk_cost = [], 0.
+        for index in np.argsort(-costs, kind='stable'):
+            chunk.append(int(index))
+            chunk_cost += costs[index]
+            if chunk_cost >= target:
+                chunks.append((chunk_cost, chunk))
+                chunk, chunk_cost = [], 0.
+        if chunk:
+            chunks.append((chunk_cost, chunk))
+
+        return chunks
+
+    def assign_chunks(self, chunks):
+        """
+        Gives each worker a queue of chunks. The chunks are handed out from
+        highest to lowest cost, each to the worker with the lowest total cost
+        so far.
+
+        Parameters
+        ----------
+        chunks : list of tuples
+            chunks as made by :meth:`make_chunks`
+
+        Returns
+        -------
+        queues : list of deques
+            one queue of chunks per worker
+        """
+        queues = [deque() for _ in range(self.num_workers)]
+        loads = [0.] * self.num_workers
+        for chunk_cost, chunk in sorted(chunks, key=lambda c: -c[0]):
+            worker = loads.index(min(loads))
+            queues[worker].append((chunk_cost, chunk))
+            loads[worker] += chunk_cost
+
+        return queues
+
+    def run(self, func, items, costs):
+        """
+        Calls func on every item, spread over the workers. A worker first
+        works through its own queue, and then steals chunks from the end of
+        the queue of the worker with the most cost left.
+
+        Parameters
+        ----------
+        func : callable
+            function called with a single item as argument
+        items : list
+            the items to process, e.g. cells of the island
+        costs : list or array
+            estimated cost for each item
+
+        Returns
+        -------
+        results : list
+            return value of func for each item, in the same order as items
+        """
+        results = [None] * len(items)
+        queues = self.assign_chunks(self.make_chunks(costs))
+        remaining = [sum(chunk_cost for chunk_cost, _ in queue)
+                     for queue in queues]
+        lock = threading.Lock()
+        errors = []
+
+        busy = [0.] * self.num_workers
+        done_cost = [0.] * self.num_workers
+        num_chunks = [0] * self.num_workers
+        steals = [0] * self.num_workers
+
+        def next_chunk(worker):
+            with lock:
+                if queues[worker]:
+                    chunk_cost, chunk = queues[worker].popleft()
+                    remaining[worker] -= chunk_cost
+                    return chunk_cost, chunk
+                victim = remaining.index(max(remaining))
+                if not queues[victim]:
+                    return None
+                chunk_cost, chunk = queues[victim].pop()
+                remaining[victim] -= chunk_cost
+                steals[worker] += 1
+                return chunk_cost, chunk
+
+        def work(worker):
+            while not errors:
+                task = next_chunk(worker)
+                if task is None:
+                    return
+                chunk_cost, chunk = task
+                start = time.perf_counter()
+                try:
+                    for index in chunk:
+                        results[index] = func(items[index])
+                except Exception as err:
+                    errors.append(err)
+                busy[worker] += time.perf_counter() - start
+                done_cost[worker] += chunk_cost
+                num_chunks[worker] += 1
+
+        start = time.perf_counter()
+        if self.num_workers == 1:
+            work(0)
+        else:
+            threads = [threading.Thread(target=work, args=(worker,))
+                       for worker in range(self.num_workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        wall_time = time.perf_counter() - start
+
+        if errors:
+            raise errors[0]
+
+        self.report = {'wall_time': wall_time,
+                       'busy_time': busy,
+                       'utilisation': [b / wall_time if wall_time > 0 else 0.
+                                       for b in busy],
+                       'cost': done_cost,
+                       'chunks': num_chunks,
+                       'steals': steals}
+
+        return results
+
+    @property
+    def utilisation(self):
+        """
+        Fraction of the wall time of the last run each worker was busy.
+
+        Returns
+        -------
+        list or None
+            utilisation for each worker, None if nothing has been run yet.
+        """
+        if self.report is None:
+            return None
+        return self.report['utilisation']
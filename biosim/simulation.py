@@ -12,35 +12,52 @@ modifications else.
 
 from biosim.animals import Herbivores, Carnivores
 from biosim.cell import Lowland, Highland
+from biosim.checkpoint import (population_arrays, set_population,
+                               params_arrays, set_params, rng_arrays, set_rng,
+                               read_checkpoint, write_checkpoint,
+                               CheckpointSeries, CheckpointWriter)
 from biosim.island import TheIsland
+from biosim.snapshot import freeze, hist_edges, make_snapshot
 import random
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
 import numpy as np
-import subprocess
 import os
 
 __author__ = "Marie Kolvik Valøy, Christine Brinchmann"
 __email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
 
-# Update these variables to point to your ffmpeg and convert binaries
-# If you installed ffmpeg using conda or installed both softwares in
-# standard ways on your computer, no changes should be required.
-# _CONVERT_BINARY/magick is only needed if you want to create animated GIFs.
+# Update this variable to point to your ffmpeg binary
+# If you installed ffmpeg using conda or in the standard way on your
+# computer, no changes should be required. ffmpeg is only needed for mp4
+# movies, animated GIF and PNG movies are written with Pillow.
 _FFMPEG_BINARY = 'ffmpeg'
-_CONVERT_BINARY = 'magick'
 
 # update this to the directory and file-name beginning
 # for the graphics files
 _DEFAULT_GRAPHICS_DIR = os.path.join('..', 'data')
 _DEFAULT_GRAPHICS_NAME = 'dv'
-_DEFAULT_MOVIE_FORMAT = 'mp4'  # alternatives: mp4, gif
+_DEFAULT_MOVIE_FORMAT = 'mp4'  # alternatives: mp4, gif, apng
 
-# Set fontsize for text, axes title and tick labels
-plt.rc('font', size=8)
-plt.rc('axes', titlesize=8)
-plt.rc('xtick', labelsize=5)
-plt.rc('ytick', labelsize=5)
+
+def _is_map_file(island_map):
+    """
+    Tells if the island map given to BioSim is the path to a map file.
+
+    Parameters
+    ----------
+    island_map : str, path-like or 2D array
+        the island map
+
+    Returns
+    -------
+    bool
+        True for a path-like object, or a string of one line naming an
+        existing file, which a map string can not be since it has lines
+        of water above and below the land
+    """
+    if isinstance(island_map, os.PathLike):
+        return True
+    return (isinstance(island_map, str) and '\n' not in island_map
+            and os.path.isfile(island_map))
 
 
 class BioSim:
@@ -51,14 +68,24 @@ class BioSim:
 
     def __init__(self, island_map, ini_pop, seed,
                  ymax_animals=None, cmax_animals=None, hist_specs=None,
-                 img_base=None, img_fmt='png'):
+                 img_base=None, img_fmt='png',
+                 rng_mode='global', storage='dense', map_fmt='text',
+                 map_shape=None, renderer='inline', frame_queue=4,
+                 stream_movie=False, movie_fmt=_DEFAULT_MOVIE_FORMAT,
+                 ffmpeg_binary=_FFMPEG_BINARY,
+                 interactive=True, encode_workers=0, checkpoint_base=None,
+                 checkpoint_keep=None, checkpoint_delta=False):
         """
         Parameters
         ----------
-        island_map : str
-            Multi-line string specifying island geography
+        island_map : str, path-like or 2D array
+            Multi-line string specifying island geography, path to a map
+            file (a pathlib.Path, or a string without line breaks naming an
+            existing file), or array of landscape codes (see
+            :mod:`biosim.landscape`)
         ini_pop : list
-            List of dictionaries specifying initial population
+            List of dictionaries specifying initial population, see
+            :meth:`add_population`
         seed : int
             Integer used as random number seed
         ymax_animals : int or None
@@ -71,6 +98,42 @@ class BioSim:
             String with beginning of file name for figure, including path
         img_fmt : str
             String with file type for figures, e.g. 'png'
+        rng_mode : str
+            'global' or 'counter', how random numbers are drawn, see below
+        storage : str
+            'dense' or 'sparse', how the cells of the island are stored, see
+            :class:`biosim.island.TheIsland`. Sparse storage suits islands
+            that are mostly water.
+        map_fmt : str
+            'text' or 'raw', format of the map file if island_map is a path
+        map_shape : tuple of ints or None
+            number of rows and columns of a 'raw' map file
+        renderer : str
+            'inline' or 'process', where the graphics are drawn, see below
+        frame_queue : int
+            number of frames that can wait for a 'process' renderer
+        stream_movie : bool
+            if True, saved figures are streamed into a movie instead of
+            written to files, see below
+        movie_fmt : str
+            'mp4', 'gif' or 'apng', format of a streamed movie
+        ffmpeg_binary : str
+            path to the ffmpeg binary used to make movies
+        interactive : bool
+            if False the figures are only drawn to be saved, never shown, see
+            below
+        encode_workers : int
+            number of processes encoding and writing the saved figures, 0 to
+            save them in the simulation process
+        checkpoint_base : str or None
+            beginning of the file name of checkpoints saved by simulate,
+            including path, see below
+        checkpoint_keep : int or None
+            number of checkpoints written in the background that are kept,
+            None to keep all
+        checkpoint_delta : bool
+            if True the checkpoints saved by simulate are written as a
+            static part and yearly chunks in the directory checkpoint_base
 
 
         If ymax_animals is None, the y-axis limit should be adjusted
@@ -94,11 +157,77 @@ class BioSim:
 
         where img_no are consecutive image numbers starting from 0.
         img_base should contain a path and beginning of a file name.
+
+        With rng_mode 'global' all random numbers come from the random module
+        seeded with seed, and the result depends on the order the cells are
+        processed in. With rng_mode 'counter' each cell gets its own random
+        stream in each phase of each year, keyed by the seed, so the result
+        does not depend on the order the cells are processed in.
+
+        Very large islands can be read from a map file instead of a string,
+        see :meth:`biosim.island.TheIsland.from_map_file`. A 'text' map file
+        holds the lines of the map string, a 'raw' map file the landscape
+        codes as bytes. Use storage='sparse' for such islands.
+
+        With renderer 'inline' the graphics are drawn by the simulation
+        itself. With renderer 'process' the simulation sends a snapshot of the
+        island for each frame to a renderer process, see
+        :mod:`biosim.renderer`, which draws and saves the frames while the
+        simulation goes on. Frames that are only shown are dropped if the
+        renderer falls behind, frames that are saved are not. Every frame is
+        saved when simulate returns. Call :meth:`close` to stop the renderer.
+
+        If stream_movie is True, the figures are not written to image files.
+        Each figure is instead rendered to RGB values and written to the
+        movie img_base + '.' + movie_fmt while the simulation runs. mp4
+        movies are piped into an ffmpeg process, see
+        :class:`biosim.movie.MovieWriter`, animated GIF and PNG movies are
+        written with Pillow, see :class:`biosim.movie.AnimationWriter`. The
+        movie is finished by :meth:`make_movie` or :meth:`close`.
+
+        If interactive is False, the figure is a bare matplotlib figure on an
+        Agg canvas owned by the simulation, and is never shown. Pyplot is not
+        used, so several simulations can save their figures at the same time
+        in different threads.
+
+        If encode_workers is larger than zero, each saved figure is rendered
+        to RGB values and written to its file by a pool of worker processes,
+        see :class:`biosim.encoder.FrameEncoder`. The files are named as
+        above, and all of them are written when simulate returns.
+
+        If checkpoint_base is given, simulate can save checkpoints while it
+        runs, see :meth:`simulate` and :meth:`save_checkpoint`. They are
+        named as
+
+            '{}_{:05d}.npz'.format(checkpoint_base, year)
+
+        and written in the background. Only the newest checkpoint_keep of
+        them are kept. With checkpoint_delta True, checkpoint_base is instead
+        a directory, and the landscape and parameters are written only once,
+        see :class:`biosim.checkpoint.CheckpointSeries`. Then each checkpoint
+        is a small chunk, so a checkpoint can be saved every year.
         """
+        if renderer not in ('inline', 'process'):
+            raise ValueError(f"Unknown renderer: {renderer}")
+        if stream_movie and movie_fmt not in ('mp4', 'gif', 'apng'):
+            raise ValueError(f"Unknown movie format: {movie_fmt}")
+        if stream_movie and renderer != 'inline':
+            raise ValueError("Movies can only be streamed by the 'inline' renderer.")
+        if encode_workers > 0 and (stream_movie or renderer != 'inline'):
+            raise ValueError("Figures can only be encoded in parallel by the "
+                             "'inline' renderer, without stream_movie.")
+
         # Initialize the island
-        self._isl = TheIsland(landscape_of_cells=island_map,
-                              animals_on_island=ini_pop)
-        self.island_map = island_map
+        island_args = {'animals_on_island': ini_pop,
+                       'rng_mode': rng_mode, 'seed': seed,
+                       'storage': storage}
+        if _is_map_file(island_map):
+            self._isl = TheIsland.from_map_file(island_map, fmt=map_fmt,
+                                                shape=map_shape, **island_args)
+            self.island_map = None  # the map is only kept as landscape codes
+        else:
+            self._isl = TheIsland(landscape_of_cells=island_map, **island_args)
+            self.island_map = island_map
 
         # Initialize a pseudo-random number generator
         random.seed(seed)
@@ -130,6 +259,10 @@ class BioSim:
             self._weight_bins = int(self._weight_max / 2)
         else:
             self._set_hist_specs(hist_specs)
+        self._hist_edges = hist_edges({'fitness': (self._fit_max, self._fit_bins),
+                                       'age': (self._age_max, self._age_bins),
+                                       'weight': (self._weight_max,
+                                                  self._weight_bins)})
 
         self._img_base = img_base  # beginning of filename for saving image
         self._img_fmt = img_fmt  # file type of image
@@ -138,21 +271,32 @@ class BioSim:
         self._final_year = None  # final year, will be set later
         self._img_no = 0  # count for image, updating for every file saved
 
-        # Creating all axes used for plotting
-        self._fig = None
-        self._map_ax = None
-        self._img_ax = None
-        self._line_ax = None
-        self._line_h = None
-        self._line_c = None
-        self._herb_ax = None
-        self._carn_ax = None
-        self._img_ax_heat1 = None
-        self._img_ax_heat2 = None
-        self._fitness_ax = None
-        self._age_ax = None
-        self._weight_ax = None
-        self._axt = None
+        # The figure, made the first time graphics are set up (see
+        # biosim.graphics, matplotlib is only imported then), or the renderer
+        # process drawing it
+        self._renderer = renderer
+        self._frame_queue = frame_queue
+        self._graphics = None
+
+        self._interactive = interactive
+        self._stream_movie = stream_movie
+        self._movie_fmt = movie_fmt
+        self._ffmpeg_binary = ffmpeg_binary
+        self._movie = None  # movie the figures are streamed to
+        self._encode_workers = encode_workers
+        self._encoder = None  # workers writing the figures
+        self._checkpoint_base = checkpoint_base
+        self._checkpoint_keep = checkpoint_keep
+        self._checkpoint_delta = checkpoint_delta
+        self._checkpoints = None  # thread writing checkpoints in the background
+        self._series = None  # directory of the checkpoints, if delta encoded
+        self._num_forks = 0  # number of copies made by fork
+        self._history = None  # recorder of the history, see record_history
+        self._trajectories = None  # recorder of the animals
+
+        # Animal counts of the line graph of a simulation restored from a
+        # checkpoint, shown when the graphics are set up
+        self._line_history = None
 
     def _set_hist_specs(self, hist_specs):
         """
@@ -218,7 +362,8 @@ class BioSim:
         elif landscape == 'H':
             Highland.set_params(params)
 
-    def simulate(self, num_years, vis_years=1, img_years=None):
+    def simulate(self, num_years, vis_years=1, img_years=None,
+                 checkpoint_years=None):
         """
         Run simulations while visualizing the result.
 
@@ -226,14 +371,46 @@ class BioSim:
         ----------
         num_years : int
             number of years to simulate
-        vis_years : int
-            years between visualization updates
+        vis_years : int or None
+            years between visualization updates, None to run without
+            graphics
         img_years : int or None
             years between visualizations saved to files (default: vis_years)
+        checkpoint_years : int or None
+            years between checkpoints written in the background, None for no
+            checkpoints
 
 
         Image files will be numbered consecutively
+
+        If vis_years is None the simulation runs headless: no figure is made
+        and matplotlib is not used, only the annual cycle is run. The year
+        and the number of animals are kept up to date as usual.
+
+        Checkpoints are saved after the annual cycle of every
+        checkpoint_years year, with the year as it is after the cycle in the
+        file name. They are written in the background while the simulation
+        goes on, see :meth:`save_checkpoint`, and all of them are written when
+        simulate returns.
+
+        Raises
+        ------
+        ValueError
+            if img_years is given when running headless, since no figures are
+            made to save, or checkpoint_years is given without a
+            checkpoint_base.
         """
+        if checkpoint_years is not None and self._checkpoint_base is None:
+            raise ValueError("Checkpoints can not be saved without a "
+                             "checkpoint_base.")
+
+        if vis_years is None:
+            if img_years is not None:
+                raise ValueError("Figures can not be saved without graphics, "
+                                 "img_years needs vis_years.")
+            self._simulate_headless(num_years, checkpoint_years)
+            return
+
         if img_years is None:
             img_years = vis_years
 
@@ -242,295 +419,582 @@ class BioSim:
         self._plot_island()  # plotting the map of the island
 
         while self._year < self._final_year:
-            if self._year % vis_years == 0:
-                self._update_graphics()  # updating the graphics
+            self._record_year()
+            if self._renderer == 'process':
+                self._submit_frame(vis_years, img_years)
+            else:
+                if self._year % vis_years == 0:
+                    self._update_graphics()  # updating the graphics
+
+                if self._year % img_years == 0:
+                    self._save_graphics()  # saving the graphics
 
-            if self._year % img_years == 0:
-                self._save_graphics()  # saving the graphics
+            self._isl.annual_cycle()  # letting one year on the island pass
+            self._year += 1  # updating the year count
+            self._periodic_checkpoint(checkpoint_years)
+
+        if self._renderer == 'process':
+            self._graphics.flush()  # every frame is saved when we return
+        if self._encoder is not None:
+            self._encoder.flush()
+        if self._checkpoints is not None:
+            self._checkpoints.flush()
+        if self._history is not None:
+            self._history.flush()
+        if self._trajectories is not None:
+            self._trajectories.flush()
+
+    def _simulate_headless(self, num_years, checkpoint_years=None):
+        """
+        Runs the annual cycle for a number of years without any graphics.
 
+        Parameters
+        ----------
+        num_years : int
+            number of years to simulate
+        checkpoint_years : int or None
+            years between checkpoints, None for no checkpoints
+        """
+        self._final_year = self._year + num_years
+        while self._year < self._final_year:
+            self._record_year()
             self._isl.annual_cycle()  # letting one year on the island pass
             self._year += 1  # updating the year count
+            self._periodic_checkpoint(checkpoint_years)
+
+        if self._checkpoints is not None:
+            self._checkpoints.flush()
+        if self._history is not None:
+            self._history.flush()
+        if self._trajectories is not None:
+            self._trajectories.flush()
+
+    def iter_years(self, num_years, hist=False, checkpoint_years=None):
+        """
+        Runs simulations, giving a summary of the island after each year.
+
+        Parameters
+        ----------
+        num_years : int
+            number of years to simulate
+        hist : bool
+            if True the summaries have the histograms of the graphics
+        checkpoint_years : int or None
+            years between checkpoints written in the background, None for no
+            checkpoints
+
+        Yields
+        ------
+        Snapshot
+            the state of the island after the annual cycle of each year, with
+            the year as it is after the cycle, see
+            :class:`biosim.snapshot.Snapshot`. The snapshot is read-only, and
+            its histograms are None unless hist is True.
+
+        No graphics are made, as when simulating headless. The years are run
+        as the summaries are asked for, so the simulation stops where the
+        loop over them stops, with the year and the animals of the last
+        summary given. Histories, animals and checkpoints being recorded are
+        written when the loop ends, also when it stops early.
+
+        Raises
+        ------
+        ValueError
+            if checkpoint_years is given without a checkpoint_base.
+        """
+        if checkpoint_years is not None and self._checkpoint_base is None:
+            raise ValueError("Checkpoints can not be saved without a "
+                             "checkpoint_base.")
+        edges = self._hist_edges if hist else None
+
+        self._final_year = self._year + num_years
+        try:
+            while self._year < self._final_year:
+                self._record_year()
+                self._isl.annual_cycle()  # letting one year on the island pass
+                self._year += 1  # updating the year count
+                self._periodic_checkpoint(checkpoint_years)
+                yield freeze(make_snapshot(self._isl, self._year, edges))
+        finally:
+            if self._checkpoints is not None:
+                self._checkpoints.flush()
+            if self._history is not None:
+                self._history.flush()
+            if self._trajectories is not None:
+                self._trajectories.flush()
+
+    def record_history(self, directory, maps=True, capacity=256):
+        """
+        Starts recording the history of the simulation: the animal counts,
+        summary statistics, histograms and, optionally, the density maps of
+        every year simulated from now on, see :mod:`biosim.history`.
+
+        Parameters
+        ----------
+        directory : str or path-like
+            directory of the history, made if it does not exist
+        maps : bool
+            if True the number of animals in each cell is recorded
+        capacity : int
+            number of years there is room for before the files are made
+            longer
+
+        Returns
+        -------
+        HistoryRecorder
+            the recorder
+
+
+        The history is written to memory-mapped files, not kept in memory,
+        and can be read with :func:`biosim.history.load_history`, also by
+        other processes while the simulation runs. Each year is recorded
+        before its annual cycle, as the graphics show it.
+        """
+        from biosim.history import HistoryRecorder
+
+        if self._history is not None:
+            self._history.close()
+        self._history = HistoryRecorder(
+            directory, self._isl.landscape, self._hist_edges, maps=maps,
+            capacity=capacity, limits={'ymax_animals': self.ymax_animals,
+                                       'cmax_h': self.cmax_h,
+                                       'cmax_c': self.cmax_c})
+        return self._history
+
+    def record_animals(self, directory, codec='zlib', level=None,
+                       fraction=1.0, cells=None, every=1):
+        """
+        Starts recording the age, weight, fitness and cell of every animal
+        on the island, each year simulated from now on, see
+        :mod:`biosim.trajectory`.
+
+        Parameters
+        ----------
+        directory : str or path-like
+            directory of the recording, made if it does not exist
+        codec : str
+            'zlib' or 'lzma', how the years are compressed
+        level : int or None
+            compression level, None for the default of the codec
+        fraction : float
+            fraction of the animals recorded, picked at random each year
+            without using the random numbers of the simulation
+        cells : list of tuples or None
+            locations (row, column) of the cells recorded, numbered from 1
+            as in 'loc', None for all cells
+        every : int
+            years between the years recorded
+
+        Returns
+        -------
+        TrajectoryRecorder
+            the recorder
+
+        Raises
+        ------
+        ValueError
+            if a cell is outside the island or is a water cell, see
+            :meth:`biosim.island.TheIsland.check_locations`.
+
+
+        The animals are collected from the island before the annual cycle
+        of each year recorded, and compressed and written by a background
+        thread while the simulation goes on. A recorded year is read with
+        :func:`biosim.trajectory.read_year`.
+        """
+        from biosim.trajectory import TrajectoryRecorder
+
+        if cells:
+            rows, cols = np.array(cells, dtype=int).T
+            self._isl.check_locations(rows, cols)
+        if self._trajectories is not None:
+            self._trajectories.close()
+        self._trajectories = TrajectoryRecorder(
+            directory, self._isl.landscape.shape, codec=codec, level=level,
+            fraction=fraction, cells=cells, every=every, seed=self._isl.seed)
+        return self._trajectories
+
+    def _record_year(self):
+        """Records the year in the history and of the animals, if recorded."""
+        if self._history is not None:
+            self._history.record(self._isl, self._year)
+        if self._trajectories is not None:
+            self._trajectories.record(self._isl, self._year)
+
+    def _periodic_checkpoint(self, checkpoint_years):
+        """
+        Saves a checkpoint in the background, if one is due this year.
+
+        Parameters
+        ----------
+        checkpoint_years : int or None
+            years between checkpoints, None for no checkpoints
+        """
+        if checkpoint_years is None or self._year % checkpoint_years != 0:
+            return
+        if not self._checkpoint_delta:
+            self.save_checkpoint('{}_{:05d}.npz'.format(self._checkpoint_base,
+                                                        self._year),
+                                 wait=False)
+            return
+
+        if self._series is None:
+            self._series = CheckpointSeries(self._checkpoint_base)
+        self._write_in_background(self._series.path(self._year),
+                                  self._checkpoint_arrays(),
+                                  write=self._series.write)
 
     def _setup_graphics(self):
         """
-        Creates the figure with different subplots. Subplots are:
-            - Map of island
-            - Counting years
-            - Plot of number of animals on the island
-            - Heatmaps for distribution of herbivores and carnivores
-            - Histograms showing distribution of animals fitness, age and
-              weight.
-        """
-        # Create figure window
-        if self._fig is None:
-            self._fig = plt.figure()
-
-        # Add axes for creating plot of island
-        if self._map_ax is None:
-            self._map_ax = self._fig.add_axes([0.1, 0.63, 0.3, 0.3])
-            self._img_ax = None
-
-        # Add axes count for years
-        if self._axt is None:
-            self._axt = self._fig.add_axes([0.4, 0.8, 0.2, 0.2])  # llx, lly, w, h
-            self._axt.axis('off')  # turn off coordinate system
-
-        # Add subplot for animal count plot
-        if self._line_ax is None:
-            self._line_ax = self._fig.add_subplot(3, 3, 3)
-            self._line_ax.set_ylim(0, self.ymax_animals)
-
-        self._line_ax.set_xlim(0, self._final_year + 1)
-        self._line_setup_graph()
-        self._line_ax.set_title('Animal count')
-
-        # Add axes for heatmaps for herbivore and carnivore distribution
-        if self._herb_ax is None and self._carn_ax is None:
-            self._herb_ax = self._fig.add_axes([0.15, 0.26, 0.34, 0.3])
-            self._carn_ax = self._fig.add_axes([0.6, 0.26, 0.34, 0.3])
-            self._img_ax_heat1 = None
-            self._img_ax_heat2 = None
-            self._herb_ax.set_title('Herbivore distribution')
-            self._carn_ax.set_title('Carnivore distribution')
-
-        # Add axes for histograms of fitness, age and weight
-        if self._fitness_ax is None and self._age_ax is None and self._weight_ax is None:
-            self._fitness_ax = self._fig.add_axes([0.1, 0.08, 0.23, 0.1])
-            self._age_ax = self._fig.add_axes([0.4, 0.08, 0.23, 0.1])
-            self._weight_ax = self._fig.add_axes([0.7, 0.08, 0.23, 0.1])
+        Creates the figure with different subplots, see
+        :meth:`biosim.graphics.Graphics.setup_graphics`. The graphics module,
+        and with it matplotlib, is imported the first time this is called.
+        """
+        if self._graphics is None:
+            if self._renderer == 'process':
+                from biosim.renderer import FrameRenderer as Graphics
+                options = {'queue_size': self._frame_queue,
+                           'show': self._interactive}
+            else:
+                from biosim.graphics import Graphics
+                options = {'interactive': self._interactive}
+
+            self._graphics = Graphics(self._isl.landscape, self.ymax_animals,
+                                      self.cmax_h, self.cmax_c,
+                                      self._hist_edges, **options)
+
+        self._graphics.setup_graphics(self._final_year)
+        if self._line_history is not None and self._renderer == 'inline':
+            self._graphics.set_line_history(*self._line_history)
+            self._line_history = None
 
     def _plot_island(self):
+        """Plots a map of the island."""
+        self._graphics.plot_island()
+        self.height, self.width = self._isl.landscape.shape
+
+    def _update_graphics(self):
         """
-        Plots a map of the island.
-        Initial code for this function was taken from Hans Ekkehard Plesser:
-        https://github.com/heplesser/nmbu_inf200_june2020/blob/master/examples
-        /plotting/mapping.py
-        """
-        island_map = self.island_map.replace(' ', '') + '\n'
-        # Colors to be used for the different landscapes on the island
-        #                   R    G    B
-        rgb_value = {'W': (0.0, 0.0, 1.0),  # blue
-                     'L': (0.0, 0.6, 0.0),  # dark green
-                     'H': (0.5, 1.0, 0.5),  # light green
-                     'D': (1.0, 1.0, 0.5)}  # light yellow
-
-        labels = {'W': 'Water', 'L': 'Lowland', 'H': 'Highland', 'D': 'Desert'}
-        # create patches as legend
-        patches = [mpatches.Patch(color=rgb_value[key], label=labels[key])
-                   for key in rgb_value.keys()]
-
-        geogr_rgb = [[rgb_value[column] for column in row]
-                     for row in island_map.splitlines()]
-        self.width = len(geogr_rgb[0])
-        self.height = len(geogr_rgb)
-        self._img_ax = self._map_ax.imshow(geogr_rgb)
-        self._map_ax.set_xticks(range(self.width))
-        self._map_ax.set_xticklabels(range(1, 1 + self.width))
-        self._map_ax.set_yticks(range(self.height))
-        self._map_ax.set_yticklabels(range(1, 1 + self.height))
-        self._map_ax.set_title('The island')
-        self._map_ax.legend(handles=patches, loc=4, borderaxespad=0.,
-                            fontsize=4)
-
-    def _line_setup_graph(self):
-        """
-        Creates the line graph/the animal count graph setup. If this graph are
-        already made, it makes sure it's updated by updating the xdata and
-        ydata.
-        """
-        if self._line_h is None and self._line_c is None:
-            line_h = self._line_ax.plot(np.arange(0, self._final_year),
-                                        np.full(self._final_year, np.nan),
-                                        'b-')
-            line_c = self._line_ax.plot(np.arange(0, self._final_year),
-                                        np.full(self._final_year, np.nan),
-                                        'r-')
-            self._line_h = line_h[0]
-            self._line_c = line_c[0]
-
-            self._line_ax.legend(['Herbivore', 'Carnivore'],
-                                 loc='upper left', fontsize=4)
+        Updates graphics each year, and makes a pause so that the plot are
+        visible between updates.
+        """
+        self._graphics.update_graphics(make_snapshot(self._isl, self._year,
+                                                     self._hist_edges))
+
+    def _save_graphics(self):
+        """Saves the figure/graphics to file, or streams it into the movie."""
+
+        if self._img_base is None:
+            return
+
+        if self._stream_movie:
+            if self._movie is None:
+                self._movie = self._movie_writer(self._movie_fmt)
+            self._movie.write_frame(self._graphics.rgb_frame())
+        elif self._encode_workers > 0:
+            if self._encoder is None:
+                from biosim.encoder import FrameEncoder
+
+                self._encoder = FrameEncoder(self._encode_workers)
+            self._encoder.submit(self._graphics.rgb_frame(),
+                                 '{}_{:05d}.{}'.format(self._img_base,
+                                                       self._img_no,
+                                                       self._img_fmt))
         else:
-            xdata_h, ydata_h = self._line_h.get_data()
-            xdata_c, ydata_c = self._line_c.get_data()
-            xnew = np.arange(xdata_h[-1] + 1, self._final_year)
-            if len(xnew) > 0:
-                ynew = np.full(xnew.shape, np.nan)
-                self._line_h.set_data(np.hstack((xdata_h, xnew)),
-                                      np.hstack((ydata_h, ynew)))
-                self._line_c.set_data(np.hstack((xdata_c, xnew)),
-                                      np.hstack((ydata_c, ynew)))
+            self._graphics.save_graphics('{}_{:05d}.{}'.format(self._img_base,
+                                                               self._img_no,
+                                                               self._img_fmt))
 
-    def _update_count(self):
+        self._img_no += 1  # updating image number/count
+
+    def _submit_frame(self, vis_years, img_years):
         """
-        Updates the counter that keeps track of which year of the simulation we
-        are looking at.
+        Sends a snapshot of the island to the renderer process, if the year
+        is to be shown or saved.
+
+        Parameters
+        ----------
+        vis_years : int
+            years between visualization updates
+        img_years : int
+            years between visualizations saved to files
         """
-        self._axt.cla()  # clear axes
-        self._axt.axis('off')
-        template = '\n\nYear: {:5d}\n\nHerbivores - blue\nCarnivores - red'
-        txt = self._axt.text(0.5, 0.5, template.format(0),
-                             horizontalalignment='center',
-                             verticalalignment='center',
-                             transform=self._axt.transAxes)  # relative coordinates
+        save = self._img_base is not None and self._year % img_years == 0
+        if not save and self._year % vis_years != 0:
+            return
+
+        filename = None
+        if save:
+            filename = '{}_{:05d}.{}'.format(self._img_base, self._img_no,
+                                             self._img_fmt)
+            self._img_no += 1  # updating image number/count
 
-        txt.set_text(template.format(self._year))
+        self._graphics.submit(make_snapshot(self._isl, self._year,
+                                            self._hist_edges), filename)
 
-    def _update_heatmaps(self, herbi_map, carni_map):
+    def _movie_writer(self, movie_fmt):
         """
-        Remakes heatmas of herbivores and carnivores. Makes sure axes
-        follows specifications.
+        Makes the writer of the movie img_base + '.' + movie_fmt.
 
         Parameters
         ----------
-        herbi_map : list of lists
-            represent the number of herbivores in each cell of the island
-        carni_map : list of lists
-            represent the number of carnivores in each cell of the island
-        """
-        # Update heatmap for herbivore distribution
-        if self._img_ax_heat1 is not None:
-            self._img_ax_heat1.set_data(herbi_map)
-        else:
-            self._img_ax_heat1 = self._herb_ax.imshow(herbi_map,
-                                                      interpolation='nearest',
-                                                      vmin=0, vmax=self.cmax_h)
-            plt.colorbar(self._img_ax_heat1, ax=self._herb_ax,
-                         shrink=0.8, orientation='vertical')
-            self._herb_ax.set_xticks(range(self.width))
-            self._herb_ax.set_xticklabels(range(1, 1 + self.width))
-            self._herb_ax.set_yticks(range(self.height))
-            self._herb_ax.set_yticklabels(range(1, 1 + self.height))
-
-        # Update heatmap for carnivore distribution
-        if self._img_ax_heat2 is not None:
-            self._img_ax_heat2.set_data(carni_map)
+        movie_fmt : str
+            'mp4', 'gif' or 'apng'
+
+        Returns
+        -------
+        MovieWriter or AnimationWriter
+            the writer, taking the frames as arrays of RGB values
+        """
+        from biosim.movie import AnimationWriter, MovieWriter
+
+        filename = '{}.{}'.format(self._img_base, movie_fmt)
+        if movie_fmt == 'mp4':
+            return MovieWriter(filename, encoder=self._ffmpeg_binary)
+        return AnimationWriter(filename, fmt=movie_fmt)
+
+    def close(self):
+        """
+        Stops the renderer process, if the graphics are drawn by one, after
+        it has drawn the frames sent. Also finishes a streamed movie, and
+        stops the workers writing figures, after the checkpoints waiting are
+        written, and stops recording the history and the animals.
+        """
+        if self._renderer == 'process' and self._graphics is not None:
+            self._graphics.close()
+            self._graphics = None
+        if self._movie is not None:
+            self._movie.close()
+            self._movie = None
+        if self._encoder is not None:
+            self._encoder.close()
+            self._encoder = None
+        if self._checkpoints is not None:
+            self._checkpoints.close()
+            self._checkpoints = None
+        if self._history is not None:
+            self._history.close()
+            self._history = None
+        if self._trajectories is not None:
+            self._trajectories.close()
+            self._trajectories = None
+
+    def _line_counts(self):
+        """
+        Gives the animal counts shown in the line graph so far.
+
+        Returns
+        -------
+        herbs : array of float
+            number of herbivores each year, nan for years not shown
+        carns : array of float
+            number of carnivores each year, nan for years not shown
+        """
+        if self._line_history is not None:
+            return self._line_history
+        if self._renderer == 'inline' and self._graphics is not None:
+            herbs, carns = self._graphics.line_history()
+            return herbs[:self._year], carns[:self._year]
+        return np.zeros(0), np.zeros(0)
+
+    def save_checkpoint(self, path, wait=True):
+        """
+        Saves the state of the simulation to a checkpoint file, see
+        :mod:`biosim.checkpoint`. The simulation can be continued from the
+        file with :meth:`load_checkpoint`.
+
+        Parameters
+        ----------
+        path : str or path-like
+            path to the checkpoint file, used as given (conventionally ending
+            with '.npz')
+        wait : bool
+            if False the checkpoint is written in the background, see below
+
+
+        The checkpoint holds the landscape, the population of every cell,
+        the parameters of the animals and landscapes, the state of the random
+        module, the year and the animal counts of the line graph, all as
+        NumPy arrays. The counts of the line graph are only kept when the
+        graphics are drawn by the 'inline' renderer.
+
+        The state is first copied into the arrays, which is quick, and most
+        of the time is spent compressing and writing them. With wait False
+        the copied arrays are written by a thread while the simulation goes
+        on, see :class:`biosim.checkpoint.CheckpointWriter`, and only the
+        newest checkpoint_keep checkpoints written this way are kept. Call
+        :meth:`close` to make sure they are all written.
+        """
+        arrays = self._checkpoint_arrays()
+        if wait:
+            write_checkpoint(path, arrays)
         else:
-            self._img_ax_heat2 = self._carn_ax.imshow(carni_map,
-                                                      interpolation='nearest',
-                                                      vmin=0, vmax=self.cmax_c)
-            plt.colorbar(self._img_ax_heat2, ax=self._carn_ax,
-                         shrink=0.8, orientation='vertical')
-            self._carn_ax.set_xticks(range(self.width))
-            self._carn_ax.set_xticklabels(range(1, 1 + self.width))
-            self._carn_ax.set_yticks(range(self.height))
-            self._carn_ax.set_yticklabels(range(1, 1 + self.height))
+            self._write_in_background(path, arrays)
 
-    def _update_histograms(self, herb_prop, carn_prob):
+    def _checkpoint_arrays(self):
+        """
+        Copies the state of the simulation into the arrays of a checkpoint.
+
+        Returns
+        -------
+        dict
+            the arrays, see :mod:`biosim.checkpoint`
+        """
+        herbs, carns = self._line_counts()
+        arrays = {'landscape': self._isl.landscape,
+                  'seed': np.array(self._isl.seed),
+                  'rng_mode': np.array(self._isl.rng_mode),
+                  'storage': np.array(self._isl.storage),
+                  'year': np.array(self._year),
+                  'island_year': np.array(self._isl.year),
+                  'img_no': np.array(self._img_no),
+                  'line_herbs': herbs, 'line_carns': carns}
+        arrays.update(population_arrays(self._isl))
+        arrays.update(params_arrays())
+        arrays.update(rng_arrays(self._isl.rng))
+        return arrays
+
+    def _write_in_background(self, path, arrays, write=write_checkpoint):
         """
-        Remakes histograms. Makes sure axes follows specifications.
+        Gives a checkpoint to the thread writing checkpoints, started the
+        first time.
 
         Parameters
         ----------
-        herb_prop : list of lists
-            lists of herbivores properties, first list is for fitness, second
-            for age and third for weight
-        carn_prob : list of lists
-            lists of carnivores properties, first list is for fitness, second
-            for age and third for weight
-        """
-        self._fitness_ax.cla()  # clear axes
-        self._fitness_ax.set_xlim([0, self._fit_max])
-        self._fitness_ax.set_ylim([0, 2000])
-        self._fitness_ax.set_title('Fitness')
-        self._age_ax.cla()  # clear axes
-        self._age_ax.set_xlim([0, self._age_max])
-        self._age_ax.set_ylim([0, 2000])
-        self._age_ax.set_title('Age')
-        self._weight_ax.cla()  # clear axes
-        self._weight_ax.set_xlim([0, self._weight_max])
-        self._weight_ax.set_ylim([0, 2000])
-        self._weight_ax.set_title('Weight')
-
-        # Plot histograms for herbivores properties
-        self._fitness_ax.hist(herb_prop[0], bins=self._fit_bins,
-                              range=(0, self._fit_max),
-                              histtype='stepfilled', fill=False,
-                              edgecolor='blue')
-        self._age_ax.hist(herb_prop[1], bins=self._age_bins,
-                          histtype='stepfilled', fill=False,
-                          range=(0, self._age_max),
-                          edgecolor='blue')
-        self._weight_ax.hist(herb_prop[2], bins=self._weight_bins,
-                             histtype='stepfilled', fill=False,
-                             range=(0, self._weight_max),
-                             edgecolor='blue')
-
-        # Plot histograms for carnivores properties
-        self._fitness_ax.hist(carn_prob[0], bins=self._fit_bins,
-                              histtype='stepfilled', fill=False,
-                              range=(0, self._fit_max),
-                              edgecolor='red')
-        self._age_ax.hist(carn_prob[1], bins=self._age_bins,
-                          histtype='stepfilled', fill=False,
-                          range=(0, self._age_max),
-                          edgecolor='red')
-        self._weight_ax.hist(carn_prob[2], bins=self._weight_bins,
-                             histtype='stepfilled', fill=False,
-                             range=(0, self._weight_max),
-                             edgecolor='red')
-
-    def _update_line_graph(self, num_herb=0, num_carn=0):
-        """
-        Update the line graph/the animal count graph.
+        path : str or path-like
+            path to the checkpoint file
+        arrays : dict
+            the arrays of the checkpoint
+        write : callable
+            function writing the arrays, see :meth:`CheckpointWriter.submit`
+        """
+        if self._checkpoints is None:
+            self._checkpoints = CheckpointWriter(keep=self._checkpoint_keep)
+        self._checkpoints.submit(path, arrays, write=write)
+
+    @classmethod
+    def load_checkpoint(cls, path, year=None, **kwargs):
+        """
+        Makes a simulation continuing from a checkpoint saved by
+        :meth:`save_checkpoint`. The simulation continues exactly as the
+        saved one would have, given the same number of workers.
 
         Parameters
         ----------
-        num_herb : int
-            total number of herbivores on the island
-        num_carn : int
-            total number of carnivores on the island
-        """
-        # Updating the ydata for herbivores
-        ydata_h = self._line_h.get_ydata()
-        ydata_h[self._year] = num_herb
-        self._line_h.set_ydata(ydata_h)
-
-        # Updating the ydata for carnivores
-        ydata_c = self._line_c.get_ydata()
-        ydata_c[self._year] = num_carn
-        self._line_c.set_ydata(ydata_c)
-
-        # Updating the y-axis limit for the animal count plot if number of
-        # either herbivores or carnivores exceed the self.ymax_animals
-        if num_herb > self.ymax_animals or num_carn > self.ymax_animals:
-            self.ymax_animals = max(num_herb, num_carn) + 2000
-            self._line_ax.set_ylim(0, round(self.ymax_animals, -3))
+        path : str or path-like
+            path to the checkpoint file, or to a directory of checkpoints
+            saved with checkpoint_delta
+        year : int or None
+            year of the checkpoint in a directory, None for the newest
+        kwargs
+            other arguments of :class:`BioSim`, e.g. img_base; the map, population, seed, rng_mode and storage
+            come from the checkpoint
 
-    def _update_graphics(self):
+        Returns
+        -------
+        BioSim
+            the restored simulation
+
+        Note
+        ----
+        The parameters of the animals and landscapes are class attributes,
+        so loading a checkpoint also sets them for other simulations.
         """
-        Updates graphics each year. Uses the methods for updating plots. Makes
-        a pause so that the plot are visible between updates.
+        if os.path.isdir(path):
+            arrays = CheckpointSeries.read(path, year)
+        else:
+            arrays = read_checkpoint(path)
+        return cls._from_arrays(arrays, **kwargs)
+
+    @classmethod
+    def _from_arrays(cls, arrays, **kwargs):
         """
-        # Get number of herbivores and carnivores, and update animal count plot
-        _, num_h, num_c = self._isl.total_num_animals_on_island()
-        self._update_line_graph(num_herb=num_h, num_carn=num_c)
+        Makes a simulation from the arrays of a checkpoint.
 
-        # Get herbivores and carnivores distribution, and update the heatmaps
-        h_map, c_map = self._isl.herbis_and_carnis_on_island()
-        self._update_heatmaps(herbi_map=h_map, carni_map=c_map)
+        Parameters
+        ----------
+        arrays : dict
+            the arrays, see :mod:`biosim.checkpoint`
+        kwargs
+            other arguments of :class:`BioSim`
 
-        # Get herbivores and carnivores properties, and update the histograms
-        herb_properties = self._isl.collect_fitness_age_weight_herbi()
-        carn_properties = self._isl.collect_fitness_age_weight_carni()
-        self._update_histograms(herb_prop=herb_properties,
-                                carn_prob=carn_properties)
-        # Update the year count
-        self._update_count()
+        Returns
+        -------
+        BioSim
+            the restored simulation
+        """
+        sim = cls(island_map=arrays['landscape'], ini_pop=[],
+                  seed=int(arrays['seed']), rng_mode=str(arrays['rng_mode']),
+                  storage=str(arrays['storage']), **kwargs)
+
+        set_params(arrays)
+        set_population(sim._isl, arrays)
+        set_rng(arrays)
+        sim._year = int(arrays['year'])
+        sim._isl.year = int(arrays['island_year'])
+        sim._img_no = int(arrays['img_no'])
+        if len(arrays['line_herbs']) > 0:
+            sim._line_history = (arrays['line_herbs'], arrays['line_carns'])
+        return sim
+
+    def fork(self, seed=None, **kwargs):
+        """
+        Makes a copy of the simulation that continues with its own random
+        numbers, e.g. to compare scenarios after a burn-in without simulating
+        the burn-in again for each of them.
 
-        plt.pause(1e-3)
+        Parameters
+        ----------
+        seed : int or None
+            seed of the random numbers of the copy, if None made from the
+            seed of this simulation and the number of copies made before
+        kwargs
+            other arguments of :class:`BioSim`, e.g. img_base; the plot
+            limits and the number of workers are those of this simulation
+            unless given
 
-    def _save_graphics(self):
-        """Saves the figure/graphics to file."""
+        Returns
+        -------
+        BioSim
+            the copy
 
-        if self._img_base is None:
-            return
 
-        plt.savefig('{}_{:05d}.{}'.format(self._img_base,
-                                          self._img_no,
-                                          self._img_fmt))
+        The animals are copied through the arrays of a checkpoint (see
+        :meth:`save_checkpoint`), not one by one with ``copy.deepcopy``. The
+        copy and this simulation do not share any animals, so animals can be
+        added to each of them, e.g. with :meth:`add_population`.
 
-        self._img_no += 1  # updating image number/count
+        With rng_mode 'global' the copy draws its random numbers from a
+        ``random.Random`` of its own instead of the random module, so the
+        copies and this simulation give independent streams. With rng_mode
+        'counter' the streams of the copy are keyed by its seed.
+        """
+        if seed is None:
+            sequence = np.random.SeedSequence(self._isl.seed,
+                                              spawn_key=(self._num_forks,))
+            seed = int(sequence.generate_state(1)[0])
+        self._num_forks += 1
+
+        kwargs.setdefault('ymax_animals', self.ymax_animals)
+        kwargs.setdefault('cmax_animals', {'Herbivore': self.cmax_h,
+                                           'Carnivore': self.cmax_c})
+
+        # Making the copy seeds the random module, which this simulation may
+        # be using
+        state = random.getstate()
+        try:
+            arrays = self._checkpoint_arrays()
+            arrays['seed'] = np.array(seed)
+            sim = self._from_arrays(arrays, **kwargs)
+        finally:
+            random.setstate(state)
+
+        if sim._isl.rng_mode == 'global':
+            sim._isl.rng = random.Random(seed)
+        for name in ('_fit_max', '_fit_bins', '_age_max', '_age_bins',
+                     '_weight_max', '_weight_bins', '_hist_edges'):
+            setattr(sim, name, getattr(self, name))
+        return sim
 
     def add_population(self, population):
         """
@@ -540,10 +1004,61 @@ class BioSim:
         ----------
         population : list of dicts
             List of dictionaries specifying population
+
+
+        Each dictionary gives the location of a cell and the population to
+        add to it. The population is either a list with one dictionary per
+        animal,
+            {'loc': (10, 10),
+             'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20}, ...]}
+
+        or, for large populations, a dictionary with the columns of each
+        species, either arrays of age and weight or a count of animals with
+        the same age and weight,
+            {'loc': (10, 10),
+             'pop': {'Herbivore': {'age': ages, 'weight': weights},
+                     'Carnivore': {'count': 40, 'age': 5, 'weight': 20}}}
+
+        Columns are added to the cells in bulk, without making a dictionary
+        for each animal.
         """
         # Adding the population to the island
         self._isl.add_animals_on_island(new_animals=population)
 
+    def add_population_from_file(self, path, fmt=None):
+        """
+        Add the population in a CSV or JSON-lines file to the island. The
+        file is read a chunk of animals at a time, so the whole population is
+        never held in memory, see
+        :func:`biosim.population.read_population_file` for the file formats.
+
+        Parameters
+        ----------
+        path : str or path-like
+            path to the population file
+        fmt : str or None
+            'csv' or 'jsonl', if None found from the file extension
+
+        Returns
+        -------
+        int
+            number of animals added
+        """
+        return self._isl.load_population_file(path, fmt=fmt)
+
+    @property
+    def island(self):
+        """
+        Makes it possible to get the island being simulated.
+
+        Returns
+        -------
+        TheIsland
+            The island of the simulation.
+        """
+
+        return self._isl
+
     @property
     def year(self):
         """
@@ -581,46 +1096,47 @@ class BioSim:
             Number of animals per species in island, as dictionary.
         """
 
-        num_herbis = self._isl.total_num_animals_on_island()[1]
-        num_carnis = self._isl.total_num_animals_on_island()[2]
+        _, num_herbis, num_carnis = self._isl.total_num_animals_on_island()
 
         return {'Herbivore': num_herbis, 'Carnivore': num_carnis}
 
-    def make_movie(self, movie_fmt=_DEFAULT_MOVIE_FORMAT):
+    def make_movie(self, movie_fmt=None):
         """
-        Create MPEG4 movie from visualization images saved.
+        Create a movie from visualization images saved.
+
+        Parameters
+        ----------
+        movie_fmt : str or None
+            'mp4', 'gif' or 'apng', if None the format of a streamed movie,
+            or 'mp4'
 
         Note
         ----
-        Requires ffmpeg
+        mp4 movies require ffmpeg. Animated GIF and PNG movies are written
+        with Pillow, reading the images one at a time.
 
 
         The movie is stored as img_base + movie_fmt
+
+        If the figures were streamed into a movie (stream_movie=True), the
+        movie is finished instead, and must have the format it was streamed
+        in.
         """
         if self._img_base is None:
             raise RuntimeError("No filename defined.")
 
-        if movie_fmt == 'mp4':
-            try:
-                subprocess.check_call([_FFMPEG_BINARY,
-                                       '-i', '{}_%05d.png'.format(self._img_base),
-                                       '-y',
-                                       '-profile:v', 'baseline',
-                                       '-level', '3.0',
-                                       '-pix_fmt', 'yuv420p',
-                                       '{}.{}'.format(self._img_base,
-                                                      movie_fmt)])
-            except subprocess.CalledProcessError as err:
-                raise RuntimeError(f"ERROR: ffmpeg failed with: {err}")
-        elif movie_fmt == 'gif':
-            try:
-                subprocess.check_call([_CONVERT_BINARY,
-                                       '-delay', '1',
-                                       '-loop', '0',
-                                       '{}_*.png'.format(self._img_base),
-                                       '{}.{}'.format(self._img_base,
-                                                      movie_fmt)])
-            except subprocess.CalledProcessError as err:
-                raise RuntimeError(f"ERROR: convert failed with: {err}")
-        else:
-            raise ValueError(f"Unknown movie format: {movie_fmt}")
+        if self._stream_movie:
+            if movie_fmt not in (None, self._movie_fmt):
+                raise ValueError(f"The movie was streamed as {self._movie_fmt}.")
+            if self._movie is not None:
+                self._movie.close()
+                self._movie = None
+            return
+
+        if movie_fmt is None:
+            movie_fmt = _DEFAULT_MOVIE_FORMAT
+
+        from biosim.movie import images_to_movie
+
+        images_to_movie(self._img_base, movie_fmt, encoder=self._ffmpeg_binary,
+                        img_fmt=self._img_fmt)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compact summaries of the state of the island in one year, holding what the
+graphics show: the number of animals of each species, the density of each
+species in every cell, and histogram counts of fitness, age and weight.
+A snapshot holds only arrays and numbers, so it can be sent to another
+process, see :mod:`biosim.renderer`, or given to code outside the simulation,
+see :meth:`biosim.simulation.BioSim.iter_years`.
+"""
+
+from collections import namedtuple
+from types import MappingProxyType
+import numpy as np
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+# Properties histograms are made of, in the order the island collects them
+HIST_PROPERTIES = ('fitness', 'age', 'weight')
+
+Snapshot = namedtuple('Snapshot', ['year', 'num_herbs', 'num_carns',
+                                   'herbi_map', 'carni_map', 'hist'])
+Snapshot.__doc__ = """\
+State of the island in one year.
+
+year : int
+    the year of the snapshot
+num_herbs, num_carns : int
+    number of herbivores and carnivores on the island
+herbi_map, carni_map : 2D array of int
+    number of herbivores and carnivores in each cell
+hist : dict or None
+    for each property in ``HIST_PROPERTIES``, a tuple with the histogram
+    counts of the herbivores and the carnivores, None if not made
+"""
+
+
+def hist_edges(hist_specs):
+    """
+    Makes the bin edges of the histograms, once for all years.
+
+    Parameters
+    ----------
+    hist_specs : dict
+        maximum value and number of bins of each property, e.g.
+        {'fitness': (1.0, 20), 'age': (60, 30), 'weight': (60, 30)}
+
+    Returns
+    -------
+    dict
+        array of bin edges for each property, from 0 to the maximum value
+    """
+    return {prop: np.linspace(0, max_value, num_bins + 1)
+            for prop, (max_value, num_bins) in hist_specs.items()}
+
+
+def make_snapshot(island, year, edges):
+    """
+    Makes a snapshot of the island.
+
+    Parameters
+    ----------
+    island : TheIsland
+        the island
+    year : int
+        the year of the simulation
+    edges : dict or None
+        bin edges of the histograms, see :func:`hist_edges`, None to make no
+        histograms, so the fitness, age and weight of the animals are not
+        collected
+
+    Returns
+    -------
+    Snapshot
+        the state of the island
+    """
+    herbi_map, carni_map = island.herbis_and_carnis_on_island()
+    if edges is None:
+        return Snapshot(year, int(herbi_map.sum()), int(carni_map.sum()),
+                        herbi_map, carni_map, None)
+
+    _, num_herbs, num_carns = island.total_num_animals_on_island()
+    herb_props = island.collect_fitness_age_weight_herbi()
+    carn_props = island.collect_fitness_age_weight_carni()
+    hist = histograms(herb_props, carn_props, edges)
+    return Snapshot(year, num_herbs, num_carns, herbi_map, carni_map, hist)
+
+
+def freeze(snapshot):
+    """
+    Makes the arrays of a snapshot read-only, and its histograms a read-only
+    mapping, so the snapshot can not be changed by the code it is given to.
+
+    Parameters
+    ----------
+    snapshot : Snapshot
+        the snapshot, whose arrays are not used elsewhere
+
+    Returns
+    -------
+    Snapshot
+        the read-only snapshot
+    """
+    arrays = [snapshot.herbi_map, snapshot.carni_map]
+    hist = snapshot.hist
+    if hist is not None:
+        arrays += [counts for pair in hist.values() for counts in pair]
+        hist = MappingProxyType(hist)
+    for array in arrays:
+        array.setflags(write=False)
+    return snapshot._replace(hist=hist)
+
+
+def histograms(herb_props, carn_props, edges):
+    """
+    Counts the animals in the bins of the histogram of each property.
+
+    Parameters
+    ----------
+    herb_props : tuple of lists
+        fitness, age and weight of the herbivores, as collected by the island
+    carn_props : tuple of lists
+        fitness, age and weight of the carnivores
+    edges : dict
+        bin edges of the histograms, see :func:`hist_edges`
+
+    Returns
+    -------
+    dict
+        for each property in ``HIST_PROPERTIES``, a tuple with the histogram
+        counts of the herbivores and the carnivores
+    """
+    return {prop: (np.histogram(herb_props[i], bins=edges[prop])[0],
+                   np.histogram(carn_props[i], bins=edges[prop])[0])
+            for i, prop in enumerate(HIST_PROPERTIES)}
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+
+"""
+Recording of every animal on the island, year by year, in compressed chunks.
+
+The animals of a year are collected as a table with the columns
+
+species
+    0 for herbivores, 1 for carnivores
+cell
+    index of the cell of the animal, ``row * number_of_columns + column``
+age, weight, fitness
+    the properties of the animal
+
+The columns of a year are compressed together, with ``zlib`` or ``lzma``,
+into a chunk, and the chunks are appended to ``animals.dat`` in the
+directory of the recording. ``index.dat`` has a record for each chunk, with
+the year, the position and size of the chunk, and the number of animals in
+it, so any year can be read without reading the others. The index record is
+written after its chunk, so a recording can be read while it is written.
+
+Compressing and writing the chunks is done by a background thread, while the
+simulation goes on. To keep the recording small, the animals can be
+sub-sampled, only some cells recorded, or only every few years.
+"""
+
+from biosim.animals import Herbivores, Carnivores
+from biosim.view import fitness_of
+import json
+import lzma
+import os
+import queue
+import threading
+import zlib
+import numpy as np
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+# Columns of the tables, in the order they are stored in a chunk
+COLUMNS = (('species', np.uint8), ('cell', np.int64), ('age', np.float64),
+           ('weight', np.float64), ('fitness', np.float64))
+
+# Record of a chunk in the index
+INDEX_DTYPE = np.dtype([('year', '<i8'), ('offset', '<i8'), ('size', '<i8'),
+                        ('num_animals', '<i8')])
+
+_CODECS = {'zlib': (zlib.compress, zlib.decompress),
+           'lzma': (lzma.compress, lzma.decompress)}
+
+_META_NAME = 'meta.json'
+_DATA_NAME = 'animals.dat'
+_INDEX_NAME = 'index.dat'
+
+
+def population_table(island, cells=None):
+    """
+    Collects the animals on the island as a table.
+
+    Parameters
+    ----------
+    island : TheIsland
+        the island
+    cells : set of int or None
+        indices of the cells to collect, None for all cells
+
+    Returns
+    -------
+    dict
+        array of each column in ``COLUMNS``, herbivores first, cell by cell
+    """
+    table = {name: [] for name, _ in COLUMNS}
+    for code, (cls, attr) in enumerate(((Herbivores, 'herbi_list'),
+                                        (Carnivores, 'carni_list'))):
+        keys, ages, weights = [], [], []
+        for key, (_, _, cell) in zip(island._land_keys, island._land_cells):
+            animals = getattr(cell, attr)
+            if not animals or (cells is not None and key not in cells):
+                continue
+            keys += [key] * len(animals)
+            ages += [animal.age for animal in animals]
+            weights += [animal.weight for animal in animals]
+
+        age = np.array(ages, dtype=np.float64)
+        weight = np.array(weights, dtype=np.float64)
+        table['species'].append(np.full(len(keys), code, dtype=np.uint8))
+        table['cell'].append(np.array(keys, dtype=np.int64))
+        table['age'].append(age)
+        table['weight'].append(weight)
+        table['fitness'].append(fitness_of(age, weight, cls.get_params()))
+
+    return {name: np.concatenate(table[name]).astype(dtype)
+            for name, dtype in COLUMNS}
+
+
+class TrajectoryRecorder:
+    """
+    Records the age, weight, fitness and cell of the animals on the island
+    every year, in compressed chunks written by a background thread. At most
+    a few years wait to be written, so the memory used stays bounded if the
+    writer falls behind.
+    """
+
+    def __init__(self, directory, shape, codec='zlib', level=None,
+                 fraction=1.0, cells=None, every=1, seed=0, queue_size=2):
+        """
+        Makes the directory and the files of a new recording, and starts the
+        writer thread.
+
+        Parameters
+        ----------
+        directory : str or path-like
+            directory of the recording, made if it does not exist
+        shape : tuple of ints
+            number of rows and columns of the island
+        codec : str
+            'zlib' or 'lzma', how the chunks are compressed
+        level : int or None
+            compression level of the codec, None for its default
+        fraction : float
+            fraction of the animals recorded, each animal is picked at random
+            every year
+        cells : list of tuples or None
+            locations (row, column), numbered from 1 as in 'loc', of the
+            cells recorded, None for all cells
+        every : int
+            years between the years recorded
+        seed : int
+            seed of the random numbers picking the animals, which are not
+            those of the simulation
+        queue_size : int
+            number of years that can wait to be written
+
+        Raises
+        ------
+        ValueError
+            if the codec is unknown, fraction is not in (0, 1], or every is
+            less than one.
+        """
+        if codec not in _CODECS:
+            raise ValueError(f"Unknown codec: {codec}")
+        if not 0 < fraction <= 1:
+            raise ValueError("The fraction of animals must be in (0, 1].")
+        if every < 1:
+            raise ValueError("At least one year must be between the years "
+                             "recorded.")
+
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.codec = codec
+        self.level = level
+        self.fraction = fraction
+        self.every = every
+        self._cells = None
+        if cells is not None:
+            self._cells = {(row - 1) * shape[1] + col - 1 for row, col in cells}
+        self._rng = np.random.default_rng(seed)
+
+        meta = {'shape': list(shape), 'codec': codec,
+                'columns': [[name, np.dtype(dtype).str] for name, dtype in COLUMNS],
+                'fraction': fraction, 'every': every,
+                'cells': None if cells is None else [list(cell) for cell in cells]}
+        with open(os.path.join(self.directory, _META_NAME), 'w') as file:
+            json.dump(meta, file)
+        self._data = open(os.path.join(self.directory, _DATA_NAME), 'wb')
+        self._index = open(os.path.join(self.directory, _INDEX_NAME), 'wb')
+
+        self.num_chunks = 0  # number of chunks written
+        self._pending = queue.Queue(maxsize=queue_size)
+        self._errors = []
+        self._thread = threading.Thread(target=self._write_chunks, daemon=True)
+        self._thread.start()
+
+    def record(self, island, year):
+        """
+        Collects the animals of a year to be written, if the year is
+        recorded.
+
+        Parameters
+        ----------
+        island : TheIsland
+            the island
+        year : int
+            the year of the simulation
+        """
+        if year % self.every != 0:
+            return
+        table = population_table(island, self._cells)
+        if self.fraction < 1:
+            picked = self._rng.random(len(table['cell'])) < self.fraction
+            table = {name: column[picked] for name, column in table.items()}
+        self._pending.put((year, table))
+
+    def _compress(self, table):
+        """
+        Compresses the columns of a table into a chunk.
+
+        Parameters
+        ----------
+        table : dict
+            array of each column
+
+        Returns
+        -------
+        bytes
+            the chunk
+        """
+        compress, _ = _CODECS[self.codec]
+        data = b''.join(table[name].tobytes() for name, _ in COLUMNS)
+        if self.level is None:
+            return compress(data)
+        if self.codec == 'lzma':
+            return compress(data, preset=self.level)
+        return compress(data, self.level)
+
+    def _write_chunks(self):
+        """Writes the years given to the recorder until told to stop."""
+        while True:
+            item = self._pending.get()
+            try:
+                if item is None:  # the simulation is finished with the recorder
+                    break
+                year, table = item
+                chunk = self._compress(table)
+                offset = self._data.tell()
+                self._data.write(chunk)
+                self._data.flush()
+                record = np.array([(year, offset, len(chunk),
+                                    len(table['cell']))], dtype=INDEX_DTYPE)
+                self._index.write(record.tobytes())
+                self._index.flush()
+                self.num_chunks += 1
+            except Exception as err:
+                self._errors.append(f'{item[0]}: {err!r}')
+            finally:
+                self._pending.task_done()
+
+    def flush(self):
+        """
+        Waits until every year given to the recorder is written.
+
+        Raises
+        ------
+        RuntimeError
+            if a year could not be written.
+        """
+        self._pending.join()
+        errors, self._errors = self._errors, []
+        if errors:
+            raise RuntimeError("Recording animals failed: " + '; '.join(errors))
+
+    def close(self):
+        """Writes the years waiting, stops the writer thread and closes the files."""
+        if self._thread.is_alive():
+            self._pending.put(None)
+            self._thread.join()
+        try:
+            self.flush()
+        finally:
+            self._data.close()
+            self._index.close()
+
+
+def read_index(directory):
+    """
+    Reads the index of a recording made by :class:`TrajectoryRecorder`.
+
+    Parameters
+    ----------
+    directory : str or path-like
+        directory of the recording
+
+    Returns
+    -------
+    array of INDEX_DTYPE
+        a record for each chunk written, with the fields 'year', 'offset',
+        'size' and 'num_animals'
+    """
+    path = os.path.join(os.fspath(directory), _INDEX_NAME)
+    with open(path, 'rb') as file:
+        data = file.read()
+    complete = len(data) - len(data) % INDEX_DTYPE.itemsize
+    return np.frombuffer(data[:complete], dtype=INDEX_DTYPE)
+
+
+def read_year(directory, year):
+    """
+    Reads the animals recorded in a year.
+
+    Parameters
+    ----------
+    directory : str or path-like
+        directory of the recording
+    year : int
+        the year
+
+    Returns
+    -------
+    dict
+        array of each column in ``COLUMNS``
+
+    Raises
+    ------
+    KeyError
+        if the year is not recorded.
+    """
+    directory = os.fspath(directory)
+    with open(os.path.join(directory, _META_NAME)) as file:
+        meta = json.load(file)
+    index = read_index(directory)
+    found = np.nonzero(index['year'] == year)[0]
+    if len(found) == 0:
+        raise KeyError(f"Year {year} is not recorded in {directory}")
+    record = index[found[-1]]
+
+    with open(os.path.join(directory, _DATA_NAME), 'rb') as file:
+        file.seek(int(record['offset']))
+        chunk = file.read(int(record['size']))
+    _, decompress = _CODECS[meta['codec']]
+    data = decompress(chunk)
+
+    table = {}
+    position = 0
+    num_animals = int(record['num_animals'])
+    for name, dtype in meta['columns']:
+        column = np.frombuffer(data, dtype=dtype, count=num_animals,
+                               offset=position)
+        table[name] = column
+        position += column.nbytes
+    return table
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+"""
+Read-only views of the animals in a cell.
+
+The views are given by :meth:`biosim.island.TheIsland.give_animals_in_cell`
+instead of the lists the cell keeps its animals in. A view reads the cell's
+storage every time it is used, so it always shows the animals that are in the
+cell now, and it can not be used to change them.
+"""
+
+from biosim.animals import Herbivores
+import numpy as np
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+
+class AnimalView:
+    """Read-only view of one animal."""
+
+    __slots__ = ('_animal',)
+
+    def __init__(self, animal):
+        """
+        Parameters
+        ----------
+        animal : Animal
+            the animal to view
+        """
+        self._animal = animal
+
+    @property
+    def age(self):
+        """Age of the animal."""
+        return self._animal.age
+
+    @property
+    def weight(self):
+        """Weight of the animal."""
+        return self._animal.weight
+
+    @property
+    def fitness(self):
+        """Fitness of the animal."""
+        return self._animal.fitness()
+
+    @property
+    def species(self):
+        """Name of the species of the animal, 'Herbivore' or 'Carnivore'."""
+        return 'Herbivore' if isinstance(self._animal, Herbivores) else 'Carnivore'
+
+    def __repr__(self):
+        return f'{self.species}(age={self.age}, weight={self.weight})'
+
+
+class CellAnimals:
+    """
+    Read-only view of the animals of one species in a cell. Supports ``len``,
+    iteration and indexing, which give a :class:`AnimalView` of each animal,
+    and gives the age, weight and fitness of all the animals as arrays.
+    """
+
+    __slots__ = ('_island', '_x', '_y', '_attr')
+
+    def __init__(self, island, x, y, species):
+        """
+        Parameters
+        ----------
+        island : TheIsland
+            the island of the cell
+        x : int
+            row number of the cell as python uses it
+        y : int
+            column number of the cell as python uses it
+        species : str
+            'Herbivore' or 'Carnivore'
+
+        Raises
+        ------
+        KeyError
+            if species is not 'Herbivore' or 'Carnivore'.
+        """
+        if species not in ('Herbivore', 'Carnivore'):
+            raise KeyError(f"Invalid species: {species}")
+        # With sparse storage the cell may not be made yet, and the cell
+        # replaces its lists, so look both up every time
+        self._island = island
+        self._x = x
+        self._y = y
+        self._attr = 'herbi_list' if species == 'Herbivore' else 'carni_list'
+
+    def _animals(self):
+        """Gives the list the cell currently keeps the animals in."""
+        cell = self._island.cell_at(self._x, self._y)
+        if cell is None:  # water, or a cell animals have not come to yet
+            return []
+        return getattr(cell, self._attr)
+
+    def __len__(self):
+        return len(self._animals())
+
+    def __iter__(self):
+        return map(AnimalView, self._animals())
+
+    def __getitem__(self, index):
+        return AnimalView(self._animals()[index])
+
+    def __repr__(self):
+        return f'CellAnimals({list(self)})'
+
+    @property
+    def age(self):
+        """Array with the age of each animal."""
+        return np.fromiter((animal.age for animal in self._animals()),
+                           dtype=float, count=len(self))
+
+    @property
+    def weight(self):
+        """Array with the weight of each animal."""
+        return np.fromiter((animal.weight for animal in self._animals()),
+                           dtype=float, count=len(self))
+
+    @property
+    def fitness(self):
+        """
+        Array with the fitness of each animal, computed for all the animals at
+        once with the same formula as :meth:`biosim.animals.Animal.fitness`.
+        """
+        animals = self._animals()
+        if not animals:
+            return np.empty(0)
+        return fitness_of(self.age, self.weight, animals[0].get_params())
+
+
+def fitness_of(age, weight, params):
+    """
+    Computes the fitness of many animals of a species at once, with the same
+    formula as :meth:`biosim.animals.Animal.fitness`.
+
+    Parameters
+    ----------
+    age : array
+        age of each animal
+    weight : array
+        weight of each animal
+    params : dict
+        parameters of the species
+
+    Returns
+    -------
+    array of float
+        fitness of each animal
+    """
+    q_age = 1.0 / (1.0 + np.exp(params['phi_age'] * (age - params['a_half'])))
+    q_weight = 1.0 / (1.0 + np.exp(-params['phi_weight']
+                                   * (weight - params['w_half'])))
+    return np.where(weight <= 0, 0., q_age * q_weight)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import subprocess
+import sys
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+"""
+Measures how long it takes to import biosim and to construct the first BioSim
+instance, each in a fresh Python process so nothing is imported beforehand.
+Also checks that matplotlib is not imported unless graphics are used.
+"""
+
+_IMPORT = """\
+import time
+start = time.perf_counter()
+import biosim.simulation
+print(time.perf_counter() - start)
+"""
+
+_CONSTRUCT = """\
+import time
+start = time.perf_counter()
+from biosim.simulation import BioSim
+sim = BioSim(island_map="WWWW\\nWLHW\\nWWWW",
+             ini_pop=[{'loc': (2, 2),
+                       'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20}
+                               for _ in range(50)]}],
+             seed=1)
+print(time.perf_counter() - start)
+"""
+
+_HEADLESS = """\
+import sys
+from biosim.simulation import BioSim
+sim = BioSim(island_map="WWWW\\nWLHW\\nWWWW", ini_pop=[], seed=1)
+sim.simulate(num_years=10, vis_years=None)
+print('matplotlib' in sys.modules)
+"""
+
+
+def run(code, repeats):
+    """
+    Runs code in fresh Python processes and gives the lines printed.
+
+    Parameters
+    ----------
+    code : str
+        the code to run
+    repeats : int
+        number of processes to run the code in
+
+    Returns
+    -------
+    list of str
+        the output of each process
+    """
+    return [subprocess.check_output([sys.executable, '-c', code],
+                                    text=True).strip()
+            for _ in range(repeats)]
+
+
+if __name__ == '__main__':
+    repeats = 5
+
+    import_times = [float(t) for t in run(_IMPORT, repeats)]
+    construct_times = [float(t) for t in run(_CONSTRUCT, repeats)]
+    print(f'import biosim.simulation:     {1000 * min(import_times):7.1f} ms'
+          f' (best of {repeats})')
+    print(f'import and first BioSim(...): {1000 * min(construct_times):7.1f} ms'
+          f' (best of {repeats})')
+    print(f'matplotlib imported when headless: {run(_HEADLESS, 1)[0]}')
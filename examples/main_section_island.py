@@ -26,39 +26,39 @@ if __name__ == "__main__":
     isl.construct_island_with_cells()
     print("Landscape used in TheIsland-class\n", isl.island_cells)
     isl.add_animals_on_island(ini_herbs)
-    print(isl.island_cells[1][1].get_params())
+    print(isl.cell_at(1, 1).get_params())
 
-    print("Weight of one herbivore:", isl.island_cells[1][1].herbi_list[0].weight)
+    print("Weight of one herbivore:", isl.cell_at(1, 1).herbi_list[0].weight)
     isl.all_animals_eat()
-    print("Weight of one herbivore:", isl.island_cells[1][1].herbi_list[0].weight)
+    print("Weight of one herbivore:", isl.cell_at(1, 1).herbi_list[0].weight)
 
-    print("Animals in cell before birth:", len(isl.island_cells[1][1].herbi_list))
+    print("Animals in cell before birth:", len(isl.cell_at(1, 1).herbi_list))
     isl.animals_procreate()
-    print("Animals in cell after birth:", len(isl.island_cells[1][1].herbi_list))
+    print("Animals in cell after birth:", len(isl.cell_at(1, 1).herbi_list))
 
-    print("Age of one herbivore:", isl.island_cells[1][1].herbi_list[0].age)
+    print("Age of one herbivore:", isl.cell_at(1, 1).herbi_list[0].age)
     isl.all_animals_age()
-    print("Age of one herbivore:", isl.island_cells[1][1].herbi_list[0].age)
+    print("Age of one herbivore:", isl.cell_at(1, 1).herbi_list[0].age)
 
-    print("Weight of one herbivore:", isl.island_cells[1][1].herbi_list[0].weight)
+    print("Weight of one herbivore:", isl.cell_at(1, 1).herbi_list[0].weight)
     isl.all_animals_losses_weight()
-    print("Weight of one herbivore:", isl.island_cells[1][1].herbi_list[0].weight)
+    print("Weight of one herbivore:", isl.cell_at(1, 1).herbi_list[0].weight)
 
-    print("Animals in cell before death:", len(isl.island_cells[1][1].herbi_list))
+    print("Animals in cell before death:", len(isl.cell_at(1, 1).herbi_list))
     isl.animals_die()
-    print("Animals in cell after death:", len(isl.island_cells[1][1].herbi_list))
+    print("Animals in cell after death:", len(isl.cell_at(1, 1).herbi_list))
 
     # Start of year:
     print("\nBEFORE ANNUAL CYCLE")
-    print("Weight of one herbivore:", isl.island_cells[1][1].herbi_list[0].weight)
-    print("Animals in cell:", len(isl.island_cells[1][1].herbi_list))
-    print("Age of one herbivore:", isl.island_cells[1][1].herbi_list[0].age)
+    print("Weight of one herbivore:", isl.cell_at(1, 1).herbi_list[0].weight)
+    print("Animals in cell:", len(isl.cell_at(1, 1).herbi_list))
+    print("Age of one herbivore:", isl.cell_at(1, 1).herbi_list[0].age)
 
     isl.annual_cycle()
     print("\nAFTER ANNUAL CYCLE")
-    print("Weight of one herbivore:", isl.island_cells[1][1].herbi_list[0].weight)
-    print("Animals in cell:", len(isl.island_cells[1][1].herbi_list))
-    print("Age of one herbivore:", isl.island_cells[1][1].herbi_list[0].age)
+    print("Weight of one herbivore:", isl.cell_at(1, 1).herbi_list[0].weight)
+    print("Animals in cell:", len(isl.cell_at(1, 1).herbi_list))
+    print("Age of one herbivore:", isl.cell_at(1, 1).herbi_list[0].age)
 
     new = [{'loc': (2, 2),
             'pop': [{'species': 'Herbivore', 'age': 10, 'weight': 10},
@@ -71,10 +71,10 @@ if __name__ == "__main__":
            ]
 
     print("\nAnimals in cell before:",
-          len(isl.island_cells[1][1].herbi_list + isl.island_cells[1][1].carni_list))
+          len(isl.cell_at(1, 1).herbi_list + isl.cell_at(1, 1).carni_list))
     isl.add_animals_on_island(new_animals=new)
     print("Animals in cell after:",
-          len(isl.island_cells[1][1].herbi_list + isl.island_cells[1][1].carni_list))
+          len(isl.cell_at(1, 1).herbi_list + isl.cell_at(1, 1).carni_list))
 
     # Testing an island with more than one inhabitable cell:
     print('\nBIGGER ISLAND, FOR TESTING MIGRATION')
@@ -106,20 +106,20 @@ if __name__ == "__main__":
     isl2.migration()
     print("after migration")
     herb, carn = isl2.give_animals_in_cell(2, 2)
-    print(f"\nAnimals in (2, 2):", len(herb + carn))
+    print(f"\nAnimals in (2, 2):", len(herb) + len(carn))
     herb, carn = isl2.give_animals_in_cell(2, 3)
-    print(f"Animals in (2, 3):", len(herb + carn))
+    print(f"Animals in (2, 3):", len(herb) + len(carn))
     herb, carn = isl2.give_animals_in_cell(2, 4)
-    print(f"Animals in (2, 4):", len(herb + carn))
+    print(f"Animals in (2, 4):", len(herb) + len(carn))
     herb, carn = isl2.give_animals_in_cell(3, 2)
-    print(f"\nAnimals in (3, 2):", len(herb + carn))
+    print(f"\nAnimals in (3, 2):", len(herb) + len(carn))
     herb, carn = isl2.give_animals_in_cell(3, 3)
-    print(f"Animals in (3, 3):", len(herb + carn))
+    print(f"Animals in (3, 3):", len(herb) + len(carn))
     herb, carn = isl2.give_animals_in_cell(3, 4)
-    print(f"Animals in (3, 4):", len(herb + carn))
+    print(f"Animals in (3, 4):", len(herb) + len(carn))
     herb, carn = isl2.give_animals_in_cell(4, 2)
-    print(f"\nAnimals in (4, 2):", len(herb + carn))
+    print(f"\nAnimals in (4, 2):", len(herb) + len(carn))
     herb, carn = isl2.give_animals_in_cell(4, 3)
-    print(f"Animals in (4, 3):", len(herb + carn))
+    print(f"Animals in (4, 3):", len(herb) + len(carn))
     herb, carn = isl2.give_animals_in_cell(4, 4)
-    print(f"Animals in (4, 4):", len(herb + carn))
+    print(f"Animals in (4, 4):", len(herb) + len(carn))
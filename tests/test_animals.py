@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from biosim.animals import Herbivores, Carnivores
+import numpy as np
 import pytest
 from scipy.stats import normaltest
 
@@ -171,6 +172,31 @@ class TestHerbivores:
             array_birth_weight.append(self.herb.birth_weight())
         assert normaltest(array_birth_weight)[1] > alpha
 
+    def test_from_arrays_same_as_constructor(self):
+        """
+        Tests that animals made from arrays get the same age and weight as
+        animals made one by one.
+        """
+        ages = np.array([0, 3, 10])
+        weights = np.array([8.123, 20.0, 35.555])
+        herbis = Herbivores.from_arrays(ages, weights)
+        for herbi, age, weight in zip(herbis, ages.tolist(), weights.tolist()):
+            expected = Herbivores(age=age, weight=weight)
+            assert isinstance(herbi, Herbivores)
+            assert (herbi.age, herbi.weight) == (expected.age, expected.weight)
+
+    def test_from_arrays_not_negative(self):
+        """Tests that a ValueError is raised for negative ages or weights."""
+        with pytest.raises(ValueError):
+            Herbivores.from_arrays([1, 2], [10, -1])
+        with pytest.raises(ValueError):
+            Herbivores.from_arrays([1, -2], [10, 1])
+
+    def test_from_arrays_not_nan(self):
+        """Tests that a ValueError is raised for weights that are nan."""
+        with pytest.raises(ValueError):
+            Herbivores.from_arrays([1, 2], [10, np.nan])
+
 
 class TestCarnivores:
     @pytest.fixture()
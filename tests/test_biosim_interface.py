@@ -22,6 +22,8 @@ import pandas
 import glob
 import os
 import os.path
+import subprocess
+import sys
 
 from biosim.simulation import BioSim
 
@@ -201,3 +203,141 @@ def test_figure_saved(figfile_root):
 
     assert os.path.isfile(figfile_root + '_00000.png')
     assert os.path.isfile(figfile_root + '_00001.png')
+
+
+def test_island_from_map_file(tmp_path):
+    """Test that the island can be read from a map file"""
+    path = tmp_path / 'island.map'
+    path.write_text("WWWW\nWLHW\nWWWW\n")
+    sim = BioSim(island_map=path, ini_pop=[], seed=1, storage='sparse')
+    sim.simulate(num_years=2, vis_years=100, img_years=100)
+    assert sim.year == 2
+
+
+def test_island_from_map_file_string(tmp_path):
+    """Test that the island can be read from a map file given as a string"""
+    path = tmp_path / 'island.map'
+    path.write_text("WWWW\nWLHW\nWWWW\n")
+    sim = BioSim(island_map=str(path), ini_pop=[], seed=1)
+    assert sim.island.landscape.shape == (3, 4)
+
+
+def test_headless_simulate(mocker):
+    """Test that a headless simulation makes no graphics but counts animals"""
+    setup = mocker.patch.object(BioSim, '_setup_graphics')
+    update = mocker.patch.object(BioSim, '_update_graphics')
+    sim = BioSim(island_map="WWWW\nWLHW\nWWWW",
+                 ini_pop=[{'loc': (2, 2),
+                           'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20.}
+                                   for _ in range(10)]}],
+                 seed=1)
+    sim.simulate(num_years=5, vis_years=None)
+    assert sim.year == 5
+    assert sim.num_animals == sim.island.total_num_animals_on_island()[0]
+    assert sum(sim.num_animals_per_species.values()) == sim.num_animals
+    setup.assert_not_called()
+    update.assert_not_called()
+
+
+def test_headless_no_images(plain_sim):
+    """Test that images can not be requested from a headless simulation"""
+    with pytest.raises(ValueError):
+        plain_sim.simulate(num_years=2, vis_years=None, img_years=1)
+
+
+def test_matplotlib_not_imported_headless():
+    """Test that matplotlib is only imported when graphics are used"""
+    code = ("import sys\n"
+            "from biosim.simulation import BioSim\n"
+            "BioSim(island_map='WWW\\nWLW\\nWWW', ini_pop=[], seed=1)"
+            ".simulate(num_years=2, vis_years=None)\n"
+            "assert 'matplotlib' not in sys.modules\n")
+    subprocess.check_call([sys.executable, '-c', code])
+
+
+def test_process_renderer(tmp_path):
+    """Test that a renderer process saves all figures before simulate returns"""
+    img_base = str(tmp_path / 'sim')
+    sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=[], seed=1,
+                 img_base=img_base, renderer='process')
+    try:
+        sim.simulate(num_years=3, vis_years=1, img_years=1)
+        assert [os.path.isfile(f'{img_base}_{n:05d}.png') for n in range(4)] == \
+            [True, True, True, False]
+    finally:
+        sim.close()
+
+
+def test_agg_simulations_in_threads(tmp_path):
+    """Test that simulations without pyplot can save figures in parallel"""
+    import threading
+
+    sims = [BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=[], seed=1,
+                   img_base=str(tmp_path / f'sim{n}'), interactive=False)
+            for n in range(3)]
+    threads = [threading.Thread(target=sim.simulate,
+                                kwargs={'num_years': 3, 'vis_years': 1})
+               for sim in sims]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(list(tmp_path.glob('sim*_0000?.png'))) == 9
+
+
+def test_agg_figures_without_pyplot(tmp_path):
+    """Test that pyplot is not imported when figures are only saved"""
+    code = ("import sys\n"
+            "from biosim.simulation import BioSim\n"
+            "BioSim(island_map='WWW\\nWLW\\nWWW', ini_pop=[], seed=1, "
+            f"img_base={str(tmp_path / 'sim')!r}, interactive=False)"
+            ".simulate(num_years=2, vis_years=1)\n"
+            "assert 'matplotlib.pyplot' not in sys.modules\n")
+    subprocess.check_call([sys.executable, '-c', code])
+    assert len(list(tmp_path.glob('sim_*.png'))) == 2
+
+
+def test_parallel_encoding(tmp_path):
+    """Test that figures written by worker processes are numbered as usual"""
+    img_base = str(tmp_path / 'sim')
+    sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=[], seed=1,
+                 img_base=img_base, interactive=False, encode_workers=2)
+    try:
+        sim.simulate(num_years=4, vis_years=1, img_years=2)
+        sim.simulate(num_years=2, vis_years=1, img_years=2)
+    finally:
+        sim.close()
+    assert sorted(os.listdir(tmp_path)) == [f'sim_{n:05d}.png' for n in range(3)]
+
+
+def test_iter_years(mocker):
+    """Test that iter_years gives a read-only summary of each year simulated"""
+    setup = mocker.patch.object(BioSim, '_setup_graphics')
+    ini_pop = [{'loc': (2, 2),
+                'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20.}
+                        for _ in range(10)]}]
+    plain = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=ini_pop, seed=1)
+    plain.simulate(num_years=3, vis_years=None)
+    sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=ini_pop, seed=1)
+
+    summaries = list(sim.iter_years(3, hist=True))
+    assert [summary.year for summary in summaries] == [1, 2, 3]
+    last = summaries[-1]
+    assert last.num_herbs == plain.num_animals_per_species['Herbivore']
+    assert last.herbi_map.sum() == last.num_herbs
+    assert sum(last.hist['age'][0]) == last.num_herbs
+    with pytest.raises(ValueError):
+        last.herbi_map[1, 1] = 0
+    with pytest.raises(TypeError):
+        last.hist['age'] = None
+    setup.assert_not_called()
+
+
+def test_iter_years_stops_early():
+    """Test that the simulation stops where the loop over iter_years stops"""
+    sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=[], seed=1)
+    for summary in sim.iter_years(10):
+        assert summary.hist is None
+        if summary.year == 4:
+            break
+    assert sim.year == 4
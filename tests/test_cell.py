@@ -350,6 +350,18 @@ class TestSingleCell:
         num_dead = number_of_runs - len(self.stat_cell.herbi_list)
         assert binom_test(num_dead, number_of_runs, prob_death) > alpha
 
+    def test_add_animals_from_arrays(self, initial_cell_class):
+        """
+        Tests that animals given as arrays are added to the list of the right
+        species, and that an unknown species raises a KeyError.
+        """
+        self.cell.add_animals_from_arrays('Carnivore', [1, 2], [10., 12.])
+        assert len(self.cell.herbi_list) == 3
+        assert len(self.cell.carni_list) == 5
+        assert isinstance(self.cell.carni_list[-1], Carnivores)
+        with pytest.raises(KeyError):
+            self.cell.add_animals_from_arrays('Omnivore', [1], [10.])
+
 
 class TestLowland:
 
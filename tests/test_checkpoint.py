@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+from biosim.animals import Herbivores
+from biosim.checkpoint import (population_arrays, read_checkpoint,
+                               CheckpointSeries, CheckpointWriter)
+from biosim.simulation import BioSim
+import numpy as np
+import pytest
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+_MAP = """\
+WWWWWWW
+WLLHLDW
+WLHLLLW
+WWLDHLW
+WWWWWWW"""
+
+
+class TestCheckpoint:
+
+    @pytest.fixture()
+    def make_sim(self):
+        """Makes a function creating a simulation with both species."""
+        def make_sim(**kwargs):
+            ini_pop = [{'loc': (2, 2),
+                        'pop': {'Herbivore': {'count': 60, 'age': 5,
+                                              'weight': 20.0},
+                                'Carnivore': {'count': 15, 'age': 5,
+                                              'weight': 20.0}}},
+                       {'loc': (3, 5),
+                        'pop': {'Herbivore': {'count': 40, 'age': 3,
+                                              'weight': 15.0}}}]
+            return BioSim(island_map=_MAP, ini_pop=ini_pop, seed=4, **kwargs)
+        return make_sim
+
+    @staticmethod
+    def same_population(first, second):
+        """Tests that two simulations have exactly the same animals."""
+        first = population_arrays(first.island)
+        second = population_arrays(second.island)
+        assert first.keys() == second.keys()
+        for name in first:
+            assert first[name].dtype == second[name].dtype
+            np.testing.assert_array_equal(first[name], second[name])
+
+    @pytest.mark.parametrize('options', [{}, {'rng_mode': 'counter'},
+                                         {'storage': 'sparse'}])
+    def test_resume_identical(self, make_sim, tmp_path, options):
+        """
+        Tests that a simulation restored from a checkpoint continues exactly
+        as the saved simulation.
+        """
+        path = tmp_path / 'sim.npz'
+        sim = make_sim(**options)
+        sim.simulate(8, vis_years=None)
+        sim.save_checkpoint(path)
+        sim.simulate(7, vis_years=None)
+
+        resumed = BioSim.load_checkpoint(path)
+        assert resumed.year == 8
+        resumed.simulate(7, vis_years=None)
+        assert resumed.year == sim.year
+        self.same_population(sim, resumed)
+
+    def test_no_pickled_objects(self, make_sim, tmp_path):
+        """Tests that the checkpoint can be read without unpickling."""
+        path = tmp_path / 'sim.npz'
+        make_sim().save_checkpoint(path)
+        with np.load(path, allow_pickle=False) as data:
+            assert all(data[name].dtype != object for name in data.files)
+
+    def test_params_restored(self, make_sim, tmp_path):
+        """Tests that the animal parameters are restored from a checkpoint."""
+        path = tmp_path / 'sim.npz'
+        default = Herbivores.get_params()['F']
+        try:
+            BioSim.set_animal_parameters('Herbivore', {'F': 12.0})
+            make_sim().save_checkpoint(path)
+            BioSim.set_animal_parameters('Herbivore', {'F': default})
+            BioSim.load_checkpoint(path)
+            assert Herbivores.get_params()['F'] == 12.0
+        finally:
+            BioSim.set_animal_parameters('Herbivore', {'F': default})
+
+    def test_line_history_restored(self, make_sim, tmp_path):
+        """Tests that the animal counts of the line graph are restored."""
+        path = tmp_path / 'sim.npz'
+        sim = make_sim(interactive=False)
+        sim.simulate(4)
+        sim.save_checkpoint(path)
+        herbs, _ = sim._graphics.line_history()
+
+        resumed = BioSim.load_checkpoint(path, interactive=False)
+        resumed.simulate(2)
+        resumed_herbs, _ = resumed._graphics.line_history()
+        np.testing.assert_array_equal(resumed_herbs[:4], herbs[:4])
+        assert not np.isnan(resumed_herbs[5])
+
+    def test_background_checkpoints(self, make_sim, tmp_path):
+        """
+        Tests that simulate writes checkpoints in the background, keeping
+        only the newest, and that they are the same as one written directly.
+        """
+        base = str(tmp_path / 'run')
+        sim = make_sim(checkpoint_base=base, checkpoint_keep=2)
+        sim.simulate(10, vis_years=None, checkpoint_years=2)
+        assert sorted(path.name for path in tmp_path.iterdir()) == \
+            ['run_00008.npz', 'run_00010.npz']
+
+        sim.save_checkpoint(tmp_path / 'direct.npz')
+        background = read_checkpoint(base + '_00010.npz')
+        direct = read_checkpoint(tmp_path / 'direct.npz')
+        for name in ('herb_age', 'herb_weight', 'carn_weight', 'rng_state'):
+            np.testing.assert_array_equal(background[name], direct[name])
+        sim.close()
+
+    def test_checkpoint_years_needs_base(self, make_sim):
+        """Tests that periodic checkpoints need a checkpoint_base."""
+        with pytest.raises(ValueError):
+            make_sim().simulate(2, vis_years=None, checkpoint_years=1)
+
+    def test_delta_checkpoints(self, make_sim, tmp_path):
+        """
+        Tests that yearly chunks hold only the changing state, and that a
+        simulation restored from a chunk continues as the saved one.
+        """
+        directory = tmp_path / 'run'
+        sim = make_sim(checkpoint_base=str(directory), checkpoint_delta=True)
+        sim.simulate(6, vis_years=None, checkpoint_years=1)
+        assert CheckpointSeries.years(directory) == [1, 2, 3, 4, 5, 6]
+
+        chunk = read_checkpoint(directory / 'year_00003.npz')
+        assert 'landscape' not in chunk
+        assert 'line_herbs' not in chunk
+        assert not any(name.startswith('params_') for name in chunk)
+
+        resumed = BioSim.load_checkpoint(directory, year=3)
+        assert resumed.year == 3
+        resumed.simulate(3, vis_years=None)
+        self.same_population(sim, resumed)
+        assert BioSim.load_checkpoint(directory).year == 6
+        sim.close()
+
+    def test_delta_line_history(self, make_sim, tmp_path):
+        """
+        Tests that each chunk has all the line graph counts, also when the
+        chunks before it are deleted.
+        """
+        directory = tmp_path / 'run'
+        sim = make_sim(checkpoint_base=str(directory), checkpoint_delta=True,
+                       checkpoint_keep=1, interactive=False)
+        sim.simulate(4, checkpoint_years=2)
+        sim.close()
+        herbs, carns = sim._graphics.line_history()
+
+        assert CheckpointSeries.years(directory) == [4]
+        arrays = CheckpointSeries.read(directory)
+        np.testing.assert_array_equal(arrays['line_herbs'], herbs[:4])
+        np.testing.assert_array_equal(arrays['line_carns'], carns[:4])
+
+    def test_delta_missing_year(self, make_sim, tmp_path):
+        """Tests that loading a year without a chunk raises a ValueError."""
+        directory = tmp_path / 'run'
+        sim = make_sim(checkpoint_base=str(directory), checkpoint_delta=True)
+        sim.simulate(2, vis_years=None, checkpoint_years=2)
+        with pytest.raises(ValueError):
+            BioSim.load_checkpoint(directory, year=1)
+
+
+class TestFork:
+
+    @pytest.fixture()
+    def burnt_in(self):
+        """Makes a simulation with herbivores that has run for some years."""
+        def burnt_in(**kwargs):
+            ini_pop = [{'loc': (2, 2),
+                        'pop': {'Herbivore': {'count': 50, 'age': 5,
+                                              'weight': 20.0}}}]
+            sim = BioSim(island_map=_MAP, ini_pop=ini_pop, seed=7, **kwargs)
+            sim.simulate(5, vis_years=None)
+            return sim
+        return burnt_in
+
+    def test_copy_of_population(self, burnt_in):
+        """Tests that a fork starts with an equal, but separate, population."""
+        sim = burnt_in()
+        branch = sim.fork()
+        assert branch.year == sim.year
+        TestCheckpoint.same_population(sim, branch)
+
+        branch.add_population([{'loc': (2, 2),
+                                'pop': {'Carnivore': {'count': 5, 'age': 5,
+                                                      'weight': 20.0}}}])
+        assert sim.num_animals_per_species['Carnivore'] == 0
+        assert branch.num_animals_per_species['Carnivore'] == 5
+
+    @pytest.mark.parametrize('rng_mode', ['global', 'counter'])
+    def test_branches_independent(self, burnt_in, rng_mode):
+        """
+        Tests that forks with the same seed give the same result, whatever
+        else is simulated in between, and forks with other seeds do not.
+        """
+        sim = burnt_in(rng_mode=rng_mode)
+        first = sim.fork(seed=11)
+        second = sim.fork(seed=11)
+        other = sim.fork(seed=12)
+        first.simulate(5, vis_years=None)
+        sim.simulate(3, vis_years=None)
+        other.simulate(5, vis_years=None)
+        second.simulate(5, vis_years=None)
+
+        TestCheckpoint.same_population(first, second)
+        assert population_arrays(first.island)['herb_weight'].tolist() != \
+            population_arrays(other.island)['herb_weight'].tolist()
+
+    def test_parent_unchanged_by_fork(self, burnt_in):
+        """Tests that forking does not change the random numbers of the parent."""
+        sim = burnt_in()
+        sim.fork().simulate(2, vis_years=None)
+        sim.simulate(5, vis_years=None)
+
+        unforked = burnt_in()
+        unforked.simulate(5, vis_years=None)
+        TestCheckpoint.same_population(sim, unforked)
+
+
+class TestCheckpointWriter:
+
+    def test_rotation(self, tmp_path):
+        """Tests that only the newest checkpoints are kept."""
+        writer = CheckpointWriter(keep=3)
+        for year in range(6):
+            writer.submit(tmp_path / f'{year}.npz', {'year': np.array(year)})
+        writer.close()
+        assert sorted(path.name for path in tmp_path.iterdir()) == \
+            ['3.npz', '4.npz', '5.npz']
+        assert int(read_checkpoint(tmp_path / '5.npz')['year']) == 5
+
+    def test_error_raised_on_flush(self, tmp_path):
+        """Tests that a failed write is reported by flush."""
+        writer = CheckpointWriter()
+        writer.submit(tmp_path / 'missing' / 'run.npz', {})
+        with pytest.raises(RuntimeError):
+            writer.flush()
+        writer.close()
+
+    def test_keep_at_least_one(self):
+        """Tests that a ValueError is raised if no checkpoint is kept."""
+        with pytest.raises(ValueError):
+            CheckpointWriter(keep=0)
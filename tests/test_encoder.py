@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+from biosim.encoder import FrameEncoder
+import matplotlib.image
+import numpy as np
+import pytest
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+
+class TestFrameEncoder:
+
+    def test_invalid_number_of_workers(self):
+        """Tests that a ValueError is raised if given less than one worker."""
+        with pytest.raises(ValueError):
+            FrameEncoder(num_workers=0)
+
+    def test_images_written(self, tmp_path):
+        """
+        Tests that every image is written with its own content, also when
+        more images are given than can wait to be written.
+        """
+        encoder = FrameEncoder(num_workers=2, max_pending=1)
+        frames = [np.full((5, 7, 3), 40 * n, dtype=np.uint8) for n in range(4)]
+        try:
+            for n, rgb in enumerate(frames):
+                encoder.submit(rgb, str(tmp_path / f'f_{n:05d}.png'))
+                rgb[:] = 255  # the image is copied when submitted
+            encoder.flush()
+        finally:
+            encoder.close()
+        for n in range(4):
+            image = matplotlib.image.imread(str(tmp_path / f'f_{n:05d}.png'))
+            assert image.shape[:2] == (5, 7)
+            assert np.all(np.round(image[:, :, :3] * 255) == 40 * n)
+
+    def test_errors_raised(self, tmp_path):
+        """Tests that an error when writing an image is raised by flush."""
+        encoder = FrameEncoder(num_workers=1)
+        try:
+            encoder.submit(np.zeros((2, 2, 3), dtype=np.uint8),
+                           str(tmp_path / 'missing' / 'f.png'))
+            with pytest.raises(Exception):
+                encoder.flush()
+        finally:
+            encoder.close()
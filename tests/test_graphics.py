@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+from biosim.graphics import Graphics
+from biosim.island import TheIsland
+from biosim.snapshot import hist_edges, make_snapshot
+import numpy as np
+import pytest
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+
+class TestGraphics:
+
+    @pytest.fixture()
+    def graphics(self):
+        """Makes an island with herbivores, and the graphics showing it."""
+        self.island = TheIsland("WWWW\nWLHW\nWWWW",
+                                [{'loc': (2, 2),
+                                  'pop': [{'species': 'Herbivore', 'age': 5,
+                                           'weight': 20} for _ in range(30)]}])
+        self.edges = hist_edges({'fitness': (1.0, 20), 'age': (60, 30),
+                                 'weight': (60, 30)})
+        self.graphics = Graphics(self.island.landscape, 100, 50, 20, self.edges)
+        self.graphics.setup_graphics(10)
+        self.graphics.plot_island()
+
+    def test_histograms_updated_in_place(self, graphics):
+        """
+        Tests that the histograms keep their step artists between years, and
+        show the counts of the last snapshot drawn.
+        """
+        steps = self.graphics._hist_steps['age']
+        for year in range(3):
+            snapshot = make_snapshot(self.island, year, self.edges)
+            self.graphics.draw(snapshot)
+            self.island.all_animals_age()
+        assert self.graphics._hist_steps['age'] is steps
+        assert len(self.graphics._age_ax.patches) == 2
+        assert np.array_equal(steps[0].get_data().values,
+                              snapshot.hist['age'][0])
+
+    def test_blitting(self, graphics, mocker):
+        """
+        Tests that the whole figure is only drawn the first time, and when
+        the limits of the animal count graph change.
+        """
+        draw = mocker.spy(self.graphics._fig.canvas, 'draw')
+        for year in range(3):
+            self.graphics.update_graphics(make_snapshot(self.island, year,
+                                                        self.edges))
+        assert draw.call_count == 1
+        snapshot = make_snapshot(self.island, 3, self.edges)
+        self.graphics.update_graphics(snapshot._replace(num_herbs=10 ** 6))
+        assert draw.call_count == 2
+        assert self.graphics._year_txt.get_text().split()[1] == '3'
+
+    def test_agg_figure_saved_with_animated_artists(self, tmp_path):
+        """
+        Tests that a figure on an Agg canvas is saved with the animated
+        artists, the same as the pixels rendered for a movie.
+        """
+        import matplotlib.image
+
+        island = TheIsland("WWWW\nWLHW\nWWWW")
+        edges = hist_edges({'fitness': (1.0, 20), 'age': (60, 30),
+                            'weight': (60, 30)})
+        graphics = Graphics(island.landscape, 100, 50, 20, edges,
+                            interactive=False)
+        graphics.setup_graphics(10)
+        graphics.plot_island()
+        graphics.update_graphics(make_snapshot(island, 7, edges))
+        graphics.save_graphics(str(tmp_path / 'frame.png'))
+        saved = matplotlib.image.imread(str(tmp_path / 'frame.png'))[:, :, :3]
+        assert np.array_equal(np.round(saved * 255), graphics.rgb_frame())
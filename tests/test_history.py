@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+from biosim.history import HistoryRecorder, STAT_COLUMNS, load_history
+from biosim.simulation import BioSim
+import numpy as np
+import pytest
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+
+class TestHistory:
+
+    @pytest.fixture()
+    def sim(self):
+        """Makes a simulation with herbivores only."""
+        ini_pop = [{'loc': (2, 2),
+                    'pop': {'Herbivore': {'count': 50, 'age': 5,
+                                          'weight': 20.0}}}]
+        return BioSim(island_map="WWWWW\nWLLHW\nWLDLW\nWWWWW", ini_pop=ini_pop,
+                      seed=3)
+
+    def test_years_recorded(self, sim, tmp_path):
+        """
+        Tests that every year is recorded, also beyond the first capacity,
+        and that the columns agree with each other.
+        """
+        sim.record_history(tmp_path, capacity=3)
+        sim.simulate(5, vis_years=None)
+        sim.simulate(3, vis_years=None)
+        history = load_history(tmp_path)
+
+        assert history['year'].tolist() == list(range(8))
+        assert history['num_herbs'][0] == 50
+        assert history['herbi_map'].shape == (8, 4, 5)
+        np.testing.assert_array_equal(history['herbi_map'].sum(axis=(1, 2)),
+                                      history['num_herbs'])
+        np.testing.assert_array_equal(history['hist_fitness'][:, 0].sum(axis=1),
+                                      history['num_herbs'])
+        assert np.all(history['num_carns'] == 0)
+
+        stats = history['stats']
+        assert stats.shape == (8, len(STAT_COLUMNS))
+        assert stats[0, STAT_COLUMNS.index('herb_weight_mean')] == 20.0
+        assert np.all(np.isnan(stats[:, STAT_COLUMNS.index('carn_age_mean')]))
+
+    def test_read_while_recording(self, sim, tmp_path):
+        """
+        Tests that a history opened while it is recorded holds the years
+        recorded when it was opened.
+        """
+        sim.record_history(tmp_path)
+        sim.simulate(4, vis_years=None)
+        early = load_history(tmp_path)
+        sim.simulate(4, vis_years=None)
+        assert len(early['year']) == 4
+        assert len(load_history(tmp_path)['year']) == 8
+
+    def test_without_maps(self, sim, tmp_path):
+        """Tests that the density maps are only recorded if asked for."""
+        sim.record_history(tmp_path, maps=False)
+        sim.simulate(2, vis_years=None)
+        history = load_history(tmp_path)
+        assert 'herbi_map' not in history
+        assert len(history['num_herbs']) == 2
+
+    def test_capacity_at_least_one(self, tmp_path):
+        """Tests that a ValueError is raised if there is no room for a year."""
+        with pytest.raises(ValueError):
+            HistoryRecorder(tmp_path, np.zeros((3, 3), dtype=np.uint8), {},
+                            capacity=0)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from biosim.island import TheIsland
+from biosim.scheduler import CellScheduler
 import pytest
 
 __author__ = "Marie Kolvik Valøy, Christine Brinchmann"
@@ -30,8 +31,8 @@ class TestingTheIsland:
                         ]
 
         self.island = TheIsland(landscape_of_cells=test_island, animals_on_island=test_animals)
-        herbis, carnis = self.island.give_animals_in_cell(2, 3)
-        self.animals = herbis + carnis
+        cell = self.island.cell_at(1, 2)
+        self.animals = cell.herbi_list + cell.carni_list
 
     @pytest.fixture()
     def start_point_migration(self):
@@ -242,9 +243,9 @@ class TestingTheIsland:
         # All animals are in the first cell at the beginning
         self.isl_mig.migration()
         herbis, carnis = self.isl_mig.give_animals_in_cell(3, 3)
-        number_old_cell = len(herbis + carnis)
+        number_old_cell = len(herbis) + len(carnis)
         herbis, carnis = self.isl_mig.give_animals_in_cell(3, 2)
-        number_new_cell = len(herbis + carnis)
+        number_new_cell = len(herbis) + len(carnis)
         assert number_old_cell == 0
         assert number_new_cell == number_of_animals_before
 
@@ -262,9 +263,9 @@ class TestingTheIsland:
         # All animals are in the first cell at the beginning
         self.isl_mig.migration()
         herbis1, carnis1 = self.isl_mig.give_animals_in_cell(3, 3)
-        number_old_cell = len(herbis1 + carnis1)
+        number_old_cell = len(herbis1) + len(carnis1)
         herbis, carnis = self.isl_mig.give_animals_in_cell(3, 4)
-        number_new_cell = len(herbis + carnis)
+        number_new_cell = len(herbis) + len(carnis)
         assert number_old_cell == 0
         assert number_new_cell == number_of_animals_before
 
@@ -282,9 +283,9 @@ class TestingTheIsland:
         # All animals are in the first cell at the beginning
         self.isl_mig.migration()
         herbis1, carnis1 = self.isl_mig.give_animals_in_cell(3, 3)
-        number_old_cell = len(herbis1 + carnis1)
+        number_old_cell = len(herbis1) + len(carnis1)
         herbis, carnis = self.isl_mig.give_animals_in_cell(4, 3)
-        number_new_cell = len(herbis + carnis)
+        number_new_cell = len(herbis) + len(carnis)
         assert number_old_cell == 0
         assert number_new_cell == number_of_animals_before
 
@@ -304,9 +305,9 @@ class TestingTheIsland:
         # All animals are in the first cell at the beginning
         self.isl_mig.migration()
         herbis1, carnis1 = self.isl_mig.give_animals_in_cell(3, 3)
-        number_old_cell = len(herbis1 + carnis1)
+        number_old_cell = len(herbis1) + len(carnis1)
         herbis, carnis = self.isl_mig.give_animals_in_cell(2, 3)
-        number_new_cell = len(herbis + carnis)
+        number_new_cell = len(herbis) + len(carnis)
         assert number_old_cell == 0
         assert number_new_cell == number_of_animals_before
 
@@ -328,9 +329,9 @@ class TestingTheIsland:
         # All animals are in the first cell at the beginning
         self.island.migration()
         herbis, carnis = self.island.give_animals_in_cell(1, 3)
-        number_new_cell = len(herbis + carnis)
+        number_new_cell = len(herbis) + len(carnis)
         herbis, carnis = self.island.give_animals_in_cell(2, 3)
-        number_old_cell = len(herbis + carnis)
+        number_old_cell = len(herbis) + len(carnis)
         assert number_new_cell == 0
         assert number_old_cell == number_of_animals_before
 
@@ -386,3 +387,130 @@ class TestingTheIsland:
         assert sum_herbi == tot_h
         assert sum_carni == tot_c
         assert sum_herbi + sum_carni == tot_animas
+
+    def test_parallel_island_repeatable(self):
+        """
+        Tests that processing the cells on the workers of a scheduler gives
+        the same animals every time the island is simulated with the same
+        seed.
+        """
+        test_island = """\
+                            WWWWW
+                            WLLLW
+                            WHWHW
+                            WLDLW
+                            WWWWW"""
+
+        def simulate():
+            island = TheIsland(landscape_of_cells=test_island,
+                               animals_on_island=[{'loc': (2, 3),
+                                                   'pop': [{'species': 'Herbivore',
+                                                            'age': 5,
+                                                            'weight': 35}
+                                                           for _ in range(200)]}],
+                               rng_mode='counter', seed=1)
+            island.scheduler = CellScheduler(num_workers=4)
+            for _ in range(10):
+                island.annual_cycle()
+            return [[(animal.age, animal.weight) for animal in cell.herbi_list]
+                    for _, _, cell in island._land_cells]
+
+        assert simulate() == simulate()
+
+    def test_parallel_needs_counter_streams(self):
+        """
+        Tests that a ValueError is raised for workers drawing from the random
+        module.
+        """
+        island = TheIsland("WWW\nWLW\nWWW",
+                           [{'loc': (2, 2), 'pop': [{'species': 'Herbivore',
+                                                     'age': 5, 'weight': 20}]}])
+        island.scheduler = CellScheduler(num_workers=2)
+        with pytest.raises(ValueError):
+            island.annual_cycle()
+
+    def test_no_cell_objects_for_water(self, initial_island):
+        """
+        Tests that water cells are not given cell objects, and that there are
+        no animals to get from a water cell.
+        """
+        assert self.island.island_cells[0][0] is None
+        assert list(map(len, self.island.give_animals_in_cell(1, 1))) == [0, 0]
+        assert len(self.island._land_cells) == 8
+
+    def test_sparse_storage_same_coordinates(self, initial_island):
+        """
+        Tests that an island with sparse storage only stores the land cells
+        with animals, and gives the animals and the heatmaps in the same coordinates as an
+        island with dense storage.
+        """
+        test_island = """\
+                            WWWWW
+                            WLLLW
+                            WHWHW
+                            WLDLW
+                            WWWWW"""
+        sparse = TheIsland(test_island, storage='sparse')
+        sparse.add_animals_on_island([{'loc': (2, 3),
+                                       'pop': [{'species': 'Herbivore',
+                                                'age': 5, 'weight': 35}]}])
+        assert len(sparse.island_cells) == 1  # only the cell with animals
+        assert sparse.cell_index[2, 2] == -1  # the water cell in the middle
+        assert len(sparse.give_animals_in_cell(2, 3)[0]) == 1
+        assert list(map(len, sparse.give_animals_in_cell(3, 3))) == [0, 0]
+        herbi_isl, _ = sparse.herbis_and_carnis_on_island()
+        assert herbi_isl[1][2] == 1
+        assert herbi_isl.sum() == 1
+
+    def test_animal_views(self, initial_island):
+        """
+        Tests that the animals in a cell are given as read-only views that
+        follow the animals in the cell, with the same age, weight and fitness.
+        """
+        herbis, carnis = self.island.give_animals_in_cell(2, 3)
+        assert len(herbis) == 200 and len(carnis) == 20
+        cell = self.island.cell_at(1, 2)
+        assert [(a.age, a.weight) for a in herbis] == \
+            [(a.age, a.weight) for a in cell.herbi_list]
+        assert herbis.fitness == pytest.approx([a.fitness() for a in cell.herbi_list])
+        assert carnis[0].fitness == cell.carni_list[0].fitness()
+        with pytest.raises(AttributeError):
+            herbis[0].weight = 0
+        cell.herbi_list = cell.herbi_list[:10]
+        assert len(herbis) == 10
+        assert herbis.age.tolist() == [5] * 10
+
+    def test_sparse_view_follows_new_cell(self):
+        """
+        Tests that a view of a sparse cell without a cell object shows the
+        animals added to the cell after the view was made.
+        """
+        sparse = TheIsland("WWWW\nWLLW\nWWWW", storage='sparse')
+        herbis, carnis = sparse.give_animals_in_cell(2, 3)
+        assert len(herbis) == 0
+        sparse.add_animals_on_island([{'loc': (2, 3),
+                                       'pop': [{'species': 'Herbivore',
+                                                'age': 5, 'weight': 20}
+                                               for _ in range(3)]}])
+        assert len(herbis) == 3 and len(carnis) == 0
+        assert herbis.weight.tolist() == [20] * 3
+
+    def test_invalid_storage(self):
+        """Tests that a ValueError is raised for an unknown storage mode."""
+        with pytest.raises(ValueError):
+            TheIsland("WWW\nWLW\nWWW", storage='compressed')
+
+    def test_island_from_map_file(self, tmp_path):
+        """
+        Tests that an island can be made from a map file, and that animals
+        can be added to it.
+        """
+        path = tmp_path / 'island.map'
+        path.write_text("WWWWW\nWLLLW\nWHWHW\nWLDLW\nWWWWW\n")
+        isl = TheIsland.from_map_file(path, storage='sparse',
+                                      animals_on_island=[{'loc': (4, 3),
+                                                          'pop': [{'species': 'Herbivore',
+                                                                   'age': 5,
+                                                                   'weight': 35}]}])
+        assert isl.total_num_animals_on_island()[1] == 1
+        assert (isl.row, isl.col) == (5, 5)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+from biosim import landscape as ls
+import numpy as np
+import pytest
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+
+class TestLandscape:
+
+    @pytest.fixture()
+    def geography(self):
+        """Makes a small legal island to use in tests."""
+        self.geography = """\
+                            WWWWW
+                            WLHDW
+                            WWWWW"""
+
+    def test_string_to_codes(self, geography):
+        """Tests that each character is given the code of its landscape."""
+        codes = ls.string_to_codes(self.geography)
+        assert codes.dtype == np.uint8
+        assert codes.shape == (3, 5)
+        assert codes[1].tolist() == [ls.WATER, ls.LOWLAND, ls.HIGHLAND,
+                                     ls.DESERT, ls.WATER]
+
+    def test_codes_to_string(self, geography):
+        """Tests that codes can be made back into the same string."""
+        codes = ls.string_to_codes(self.geography)
+        assert ls.codes_to_string(codes) == "WWWWW\nWLHDW\nWWWWW"
+
+    def test_legal_island_passes(self, geography):
+        """Tests that no error is raised for a legal island."""
+        ls.check_codes(ls.string_to_codes(self.geography))
+
+    @pytest.mark.parametrize('geography',
+                             ["WWW\nWLLW\nWWW", "WWW\nWLW\nWWW\n"])
+    def test_unequal_lines(self, geography):
+        """
+        Tests that a ValueError is raised if the lines are of different
+        lengths, a trailing newline included.
+        """
+        with pytest.raises(ValueError):
+            ls.string_to_codes(geography)
+
+    @pytest.mark.parametrize('geography',
+                             ["WLW\nWLW\nWWW", "WWW\nWLW\nWLW",
+                              "WWW\nLLW\nWWW", "WWW\nWLL\nWWW",
+                              "WWW\nWXW\nWWW", "WWW\nWøW\nWWW"])
+    def test_illegal_islands(self, geography):
+        """
+        Tests that a ValueError is raised for land on the edges and for
+        characters that are not landscape types.
+        """
+        with pytest.raises(ValueError):
+            ls.check_codes(ls.string_to_codes(geography))
+
+    @pytest.mark.parametrize('geography', ["WWW\nWÆW\nWWW", "WWWW\nWøLW\nWWWW"])
+    def test_non_ascii_forbidden(self, geography):
+        """
+        Tests that a character that is not ASCII is found to be a forbidden
+        character, and not to make its line longer.
+        """
+        with pytest.raises(ValueError, match="Forbidden character"):
+            ls.check_codes(ls.string_to_codes(geography))
+
+    def test_empty_map(self):
+        """Tests that a ValueError is raised for an empty map."""
+        with pytest.raises(ValueError):
+            ls.string_to_codes("")
+
+
+class TestMapFile:
+
+    @pytest.fixture()
+    def map_file(self, tmp_path):
+        """Writes a small map to a text file."""
+        self.path = tmp_path / 'island.map'
+        self.path.write_text("WWWWW\nWLHDW\nWLLLW\nWWWWW\n")
+
+    def test_text_file_same_as_string(self, map_file):
+        """
+        Tests that a text map file gives the same codes as the map string,
+        also when only a few rows are read at a time.
+        """
+        codes = ls.file_to_codes(self.path, chunk_rows=3)
+        expected = ls.string_to_codes("WWWWW\nWLHDW\nWLLLW\nWWWWW")
+        assert np.array_equal(codes, expected)
+
+    def test_text_file_without_last_newline(self, tmp_path):
+        """Tests that the last line does not need to end with a newline."""
+        path = tmp_path / 'island.map'
+        path.write_text("WWW\nWLW\nWWW")
+        assert ls.file_to_codes(path).shape == (3, 3)
+
+    @pytest.mark.parametrize('text', ["WWW\nWLLW\nWWW\n", "WWW\nWL\nWWWW\n"])
+    def test_text_file_unequal_lines(self, tmp_path, text):
+        """Tests that a ValueError is raised for lines of unequal length."""
+        path = tmp_path / 'island.map'
+        path.write_text(text)
+        with pytest.raises(ValueError):
+            ls.check_codes(ls.file_to_codes(path))
+
+    def test_raw_file_is_memory_map(self, tmp_path):
+        """Tests that a raw map file is read as a memory map of its codes."""
+        codes = ls.string_to_codes("WWWWW\nWLHDW\nWWWWW")
+        path = tmp_path / 'island.raw'
+        codes.tofile(path)
+        raw = ls.file_to_codes(path, fmt='raw', shape=(3, 5))
+        assert isinstance(raw, np.memmap)
+        assert np.array_equal(raw, codes)
+        ls.check_codes(raw, chunk_rows=1)
+
+    def test_raw_file_wrong_shape(self, tmp_path):
+        """Tests that a ValueError is raised if the shape does not fit."""
+        path = tmp_path / 'island.raw'
+        ls.string_to_codes("WWW\nWLW\nWWW").tofile(path)
+        with pytest.raises(ValueError):
+            ls.file_to_codes(path, fmt='raw', shape=(3, 4))
+        with pytest.raises(ValueError):
+            ls.file_to_codes(path, fmt='raw')
+
+    def test_raw_file_illegal_code(self, tmp_path):
+        """Tests that a ValueError is raised for codes that are not landscapes."""
+        codes = ls.string_to_codes("WWW\nWLW\nWWW")
+        codes[1, 1] = 7
+        path = tmp_path / 'island.raw'
+        codes.tofile(path)
+        with pytest.raises(ValueError):
+            ls.check_codes(ls.file_to_codes(path, fmt='raw', shape=(3, 3)))
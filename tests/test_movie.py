@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+from biosim.movie import AnimationWriter, MovieWriter
+import numpy as np
+import json
+import os
+import pytest
+import sys
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+# Stand-in for ffmpeg, writing its arguments and the number of bytes read
+# from standard input as JSON to the output file (the last argument)
+_FAKE_ENCODER = """\
+#!{python}
+import json, sys
+size = len(sys.stdin.buffer.read())
+with open(sys.argv[-1], 'w') as out:
+    json.dump({{'args': sys.argv[1:], 'bytes': size}}, out)
+sys.exit({code})
+"""
+
+
+@pytest.fixture()
+def fake_encoder(tmp_path):
+    """Makes stand-ins for ffmpeg, one that works and one that fails."""
+    def make(code):
+        path = tmp_path / f'encoder_{code}'
+        path.write_text(_FAKE_ENCODER.format(python=sys.executable, code=code))
+        os.chmod(path, 0o755)
+        return str(path)
+
+    return make
+
+
+class TestMovieWriter:
+
+    def test_frames_streamed_to_encoder(self, fake_encoder, tmp_path):
+        """
+        Tests that all frames are written to the encoder, which is told the
+        size of the frames.
+        """
+        movie = tmp_path / 'sim.mp4'
+        writer = MovieWriter(str(movie), encoder=fake_encoder(0))
+        for _ in range(3):
+            writer.write_frame(np.zeros((4, 6, 3), dtype=np.uint8))
+        writer.close()
+        result = json.loads(movie.read_text())
+        assert result['bytes'] == 3 * 4 * 6 * 3
+        assert '6x4' in result['args']
+        assert writer.num_frames == 3
+
+    def test_frames_same_size(self, fake_encoder, tmp_path):
+        """Tests that a ValueError is raised if a frame changes size."""
+        writer = MovieWriter(str(tmp_path / 'sim.mp4'), encoder=fake_encoder(0))
+        writer.write_frame(np.zeros((4, 6, 3), dtype=np.uint8))
+        with pytest.raises(ValueError):
+            writer.write_frame(np.zeros((4, 8, 3), dtype=np.uint8))
+        writer.close()
+
+    def test_encoder_fails(self, fake_encoder, tmp_path):
+        """Tests that a RuntimeError is raised if the encoder fails."""
+        writer = MovieWriter(str(tmp_path / 'sim.mp4'), encoder=fake_encoder(1))
+        writer.write_frame(np.zeros((4, 6, 3), dtype=np.uint8))
+        with pytest.raises(RuntimeError):
+            writer.close()
+
+    def test_simulation_streams_movie(self, fake_encoder, tmp_path):
+        """
+        Tests that a simulation streams its figures into the movie instead of
+        writing image files.
+        """
+        from biosim.simulation import BioSim
+
+        img_base = str(tmp_path / 'sim')
+        sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=[], seed=1,
+                     img_base=img_base, stream_movie=True,
+                     ffmpeg_binary=fake_encoder(0))
+        sim.simulate(num_years=3, vis_years=1, img_years=1)
+        sim.make_movie()
+        assert json.loads((tmp_path / 'sim.mp4').read_text())['bytes'] > 0
+        assert not list(tmp_path.glob('sim_*.png'))
+
+
+class TestAnimationWriter:
+
+    @pytest.fixture()
+    def frames(self):
+        """Makes frames of a few flat colors, as the figures mostly are."""
+        colors = [(0, 0, 255), (0, 153, 0), (255, 255, 128)]
+        self.frames = [np.tile(np.array(color, dtype=np.uint8), (6, 8, 1))
+                       for color in colors]
+
+    @pytest.mark.parametrize('fmt', ['gif', 'apng'])
+    def test_frames_written(self, frames, tmp_path, fmt):
+        """Tests that every frame is written, and can be read back."""
+        from PIL import Image
+
+        path = str(tmp_path / f'movie.{fmt}')
+        writer = AnimationWriter(path, fps=10)
+        for rgb in self.frames:
+            writer.write_frame(rgb)
+        writer.close()
+        with Image.open(path) as movie:
+            assert movie.n_frames == 3
+            for n, rgb in enumerate(self.frames):
+                movie.seek(n)
+                assert np.array_equal(np.asarray(movie.convert('RGB')), rgb)
+
+    def test_unknown_format(self, tmp_path):
+        """Tests that a ValueError is raised for an unknown format."""
+        with pytest.raises(ValueError):
+            AnimationWriter(str(tmp_path / 'movie.avi'))
+
+    def test_simulation_gif_without_magick(self, tmp_path):
+        """
+        Tests that a simulation can make a GIF from its saved figures, and
+        stream a GIF without saving figures.
+        """
+        from biosim.simulation import BioSim
+        from PIL import Image
+
+        saved = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=[], seed=1,
+                       img_base=str(tmp_path / 'saved'), interactive=False)
+        saved.simulate(num_years=3, vis_years=1)
+        saved.make_movie('gif')
+        streamed = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=[], seed=1,
+                          img_base=str(tmp_path / 'streamed'), interactive=False,
+                          stream_movie=True, movie_fmt='gif')
+        streamed.simulate(num_years=3, vis_years=1)
+        streamed.make_movie()
+        for name in ('saved.gif', 'streamed.gif'):
+            with Image.open(tmp_path / name) as movie:
+                assert movie.n_frames == 3
+        assert not list(tmp_path.glob('streamed_*.png'))
+
+    def test_simulation_gif_of_jpeg_figures(self, tmp_path):
+        """
+        Tests that a GIF is made of the figures in the format they were
+        saved in, and that a ValueError is raised if there are no figures.
+        """
+        from biosim.movie import images_to_movie
+        from biosim.simulation import BioSim
+        from PIL import Image
+
+        sim = BioSim(island_map="WWWW\nWLHW\nWWWW", ini_pop=[], seed=1,
+                     img_base=str(tmp_path / 'sim'), img_fmt='jpg',
+                     interactive=False)
+        sim.simulate(num_years=2, vis_years=1)
+        sim.make_movie('gif')
+        with Image.open(tmp_path / 'sim.gif') as movie:
+            assert movie.n_frames == 2
+        with pytest.raises(ValueError):
+            images_to_movie(str(tmp_path / 'other'), 'gif')
+        assert not (tmp_path / 'other.gif').exists()
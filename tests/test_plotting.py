@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+from biosim.plotting import Plotting, render_history
+from biosim.simulation import BioSim
+import matplotlib.image as mpimg
+import numpy as np
+import pytest
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+
+class TestPlotting:
+
+    @pytest.fixture()
+    def recorded(self, tmp_path):
+        """
+        Simulates four years, saving the frames while simulating and
+        recording the history.
+        """
+        ini_pop = [{'loc': (2, 2),
+                    'pop': {'Herbivore': {'count': 80, 'age': 5,
+                                          'weight': 20.0},
+                            'Carnivore': {'count': 10, 'age': 5,
+                                          'weight': 20.0}}}]
+        sim = BioSim(island_map="WWWWW\nWLLHW\nWLDLW\nWWWWW",
+                     ini_pop=ini_pop, seed=2, interactive=False,
+                     img_base=str(tmp_path / 'live'))
+        sim.record_history(tmp_path / 'history')
+        sim.simulate(4)
+        sim.close()
+        return tmp_path
+
+    def test_frames_as_live(self, recorded):
+        """
+        Tests that the frames drawn afterwards are those saved while
+        simulating.
+        """
+        filenames = render_history(recorded / 'history',
+                                   str(recorded / 'post'))
+        assert len(filenames) == 4
+        for index, filename in enumerate(filenames):
+            live = mpimg.imread(recorded / f'live_{index:05d}.png')
+            np.testing.assert_array_equal(mpimg.imread(filename), live)
+
+    def test_workers_draw_same_frames(self, recorded):
+        """Tests that frames drawn by several processes are the same."""
+        serial = render_history(recorded / 'history', str(recorded / 'serial'))
+        parallel = render_history(recorded / 'history',
+                                  str(recorded / 'parallel'), num_workers=2)
+        for first, second in zip(serial, parallel):
+            np.testing.assert_array_equal(mpimg.imread(first),
+                                          mpimg.imread(second))
+
+    def test_frames_out_of_order(self, recorded):
+        """
+        Tests that a frame drawn after a later year is the same as when the
+        years are drawn in order.
+        """
+        in_order = Plotting(recorded / 'history')
+        frames = [in_order.rgb_frame(index).copy()
+                  for index in range(len(in_order))]
+        out_of_order = Plotting(recorded / 'history')
+        for index in (3, 1, 2, 0):
+            np.testing.assert_array_equal(out_of_order.rgb_frame(index),
+                                          frames[index])
+
+    def test_gif_movie(self, recorded):
+        """Tests that a movie is made of the frames drawn."""
+        from PIL import Image
+
+        render_history(recorded / 'history', str(recorded / 'post'),
+                       movie_fmt='gif')
+        with Image.open(recorded / 'post.gif') as movie:
+            assert movie.n_frames == 4
+
+    def test_without_maps(self, tmp_path):
+        """
+        Tests that a ValueError is raised for a history without density
+        maps.
+        """
+        sim = BioSim(island_map="WWW\nWLW\nWWW", ini_pop=[], seed=1)
+        sim.record_history(tmp_path, maps=False)
+        sim.simulate(1, vis_years=None)
+        sim.close()
+        with pytest.raises(ValueError):
+            Plotting(tmp_path)
+
+    def test_bad_arguments(self, recorded):
+        """
+        Tests that a ValueError is raised for no workers, or a movie of
+        frames that are not PNG images.
+        """
+        with pytest.raises(ValueError):
+            render_history(recorded / 'history', 'post', num_workers=0)
+        with pytest.raises(ValueError):
+            render_history(recorded / 'history', 'post', img_fmt='pdf',
+                           movie_fmt='gif')
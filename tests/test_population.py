@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+from biosim.population import columns_to_arrays
+from biosim.island import TheIsland
+import numpy as np
+import pytest
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+
+class TestColumns:
+
+    def test_arrays(self):
+        """Tests that arrays of age and weight are given back as arrays."""
+        age, weight = columns_to_arrays({'age': [1, 2, 3],
+                                         'weight': [10, 20, 30]})
+        assert age.tolist() == [1, 2, 3]
+        assert weight.dtype == float
+
+    def test_count(self):
+        """Tests that a count of equal animals is made into arrays."""
+        age, weight = columns_to_arrays({'count': 4, 'age': 5, 'weight': 20})
+        assert age.tolist() == [5] * 4
+        assert weight.tolist() == [20.] * 4
+
+    @pytest.mark.parametrize('columns',
+                             [{'age': [1, 2], 'weight': [10]},
+                              {'count': 3, 'age': [1, 2], 'weight': 10}])
+    def test_unequal_lengths(self, columns):
+        """Tests that a ValueError is raised if the columns do not match."""
+        with pytest.raises(ValueError):
+            columns_to_arrays(columns)
+
+    def test_missing_column(self):
+        """Tests that a KeyError is raised if weight is missing."""
+        with pytest.raises(KeyError):
+            columns_to_arrays({'count': 3, 'age': 1})
+
+
+class TestColumnarIsland:
+
+    def test_same_as_dictionaries(self):
+        """
+        Tests that a population given as columns gives the same animals as
+        the population given as one dictionary per animal.
+        """
+        geography = "WWWW\nWLHW\nWWWW"
+        ages = np.arange(10)
+        weights = np.linspace(5, 30, 10)
+        rows = TheIsland(geography, [{'loc': (2, 2),
+                                      'pop': [{'species': 'Herbivore',
+                                               'age': age, 'weight': weight}
+                                              for age, weight in zip(ages.tolist(),
+                                                                     weights.tolist())]
+                                      + [{'species': 'Carnivore', 'age': 3,
+                                          'weight': 12} for _ in range(5)]}])
+        columns = TheIsland(geography, [{'loc': (2, 2),
+                                         'pop': {'Herbivore': {'age': ages,
+                                                               'weight': weights},
+                                                 'Carnivore': {'count': 5,
+                                                               'age': 3,
+                                                               'weight': 12}}}])
+        for from_rows, from_columns in zip(rows.give_animals_in_cell(2, 2),
+                                           columns.give_animals_in_cell(2, 2)):
+            assert [(a.age, a.weight) for a in from_rows] == \
+                [(a.age, a.weight) for a in from_columns]
+
+    def test_columns_not_in_water(self):
+        """Tests that a ValueError is raised if columns are placed in water."""
+        isl = TheIsland("WWW\nWLW\nWWW")
+        with pytest.raises(ValueError):
+            isl.add_animals_on_island([{'loc': (1, 1),
+                                        'pop': {'Herbivore': {'count': 2,
+                                                              'age': 1,
+                                                              'weight': 5}}}])
+
+    @pytest.mark.parametrize('carnivores, error',
+                             [({'Omnivore': {'count': 2, 'age': 1,
+                                             'weight': 5}}, KeyError),
+                              ({'Carnivore': {'age': [1], 'weight': [-5]}},
+                               ValueError)])
+    def test_invalid_columns_add_nothing(self, carnivores, error):
+        """
+        Tests that no animals are added if any species in the population of
+        a cell is invalid, also species given before it.
+        """
+        isl = TheIsland("WWW\nWLW\nWWW")
+        population = {'Herbivore': {'count': 5, 'age': 1, 'weight': 5}}
+        population.update(carnivores)
+        with pytest.raises(error):
+            isl.add_animals_on_island([{'loc': (2, 2), 'pop': population}])
+        assert isl.total_num_animals_on_island()[0] == 0
+
+
+class TestPopulationFile:
+
+    @pytest.fixture()
+    def island(self):
+        """Makes an island to load populations to."""
+        self.island = TheIsland("WWWWW\nWLHLW\nWWWWW")
+
+    def test_csv_file(self, island, tmp_path):
+        """
+        Tests that all animals in a CSV file are added to the right cells,
+        also when the file is read a few animals at a time.
+        """
+        path = tmp_path / 'pop.csv'
+        lines = ['row,col,species,age,weight']
+        lines += ['2,2,Herbivore,5,20.5'] * 7 + ['2,4,Carnivore,3,10'] * 4
+        path.write_text('\n'.join(lines) + '\n')
+        assert self.island.load_population_file(path, chunk_size=3) == 11
+        herbis, carnis = self.island.give_animals_in_cell(2, 2)
+        assert len(herbis) == 7 and len(carnis) == 0
+        assert herbis[0].age == 5 and herbis[0].weight == 20.5
+        assert len(self.island.give_animals_in_cell(2, 4)[1]) == 4
+
+    def test_jsonl_file(self, island, tmp_path):
+        """Tests that animals in a JSON-lines file are added."""
+        path = tmp_path / 'pop.jsonl'
+        path.write_text('{"loc": [2, 3], "species": "Herbivore", "age": 1, "weight": 8}\n'
+                        '{"loc": [2, 3], "species": "Carnivore", "age": 2, "weight": 9}\n')
+        assert self.island.load_population_file(path) == 2
+        assert self.island.total_num_animals_on_island() == (2, 1, 1)
+
+    def test_water_in_file(self, island, tmp_path):
+        """Tests that a ValueError is raised for animals placed in water."""
+        path = tmp_path / 'pop.csv'
+        path.write_text('row,col,species,age,weight\n1,1,Herbivore,5,20\n')
+        with pytest.raises(ValueError):
+            self.island.load_population_file(path)
+        assert self.island.total_num_animals_on_island()[0] == 0
+
+    def test_unknown_format(self, island, tmp_path):
+        """Tests that a ValueError is raised for an unknown file format."""
+        path = tmp_path / 'pop.xlsx'
+        path.write_text('')
+        with pytest.raises(ValueError):
+            self.island.load_population_file(path)
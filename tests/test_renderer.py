@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+from biosim.island import TheIsland
+from biosim.renderer import FrameRenderer
+from biosim.snapshot import hist_edges, make_snapshot
+import numpy as np
+import pytest
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+
+class TestRenderer:
+
+    @pytest.fixture()
+    def island(self):
+        """Makes an island with herbivores and carnivores, and bin edges."""
+        self.island = TheIsland("WWWW\nWLHW\nWWWW",
+                                [{'loc': (2, 2),
+                                  'pop': [{'species': 'Herbivore', 'age': 5,
+                                           'weight': 20} for _ in range(30)]
+                                  + [{'species': 'Carnivore', 'age': 70,
+                                      'weight': 30} for _ in range(5)]}])
+        self.edges = hist_edges({'fitness': (1.0, 20), 'age': (60, 30),
+                                 'weight': (60, 30)})
+
+    def test_snapshot(self, island):
+        """
+        Tests that a snapshot counts the animals and has the same histogram
+        counts as np.histogram with the range of the histograms.
+        """
+        snapshot = make_snapshot(self.island, 3, self.edges)
+        assert (snapshot.year, snapshot.num_herbs, snapshot.num_carns) == (3, 30, 5)
+        assert snapshot.herbi_map[1, 1] == 30
+        herb_age, carn_age = snapshot.hist['age']
+        assert herb_age.sum() == 30 and herb_age[2] == 30
+        assert carn_age.sum() == 0  # older than the last bin
+        expected, _ = np.histogram([20] * 30, bins=30, range=(0, 60))
+        assert np.array_equal(snapshot.hist['weight'][0], expected)
+
+    def test_renderer_saves_frames(self, island, tmp_path):
+        """
+        Tests that the renderer process saves every frame it is given to
+        save, and that frames only shown are dropped when the queue is full.
+        """
+        renderer = FrameRenderer(self.island.landscape, 100, 50, 20,
+                                 self.edges, queue_size=1)
+        try:
+            renderer.setup_graphics(10)
+            renderer.plot_island()
+            snapshot = make_snapshot(self.island, 0, self.edges)
+            for _ in range(20):
+                renderer.submit(snapshot)
+            for img_no in range(3):
+                assert renderer.submit(snapshot, str(tmp_path / f'f_{img_no}.png'))
+            renderer.flush()
+        finally:
+            renderer.close()
+        assert renderer.dropped > 0
+        assert renderer.sent + renderer.dropped == 23
+        assert sorted(path.name for path in tmp_path.iterdir()) == \
+            ['f_0.png', 'f_1.png', 'f_2.png']
+
+    def test_renderer_reports_errors(self, island, tmp_path):
+        """Tests that a frame that can not be saved raises a RuntimeError."""
+        renderer = FrameRenderer(self.island.landscape, 100, 50, 20,
+                                 self.edges)
+        try:
+            renderer.setup_graphics(10)
+            renderer.submit(make_snapshot(self.island, 0, self.edges),
+                            str(tmp_path / 'missing' / 'f.png'))
+            with pytest.raises(RuntimeError):
+                renderer.flush()
+        finally:
+            renderer.close()
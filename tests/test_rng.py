@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+from biosim.rng import CounterRandom
+from biosim.island import TheIsland
+from biosim.scheduler import CellScheduler
+import pytest
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+
+class TestCounterRandom:
+
+    def test_same_key_same_stream(self):
+        """Tests that two streams with the same key give the same numbers."""
+        first = CounterRandom(seed=1, year=3, cell=7, phase='eat')
+        second = CounterRandom(seed=1, year=3, cell=7, phase='eat')
+        assert [first.random() for _ in range(200)] == \
+            [second.random() for _ in range(200)]
+
+    @pytest.mark.parametrize('key', [{'seed': 2}, {'year': 4}, {'cell': 8},
+                                     {'phase': 'death'}])
+    def test_different_key_different_stream(self, key):
+        """Tests that changing any part of the key gives another stream."""
+        default = {'seed': 1, 'year': 3, 'cell': 7, 'phase': 'eat'}
+        first = CounterRandom(**default)
+        default.update(key)
+        second = CounterRandom(**default)
+        assert first.random() != second.random()
+
+    def test_invalid_phase(self):
+        """Tests that a KeyError is raised if given an unknown phase."""
+        with pytest.raises(KeyError):
+            CounterRandom(seed=1, year=0, cell=0, phase='sleep')
+
+    def test_random_in_unit_interval(self):
+        """Tests that the uniform numbers are in [0, 1)."""
+        stream = CounterRandom(seed=1, year=0, cell=0, phase='eat')
+        for _ in range(1000):
+            assert 0 <= stream.random() < 1
+
+    def test_shuffle_keeps_elements(self):
+        """Tests that shuffling does not lose or add elements."""
+        stream = CounterRandom(seed=1, year=0, cell=0, phase='eat')
+        items = list(range(50))
+        stream.shuffle(items)
+        assert sorted(items) == list(range(50))
+
+    def test_choice_from_sequence(self):
+        """Tests that choice picks an element of the sequence."""
+        stream = CounterRandom(seed=1, year=0, cell=0, phase='migrate')
+        directions = ['North', 'East', 'South', 'West']
+        for _ in range(100):
+            assert stream.choice(directions) in directions
+
+
+class TestDeterministicIsland:
+
+    @pytest.fixture()
+    def make_island(self):
+        """Makes a function creating an island with both species."""
+        geography = """\
+                       WWWWWWW
+                       WLLHLLW
+                       WLDLLHW
+                       WHLLLLW
+                       WWWWWWW"""
+
+        def make(num_workers, storage='dense'):
+            population = [{'loc': (loc, loc),
+                           'pop': [{'species': 'Herbivore', 'age': 5,
+                                    'weight': 20} for _ in range(50)]
+                           + [{'species': 'Carnivore', 'age': 5,
+                               'weight': 20} for _ in range(10)]}
+                          for loc in (2, 3, 4)]
+            island = TheIsland(geography, population, rng_mode='counter',
+                               seed=12345, storage=storage)
+            if num_workers > 1:
+                island.scheduler = CellScheduler(num_workers=num_workers)
+            return island
+
+        self.make_island = make
+
+    @staticmethod
+    def population(island):
+        """Gives the age and weight of every animal, cell by cell."""
+        return [[(animal.age, animal.weight) for animal in list(herbis) + list(carnis)]
+                for herbis, carnis in (island.give_animals_in_cell(x, y)
+                                       for x in range(1, island.row + 1)
+                                       for y in range(1, island.col + 1))]
+
+    def test_invalid_rng_mode(self):
+        """Tests that a ValueError is raised if given an unknown rng_mode."""
+        with pytest.raises(ValueError):
+            TheIsland("WWW\nWLW\nWWW", rng_mode='quantum')
+
+    def test_serial_and_parallel_identical(self, make_island):
+        """
+        Tests that processing the cells in order and in parallel gives
+        exactly the same animals in every cell.
+        """
+        serial = self.make_island(num_workers=1)
+        parallel = self.make_island(num_workers=4)
+        for _ in range(5):
+            serial.annual_cycle()
+            parallel.annual_cycle()
+        assert self.population(serial) == self.population(parallel)
+
+    def test_independent_of_global_random(self, make_island):
+        """
+        Tests that the result does not depend on the state of the random
+        module.
+        """
+        import random
+        first = self.make_island(num_workers=1)
+        random.seed(1)
+        first.annual_cycle()
+        second = self.make_island(num_workers=1)
+        random.seed(2)
+        second.annual_cycle()
+        assert self.population(first) == self.population(second)
+
+    def test_sparse_and_dense_identical(self, make_island):
+        """
+        Tests that sparse and dense storage of the cells give exactly the
+        same animals in every cell.
+        """
+        dense = self.make_island(num_workers=1)
+        sparse = self.make_island(num_workers=2, storage='sparse')
+        for _ in range(5):
+            dense.annual_cycle()
+            sparse.annual_cycle()
+        assert self.population(dense) == self.population(sparse)
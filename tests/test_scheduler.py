@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+from biosim.scheduler import CellScheduler
+import pytest
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+
+class TestCellScheduler:
+
+    @pytest.fixture()
+    def uneven_costs(self):
+        """
+        Makes a list of costs where a few items are much more expensive than
+        the rest, like cells on an island where most cells are empty.
+        """
+        self.costs = [1] * 100 + [500, 1000, 200]
+
+    def test_invalid_number_of_workers(self):
+        """Tests that a ValueError is raised if given less than one worker."""
+        with pytest.raises(ValueError):
+            CellScheduler(num_workers=0)
+
+    def test_chunks_cover_all_items(self, uneven_costs):
+        """Tests that every item ends up in exactly one chunk."""
+        scheduler = CellScheduler(num_workers=4)
+        chunks = scheduler.make_chunks(self.costs)
+        indices = sorted(index for _, chunk in chunks for index in chunk)
+        assert indices == list(range(len(self.costs)))
+
+    def test_expensive_items_get_own_chunk(self, uneven_costs):
+        """
+        Tests that the most expensive item, which costs more than the target
+        cost of a chunk, is alone in its chunk.
+        """
+        scheduler = CellScheduler(num_workers=4)
+        chunks = scheduler.make_chunks(self.costs)
+        assert [101] in [chunk for _, chunk in chunks]
+
+    def test_assign_chunks_balances_load(self, uneven_costs):
+        """
+        Tests that no worker is given more than the largest chunk on top of
+        an even share of the total cost.
+        """
+        scheduler = CellScheduler(num_workers=3)
+        chunks = scheduler.make_chunks(self.costs)
+        queues = scheduler.assign_chunks(chunks)
+        loads = [sum(cost for cost, _ in queue) for queue in queues]
+        largest_chunk = max(cost for cost, _ in chunks)
+        assert max(loads) <= sum(self.costs) / 3 + largest_chunk
+
+    def test_run_calls_func_for_all_items(self, uneven_costs):
+        """Tests that results are returned in the same order as the items."""
+        scheduler = CellScheduler(num_workers=3)
+        items = list(range(len(self.costs)))
+        results = scheduler.run(lambda item: 2 * item, items, self.costs)
+        assert results == [2 * item for item in items]
+
+    def test_run_reports_utilisation(self, uneven_costs):
+        """
+        Tests that a report is made for every worker, and that all the cost
+        is accounted for.
+        """
+        scheduler = CellScheduler(num_workers=3)
+        assert scheduler.utilisation is None
+        scheduler.run(lambda item: None, list(range(len(self.costs))),
+                      self.costs)
+        assert len(scheduler.utilisation) == 3
+        for utilisation in scheduler.utilisation:
+            assert 0 <= utilisation <= 1
+        assert sum(scheduler.report['cost']) == pytest.approx(sum(self.costs))
+
+    def test_run_raises_errors_from_workers(self):
+        """Tests that an error raised by a worker is raised again by run."""
+        def fail(item):
+            raise KeyError(item)
+
+        with pytest.raises(KeyError):
+            CellScheduler(num_workers=2).run(fail, [1, 2, 3], [1, 1, 1])
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+from biosim.checkpoint import population_arrays
+from biosim.simulation import BioSim
+from biosim.trajectory import TrajectoryRecorder, read_index, read_year
+import numpy as np
+import pytest
+
+__author__ = "Marie Kolvik Valøy, Christine Brinchmann"
+__email__ = "mvaloy@nmbu.no, christibr@nmbu.no"
+
+
+class TestTrajectory:
+
+    @pytest.fixture()
+    def make_sim(self):
+        """Makes a function creating a simulation with both species."""
+        def make_sim():
+            ini_pop = [{'loc': (2, 2),
+                        'pop': {'Herbivore': {'count': 80, 'age': 5,
+                                              'weight': 20.0},
+                                'Carnivore': {'count': 10, 'age': 5,
+                                              'weight': 20.0}}}]
+            return BioSim(island_map="WWWWW\nWLLHW\nWLDLW\nWWWWW",
+                          ini_pop=ini_pop, seed=5)
+        return make_sim
+
+    @pytest.mark.parametrize('codec', ['zlib', 'lzma'])
+    def test_year_recorded(self, make_sim, tmp_path, codec):
+        """Tests that a recorded year holds every animal on the island."""
+        sim = make_sim()
+        sim.record_animals(tmp_path, codec=codec)
+        sim.simulate(3, vis_years=None)
+        expected = population_arrays(sim.island)
+        sim.simulate(2, vis_years=None)
+        sim.close()
+
+        assert read_index(tmp_path)['year'].tolist() == [0, 1, 2, 3, 4]
+        table = read_year(tmp_path, 3)
+        herbs = table['species'] == 0
+        np.testing.assert_array_equal(table['weight'][herbs],
+                                      expected['herb_weight'])
+        np.testing.assert_array_equal(table['age'][~herbs],
+                                      expected['carn_age'])
+        assert np.all((table['fitness'] >= 0) & (table['fitness'] <= 1))
+
+    def test_sampling_keeps_simulation(self, make_sim, tmp_path):
+        """
+        Tests that sub-sampling records fewer animals, and does not change
+        the simulation.
+        """
+        sim = make_sim()
+        sim.record_animals(tmp_path, fraction=0.5, every=2)
+        sim.simulate(5, vis_years=None)
+        sim.close()
+        unrecorded = make_sim()
+        unrecorded.simulate(5, vis_years=None)
+
+        index = read_index(tmp_path)
+        assert index['year'].tolist() == [0, 2, 4]
+        assert 0 < index['num_animals'][0] < 90
+        assert sim.num_animals_per_species == \
+            unrecorded.num_animals_per_species
+
+    def test_cells_recorded(self, make_sim, tmp_path):
+        """Tests that only the animals in the given cells are recorded."""
+        sim = make_sim()
+        sim.record_animals(tmp_path, cells=[(2, 3)])
+        sim.simulate(3, vis_years=None)
+        sim.close()
+        assert len(read_year(tmp_path, 0)['cell']) == 0
+        assert np.all(read_year(tmp_path, 2)['cell'] == 1 * 5 + 2)
+
+    @pytest.mark.parametrize('cells', [[(2, 3), (1, 1)], [(2, 3), (9, 2)]])
+    def test_invalid_cells(self, make_sim, tmp_path, cells):
+        """
+        Tests that a ValueError is raised for water cells and cells outside
+        the island, before anything is recorded.
+        """
+        sim = make_sim()
+        with pytest.raises(ValueError):
+            sim.record_animals(tmp_path / 'run', cells=cells)
+        assert not (tmp_path / 'run').exists()
+
+    def test_missing_year(self, make_sim, tmp_path):
+        """Tests that reading a year not recorded raises a KeyError."""
+        sim = make_sim()
+        sim.record_animals(tmp_path)
+        sim.simulate(1, vis_years=None)
+        sim.close()
+        with pytest.raises(KeyError):
+            read_year(tmp_path, 5)
+
+    def test_unknown_codec(self, tmp_path):
+        """Tests that a ValueError is raised for an unknown codec."""
+        with pytest.raises(ValueError):
+            TrajectoryRecorder(tmp_path, (3, 3), codec='snappy')